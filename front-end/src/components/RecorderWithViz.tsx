@@ -2,10 +2,8 @@
 
 import { useRef, useState } from "react";
 import {
-  callIpa,
-  callStt,
+  callAssess,
   callLipSync,
-  callPronEval,
   SttResp,
   IpaResp,
   PronReport,
@@ -59,35 +57,16 @@ export default function RecorderWithViz() {
           const blob = new Blob(chunks.current, { type: "audio/webm" });
           setAudioUrl(URL.createObjectURL(blob));
 
-          // 1️⃣ STT (음성 → 텍스트)
+          // 1️⃣~3️⃣ STT + IPA + 발음 평가 + AI 스타일 피드백 (서버 왕복 1회)
           setPhase("처리 중");
-          const sttRes: SttResp = await callStt(blob);
-          setStt(sttRes);
-
-          const text = sttRes.rawText || sttRes.normText || "";
-          if (!text) throw new Error("STT 결과가 비어있습니다.");
-
-          // 2️⃣ IPA 변환
-          const ipaRes = await callIpa(text);
-          setIpa(ipaRes);
-
-          // 3️⃣ 발음 평가 + AI 스타일 피드백
+          setIsEvaluating(true);
           try {
-            setIsEvaluating(true);
-
-            // 기준 문장: 우선 IPA 원문이 있으면 그걸, 아니면 인식 텍스트 사용
-            const referenceText = ipaRes.original || text;
-            const durationSec =
-              typeof sttRes.duration === "number" ? sttRes.duration : 0;
-
-            const evalRes = await callPronEval({
-              referenceText,
-              recognizedText: text,
-              durationSec,
-            });
-
-            setReport(evalRes.report);
-            setFeedback(evalRes.ai_feedback);
+            const res = await callAssess(blob);
+            setStt(res.stt);
+            if (!(res.stt.rawText || res.stt.normText)) throw new Error("STT 결과가 비어있습니다.");
+            setIpa(res.recognized_ipa);
+            setReport(res.report);
+            setFeedback(res.ai_feedback);
           } finally {
             setIsEvaluating(false);
           }
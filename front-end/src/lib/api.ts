@@ -1,3 +1,5 @@
+import type { MouthGroup } from "./ipaToMouthGroup";
+
 export type SttWord = { text: string; start: number; end: number };
 
 export type SttResp = {
@@ -5,6 +7,7 @@ export type SttResp = {
   normText?: string;
   words?: SttWord[];
   duration?: number;
+  speech_duration?: number; // 앞뒤 무음 제외 발화 길이(s)
   model?: string;
   version?: string;
 };
@@ -18,6 +21,16 @@ export type IpaResp = {
 };
 
 /* 🔹 여기부터 추가: 발음 리포트 + AI 피드백 타입들 */
+export type PronError = {
+  op: "sub" | "del" | "ins";
+  ref_index: number;
+  hyp_index: number;
+  ref: string | null;
+  hyp: string | null;
+  ref_pos: number; // reference_text 원문에서의 위치 (강조 표시용)
+  jamo?: ("onset" | "nucleus" | "coda")[];
+};
+
 export type PronReport = {
   overall: number;
   accuracy: number;
@@ -25,6 +38,7 @@ export type PronReport = {
     score: number;
     syllables_per_second: number;
   };
+  errors?: PronError[];
 };
 
 export type AiFeedback = {
@@ -39,13 +53,22 @@ export type PronEvalResp = {
   report: PronReport;
   ai_feedback: AiFeedback;
 };
+export type AssessResp = {
+  reference_text: string;
+  stt: SttResp;
+  reference_ipa: IpaResp;
+  recognized_ipa: IpaResp;
+  report: PronReport;
+  ai_feedback: AiFeedback | null;
+  processing_ms: number;
+};
 /* 🔹 추가 끝 */
 
 const STT_BASE = "http://127.0.0.1:5000";   // ✅ Flask 프록시
 const GOOEY_BASE = "http://127.0.0.1:5000"; // ✅ Flask 프록시
 const PRON_BASE = "http://127.0.0.1:8000";  // ✅ FastAPI (ipa랑 같은 서버)
 
-/** 🎙️ STT 호출 (Flask가 webm→wav 변환 처리) */
+/** 🎙️ STT 호출 (Flask가 webm 원본을 Whisper 서버로 스트리밍 전달) */
 export async function callStt(file: Blob): Promise<SttResp> {
   const fd = new FormData();
   const webm = new File([file], "record.webm", { type: "audio/webm" });
@@ -74,7 +97,36 @@ export async function callIpa(text: string): Promise<IpaResp> {
   return r.json();
 }
 
-/** 🧠 Gooey 입모양 생성 호출 */
+/** 👄 입모양 타임라인 (서버에서 바로 계산, Gooey 없이) */
+export type VisemeTrack = {
+  text: string;
+  fps: number;
+  duration: number;
+  segments: { start: number; end: number; viseme: MouthGroup; ipa: string; char: string }[];
+  frames: MouthGroup[]; // frames[k] = k / fps 초의 입모양 (MOUTH_IMAGE[frames[k]])
+};
+
+export async function callViseme(input: {
+  text?: string;
+  durationSec?: number;
+  words?: { word: string; start: number; end: number }[]; // /stt 단어 타임스탬프
+  fps?: number;
+}): Promise<VisemeTrack> {
+  const r = await fetch(`${PRON_BASE}/viseme`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({
+      text: input.text ?? "",
+      duration_sec: input.durationSec,
+      words: input.words,
+      fps: input.fps,
+    }),
+  });
+  if (!r.ok) throw new Error(`/viseme failed: ${r.status} - ${await r.text()}`);
+  return r.json();
+}
+
+/** 🧠 Gooey 입모양 생성 호출 (고품질 영상이 필요할 때만, 느림) */
 export async function callLipSync(audioBlob: Blob, facePublicPath = "/face.jpg") {
   const imgRes = await fetch(facePublicPath);
   if (!imgRes.ok) throw new Error(`face image not found at ${facePublicPath}`);
@@ -134,3 +186,16 @@ export async function callPronEval(input: {
     };
   }
 }
+
+/** 🚀 한 번에 평가: 오디오 업로드 1회로 STT + IPA + 점수 + 피드백 (referenceText 없으면 인식 결과 기준) */
+export async function callAssess(file: Blob, referenceText = ""): Promise<AssessResp> {
+  const fd = new FormData();
+  fd.append("audio", new File([file], "record.webm", { type: "audio/webm" }));
+  fd.append("reference_text", referenceText);
+  fd.append("language", "ko");
+
+  const r = await fetch(`${STT_BASE}/assess`, { method: "POST", body: fd });  // 오디오 업로드는 Flask 프록시 경유
+  const txt = await r.text();
+  if (!r.ok) throw new Error(`/assess failed: ${r.status} - ${txt}`);
+  return JSON.parse(txt);
+}
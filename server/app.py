@@ -1,5 +1,6 @@
-from flask import Flask, request, jsonify
-import os, requests, tempfile, subprocess, json
+from flask import Flask, Response, request, jsonify
+import os, io, wave, time, hashlib, requests, tempfile, subprocess, json, uuid
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from flask_cors import CORS
 
@@ -8,104 +9,191 @@ app = Flask(__name__)
 CORS(app)
 
 API_KEY = os.getenv("GOOEY_API_KEY")
-WHISPER_BASE = "http://127.0.0.1:8000"  # Whisper 서버
-GOOEY_URL = "https://api.gooey.ai/v2/Lipsync/form/"
+WHISPER_BASE = os.getenv("WHISPER_BASE", "http://127.0.0.1:8000")  # Whisper 서버
+GOOEY_URL = os.getenv("GOOEY_URL", "https://api.gooey.ai/v2/Lipsync/form/")
+# Whisper 서버와의 keep-alive 연결 수 (Flask 동시 요청 수 정도)
+PROXY_POOL_SIZE = int(os.getenv("PROXY_POOL_SIZE", "16"))
+PROXY_CHUNK_BYTES = 64 * 1024
+
+# 요청마다 새 연결(TCP 핸드셰이크)을 맺지 않도록 세션 하나를 공유
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=PROXY_POOL_SIZE))
 
 # ---------- FFmpeg helpers ----------
 
-def run_ffmpeg(cmd):
-    """Run ffmpeg command with error capture."""
-    res = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+LIPSYNC_SAMPLE_RATE = 16000
+LIPSYNC_MIN_SEC = 2.5
+
+def run_ffmpeg(cmd, input_bytes: bytes = None):
+    """Run ffmpeg command with error capture (stdin/stdout as bytes)."""
+    res = subprocess.run(cmd, input=input_bytes, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
     if res.returncode != 0:
-        raise RuntimeError(f"ffmpeg failed: {' '.join(cmd)}\n{res.stderr}")
+        raise RuntimeError(f"ffmpeg failed: {' '.join(cmd)}\n{res.stderr.decode('utf-8', 'replace')}")
     return res
 
-def get_duration_seconds(path: str) -> float:
-    """Probe media duration in seconds."""
-    r = subprocess.run(
-        ["ffprobe", "-v", "error", "-show_entries", "format=duration",
-         "-of", "default=noprint_wrappers=1:nokey=1", path],
-        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
-    )
-    try:
-        return float(r.stdout.strip())
-    except:
-        return 0.0
-
-def to_wav_mono_16k(src_path: str, dst_path: str):
-    """Convert any audio to WAV mono 16kHz, with light loudness normalize."""
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", src_path,
+def _lipsync_cmd(src: str, min_sec: float):
+    return [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", src,
         "-vn",
-        "-ac", "1",            # mono
-        "-ar", "16000",        # 16kHz
-        "-af", "loudnorm=I=-20:LRA=11:TP=-2",  # 볼륨 표준화(너무 작은 음성 방지)
-        dst_path
+        # 볼륨 표준화(너무 작은 음성 방지) → 16kHz → min_sec보다 짧으면 무음 패딩
+        "-af", f"loudnorm=I=-20:LRA=11:TP=-2,aresample={LIPSYNC_SAMPLE_RATE},apad=whole_dur={min_sec}",
+        "-ac", "1", "-ar", str(LIPSYNC_SAMPLE_RATE),
+        "-f", "s16le", "pipe:1",
     ]
-    run_ffmpeg(cmd)
 
-def ensure_min_duration_wav(src_wav: str, dst_wav: str, min_sec: float = 2.5):
+def prepare_lipsync_audio(src: bytes, min_sec: float = LIPSYNC_MIN_SEC):
     """
-    If duration < min_sec, pad with silence to min_sec.
-    Keep WAV mono 16kHz.
+    Any audio → WAV mono 16kHz, loudness normalized, padded with silence to min_sec.
+    ffmpeg 한 번(필터 그래프 하나)으로 처리하고, 길이는 출력 샘플 수로 계산 (ffprobe 없음)
+    moov 박스가 파일 끝에 있는 m4a/mp4(iOS/Safari 녹음)는 pipe로 demux가 안 되므로 그때만 임시 파일로 재시도
+    """
+    try:
+        pcm = run_ffmpeg(_lipsync_cmd("pipe:0", min_sec), src).stdout
+    except RuntimeError:
+        if not (len(src) >= 12 and src[4:8] == b"ftyp"):
+            raise
+        with tempfile.NamedTemporaryFile(suffix=".m4a") as tmp:
+            tmp.write(src)
+            tmp.flush()
+            pcm = run_ffmpeg(_lipsync_cmd(tmp.name, min_sec)).stdout
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(LIPSYNC_SAMPLE_RATE)
+        w.writeframes(pcm)
+    return buf.getvalue(), len(pcm) / 2 / LIPSYNC_SAMPLE_RATE
+
+# ---------- Lipsync result cache ----------
+
+# 같은 (정규화된 음성, 얼굴 이미지) 요청은 Gooey에 다시 올리지 않고 저장된 결과를 반환
+LIPSYNC_CACHE_DIR = os.getenv("LIPSYNC_CACHE_DIR", os.path.join(tempfile.gettempdir(), "kotalk_lipsync_cache"))
+LIPSYNC_CACHE_TTL_S = int(os.getenv("LIPSYNC_CACHE_TTL_S", str(7 * 24 * 3600)))  # 결과 영상 URL 만료 대비
+LIPSYNC_CACHE_MAX_ENTRIES = int(os.getenv("LIPSYNC_CACHE_MAX_ENTRIES", "2000"))
+
+def lipsync_cache_key(wav: bytes, image: bytes) -> str:
+    h = hashlib.sha256()
+    for part in (wav, image):
+        h.update(len(part).to_bytes(8, "little"))
+        h.update(part)
+    return h.hexdigest()
+
+def lipsync_cache_get(key: str):
+    path = os.path.join(LIPSYNC_CACHE_DIR, f"{key}.json")
+    try:
+        if time.time() - os.path.getmtime(path) > LIPSYNC_CACHE_TTL_S:
+            os.remove(path)
+            return None
+        with open(path, "r", encoding="utf-8") as fp:
+            return json.load(fp)
+    except (OSError, ValueError):
+        return None
+
+def lipsync_cache_put(key: str, value: dict):
+    """임시 파일에 쓰고 rename (동시 요청이 반쯤 쓴 파일을 읽지 않도록), 개수가 넘으면 오래된 것부터 삭제"""
+    os.makedirs(LIPSYNC_CACHE_DIR, exist_ok=True)
+    path = os.path.join(LIPSYNC_CACHE_DIR, f"{key}.json")
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fp:
+        json.dump(value, fp, ensure_ascii=False)
+    os.replace(tmp, path)
+
+    entries = [e for e in os.scandir(LIPSYNC_CACHE_DIR) if e.name.endswith(".json")]
+    if len(entries) > LIPSYNC_CACHE_MAX_ENTRIES:
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[:len(entries) - LIPSYNC_CACHE_MAX_ENTRIES]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
+
+# ---------- Streaming multipart ----------
+
+class MultipartStream:
+    """
+    업로드 파일을 디스크/메모리에 다시 쓰지 않고 청크 단위로 흘려보내는 multipart 본문.
+    __len__이 있어서 requests가 chunked 대신 Content-Length를 붙임 (백엔드가 크기 제한을 바로 검사)
     """
-    dur = get_duration_seconds(src_wav)
-    if dur >= min_sec - 0.05:   # 약간 여유
-        # 그대로 복사
-        run_ffmpeg(["ffmpeg", "-y", "-i", src_wav, "-ac", "1", "-ar", "16000", dst_wav])
-        return dur, dur
-
-    # 무음 패딩: apad + -t 로 총 길이 지정
-    cmd = [
-        "ffmpeg", "-y",
-        "-i", src_wav,
-        "-af", f"apad=pad_dur={min_sec}",
-        "-t", f"{min_sec}",
-        "-ac", "1", "-ar", "16000",
-        dst_wav
-    ]
-    run_ffmpeg(cmd)
-    new_dur = get_duration_seconds(dst_wav)
-    return dur, new_dur
 
-def ffmpeg_webm_to_wav(src_path, dst_path):
-    run_ffmpeg(["ffmpeg", "-y", "-i", src_path, "-ar", "44100", "-ac", "1", dst_path])
+    def __init__(self, fields: dict, file_field: str, file_storage, chunk_size: int = PROXY_CHUNK_BYTES):
+        self.boundary = uuid.uuid4().hex
+        self.file = file_storage.stream
+        self.chunk_size = chunk_size
+        head = b"".join(
+            f'--{self.boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode("utf-8")
+            for k, v in fields.items()
+        )
+        filename = file_storage.filename or "record.webm"
+        mimetype = file_storage.mimetype or "application/octet-stream"
+        head += (f'--{self.boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+                 f"Content-Type: {mimetype}\r\n\r\n").encode("utf-8")
+        self.head = head
+        self.tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        start = self.file.tell()
+        self.file.seek(0, os.SEEK_END)
+        self.file_size = self.file.tell() - start
+        self.file.seek(start)
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return len(self.head) + self.file_size + len(self.tail)
+
+    def __iter__(self):
+        yield self.head
+        while True:
+            chunk = self.file.read(self.chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        yield self.tail
 
 # ---------- Endpoints ----------
 
-@app.route("/stt", methods=["POST"])
-def stt():
-    """🎙️ 프론트 → (audio:webm) → 서버에서 wav 변환 → Whisper로 audio 필드 전달"""
+def forward_audio(path: str, defaults: dict):
+    """
+    업로드 오디오(audio 또는 file 필드)와 나머지 폼 필드를 Whisper 서버 path로 스트리밍 전달.
+    Whisper 서버가 직접 16kHz mono로 디코드하므로 여기서는 변환/임시 파일 없이 흘려보내기만 하고,
+    응답도 버퍼링 없이 그대로 돌려준다
+    """
     if "audio" not in request.files and "file" not in request.files:
         return jsonify({"error": "audio form field required"}), 400
 
     f = request.files.get("audio") or request.files.get("file")
-    lang = request.form.get("language", "ko")
-    timestamps = request.form.get("timestamps", "word")
+    fields = {**defaults, **request.form.to_dict()}  # 다른 폼 필드도 그대로 전달
+    body = MultipartStream(fields, "audio", f)  # Whisper가 audio 필드 기대
 
     try:
-        with tempfile.NamedTemporaryFile(suffix=".webm", delete=False) as src, \
-             tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as dst:
-            f.save(src.name)
-            ffmpeg_webm_to_wav(src.name, dst.name)
+        r = _session.post(f"{WHISPER_BASE}{path}", data=body, headers={"Content-Type": body.content_type},
+                          params=request.args, timeout=(5, 120), stream=True)
+    except requests.RequestException as e:
+        return jsonify({"error": str(e)}), 502
 
-            with open(dst.name, "rb") as fp:
-                files = {"audio": ("record.wav", fp, "audio/wav")}  # Whisper가 audio 필드 기대
-                data = {"language": lang, "timestamps": timestamps}
-                r = requests.post(f"{WHISPER_BASE}/stt", files=files, data=data, timeout=120)
+    headers = {"Content-Type": r.headers.get("Content-Type", "application/json")}
+    resp = Response(r.iter_content(PROXY_CHUNK_BYTES), status=r.status_code, headers=headers)
+    resp.call_on_close(r.close)  # 다 보낸 뒤 연결을 풀로 반납
+    return resp
 
-        return (r.text, r.status_code, {"Content-Type": r.headers.get("Content-Type", "application/json")})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+@app.route("/stt", methods=["POST"])
+def stt():
+    """🎙️ 프론트 → (audio:webm 원본 그대로) → Whisper /stt"""
+    return forward_audio("/stt", {"language": "ko", "timestamps": "word"})
+
+@app.route("/assess", methods=["POST"])
+def assess():
+    """🚀 프론트 → (audio + reference_text) → Whisper /assess (다른 오디오 업로드와 같은 경로)"""
+    return forward_audio("/assess", {"language": "ko"})
 
 @app.route("/api/lipsync", methods=["POST"])
 def lipsync():
     """
     🧠 Gooey Lipsync 프록시
-    - 어떠한 입력이 와도: WAV mono 16kHz 로 변환하고
-    - 최소 2.5초 이상이 되도록 패딩
-    - 변환된 WAV를 Gooey에 input_audio 로 업로드
+    - 어떠한 입력이 와도: WAV mono 16kHz 로 변환 + 최소 2.5초 패딩 (ffmpeg 1회)
+    - 같은 (음성, 이미지)는 캐시된 결과 반환
+    - 아니면 변환된 WAV를 Gooey에 input_audio 로 업로드
     """
     if not API_KEY:
         return jsonify({"error": "GOOEY_API_KEY not set"}), 500
@@ -116,29 +204,22 @@ def lipsync():
     image = request.files["image"]
 
     try:
-        # 1) 업로드 오디오 → temp 저장
-        with tempfile.NamedTemporaryFile(suffix=".bin", delete=False) as raw_in:
-            audio.save(raw_in.name)
-
-        # 2) 표준 WAV(16k mono)로 변환
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as wav_std:
-            to_wav_mono_16k(raw_in.name, wav_std.name)
-            std_dur = get_duration_seconds(wav_std.name)
-
-        # 3) 2.5초 미만이면 무음 패딩
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as wav_final:
-            before, after = ensure_min_duration_wav(wav_std.name, wav_final.name, min_sec=2.5)
-
-            # 디버그: 길이/사이즈 로그
-            size_bytes = os.path.getsize(wav_final.name)
-            print(f"[LIPSYNC] duration_before={before:.3f}s duration_after={after:.3f}s size={size_bytes}B")
+        # 1) 표준 WAV(16k mono, 2.5초 이상)로 변환
+        wav, after = prepare_lipsync_audio(audio.read(), min_sec=LIPSYNC_MIN_SEC)
+        image_bytes = image.read()
+        size_bytes = len(wav)
+        print(f"[LIPSYNC] duration_after={after:.3f}s size={size_bytes}B")
 
-            audio_fp = open(wav_final.name, "rb")
+        # 2) 같은 음성 + 같은 얼굴이면 Gooey 호출 없이 반환
+        key = lipsync_cache_key(wav, image_bytes)
+        cached = lipsync_cache_get(key)
+        if cached is not None:
+            return jsonify({**cached, "cached": True}), 200
 
-        # 4) Gooey 업로드
+        # 3) Gooey 업로드
         files = [
-            ("input_face", (image.filename, image.stream, image.mimetype or "image/jpeg")),
-            ("input_audio", ("voice.wav", audio_fp, "audio/wav")),
+            ("input_face", (image.filename, image_bytes, image.mimetype or "image/jpeg")),
+            ("input_audio", ("voice.wav", wav, "audio/wav")),
         ]
         data = {"json": json.dumps({})}
         headers = {"Authorization": f"Bearer {API_KEY}"}
@@ -149,7 +230,6 @@ def lipsync():
             # 실패 시 서버 로그와 함께 디버그 정보 첨부
             dbg = {
                 "note": "Gooey returned non-200",
-                "duration_before": before,
                 "duration_after": after,
                 "content_length": size_bytes,
                 "gooey_status": r.status_code,
@@ -160,7 +240,7 @@ def lipsync():
 
         res = r.json()
         out = (res.get("output") or {}).get("output_video")
-        return jsonify({
+        result = {
             "ok": True,
             "output_video": out,
             "gooey": res,
@@ -168,7 +248,10 @@ def lipsync():
                 "duration_after": after,
                 "content_length": size_bytes
             }
-        }), 200
+        }
+        if out:
+            lipsync_cache_put(key, result)
+        return jsonify({**result, "cached": False}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1,5 +1,24 @@
-import time, unicodedata, re
-from typing import Tuple
+import os, time, unicodedata, re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+class ApiError(Exception):
+    """
+    라우터/서비스 어디서든 raise하면 main.py의 exception handler가
+    {"error": {code, message, hint, details}} (stt.error_response와 같은 모양)으로 응답
+    """
+
+    def __init__(self, status: int, code: str, message: str, hint: Optional[str] = None,
+                 details: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+        self.hint = hint
+        self.details = details
+
+    def body(self) -> Dict[str, Any]:
+        return {"error": {"code": self.code, "message": self.message, "hint": self.hint, "details": self.details}}
 
 def now_ms() -> int:
     return int(time.time() * 1000)
@@ -12,3 +31,101 @@ def normalize_text(text: str) -> str:
 
 def seconds_from_millis(ms: int) -> float:
     return round(ms / 1000.0, 2)
+
+class LRUCache:
+    """
+    간단한 LRU 캐시. max_items(개수) 또는 max_bytes(sizeof로 계산한 크기 합) 한도를 넘으면
+    가장 오래 안 쓴 항목부터 내보낸다. hit/miss 횟수를 같이 센다.
+    """
+
+    def __init__(self, max_items: int = 0, max_bytes: int = 0, sizeof=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (lambda v: 1)
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self._data = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key) -> bool:
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value, _ = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        size = self.sizeof(value)
+        if self.max_bytes and size > self.max_bytes:
+            return  # 한 항목이 예산보다 크면 캐시하지 않음
+        if key in self._data:
+            self.bytes -= self._data.pop(key)[1]
+        self._data[key] = (value, size)
+        self.bytes += size
+        while self._data and ((self.max_items and len(self._data) > self.max_items)
+                              or (self.max_bytes and self.bytes > self.max_bytes)):
+            _, (_, old_size) = self._data.popitem(last=False)
+            self.bytes -= old_size
+
+    def clear(self):
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+def process_memory(pid: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    프로세스 메모리 (MB). Linux /proc 기준, 없으면 None.
+    rss: 물리 메모리 전체 / pss: 공유 페이지를 나눠 가진 몫 / shared: 다른 프로세스와 공유 중인 부분
+    fork로 모델 가중치를 공유하면 워커별 rss는 커도 pss 합은 거의 모델 1벌 크기에 머문다
+    """
+    path = f"/proc/{pid or 'self'}/smaps_rollup"
+    fields: Dict[str, int] = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1])  # kB
+    except OSError:
+        return None
+    mb = lambda kb: round(kb / 1024.0, 1)
+    return {
+        "pid": pid or os.getpid(),
+        "rss_mb": mb(fields.get("Rss", 0)),
+        "pss_mb": mb(fields.get("Pss", 0)),
+        "shared_mb": mb(fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)),
+    }
+
+def child_pids(ppid: int) -> List[int]:
+    """ppid의 자식 프로세스 목록 (/proc/<pid>/stat의 4번째 필드)"""
+    pids = []
+    for name in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # comm에 공백/괄호가 있을 수 있으므로 마지막 ')' 뒤부터 파싱
+        if int(stat.rsplit(")", 1)[1].split()[1]) == ppid:
+            pids.append(int(name))
+    return sorted(pids)
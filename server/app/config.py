@@ -6,3 +6,71 @@ MAX_SECONDS = int(os.getenv("MAX_SECONDS", "60"))
 MAX_BYTES = int(os.getenv("MAX_BYTES", "20000000"))
 CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")]
 API_VERSION = os.getenv("API_VERSION", "v1")
+
+# 마이크로 배칭: 동시에 들어온 요청을 최대 BATCH_MAX_WAIT_MS 동안 모아 한 번에 추론
+BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "8"))
+BATCH_MAX_WAIT_MS = int(os.getenv("BATCH_MAX_WAIT_MS", "10"))
+
+# 추론 워커 프로세스 수 (0이면 웹 프로세스 안에서 추론), 워커당 코어 수(0이면 균등 분배)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", "0"))
+# 워커가 이 시간 안에 응답하지 않으면 멈춘 것으로 보고 재시작
+INFERENCE_TIMEOUT_S = float(os.getenv("INFERENCE_TIMEOUT_S", "120"))
+
+# 모델 로드 후 합성 오디오로 WARMUP_RUNS번 추론해서 첫 요청 지연을 미리 치름 (끝나야 ready)
+WARMUP_RUNS = int(os.getenv("WARMUP_RUNS", "1"))
+WARMUP_SECONDS = float(os.getenv("WARMUP_SECONDS", "2.0"))
+
+# 전사 결과 캐시: 메모리 LRU 바이트 예산(0이면 끔) + 선택적 디스크 계층(재시작 후에도 유지)
+STT_CACHE_MAX_BYTES = int(os.getenv("STT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+STT_CACHE_DIR = os.getenv("STT_CACHE_DIR", "")
+
+# IPA 변환 memoize 크기 (문장 / 단어 LRU 항목 수), /ipa/batch 최대 문장 수
+IPA_CACHE_SIZE = int(os.getenv("IPA_CACHE_SIZE", "4096"))
+IPA_WORD_CACHE_SIZE = int(os.getenv("IPA_WORD_CACHE_SIZE", "16384"))
+IPA_BATCH_MAX = int(os.getenv("IPA_BATCH_MAX", "500"))
+
+# 미리 빌드한 발음 인덱스(mmap) 경로. 있으면 연습 문장은 g2pk 없이 인덱스에서 바로 응답
+IPA_INDEX_PATH = os.getenv("IPA_INDEX_PATH", "")
+
+# /stt/stream: 새 오디오가 STREAM_STEP_SEC 쌓일 때마다 partial 전사,
+# 끝에서 STREAM_HOLDBACK_SEC 이내 단어는 다음 partial까지 확정 보류,
+# 미확정 구간이 STREAM_MAX_WINDOW_SEC를 넘으면 강제로 확정 (Whisper 30초 창 이내 유지)
+STREAM_STEP_SEC = float(os.getenv("STREAM_STEP_SEC", "1.0"))
+STREAM_HOLDBACK_SEC = float(os.getenv("STREAM_HOLDBACK_SEC", "1.0"))
+STREAM_MAX_WINDOW_SEC = float(os.getenv("STREAM_MAX_WINDOW_SEC", "25"))
+
+# 추론 전 VAD: 앞뒤 무음 제거 (+ VAD_COLLAPSE_PAUSE_SEC > 0 이면 그보다 긴 문장 중간 쉼도 줄임)
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+VAD_COLLAPSE_PAUSE_SEC = float(os.getenv("VAD_COLLAPSE_PAUSE_SEC", "0"))
+
+# ASR 엔진: whisper(PyTorch fp32/fp16) / whisper-int8(torch 동적 양자화, CPU) / faster-whisper(CTranslate2) / stub(벤치마크용)
+# ASR_COMPUTE_TYPE: faster-whisper compute_type (비우면 CPU int8, GPU float16)
+ASR_BACKEND = os.getenv("ASR_BACKEND", "whisper")
+ASR_COMPUTE_TYPE = os.getenv("ASR_COMPUTE_TYPE", "")
+# ASR_BACKEND=stub (벤치마크용, 모델 없음): 오디오 1초당 ASR_STUB_RTF초 대기 후 고정 문장 반환
+ASR_STUB_RTF = float(os.getenv("ASR_STUB_RTF", "0"))
+ASR_STUB_TEXT = os.getenv("ASR_STUB_TEXT", "안녕하세요 오늘 날씨가 좋네요")
+
+# AI 피드백 LLM (OpenAI 호환 API, 기본 Upstage Solar)
+# 호출마다 LLM_TIMEOUT_S 안에 못 끝나면 룰 기반 피드백으로 대체, 동시 호출은 LLM_MAX_CONCURRENCY개까지
+# 같은 (기준 문장, 인식 결과, LLM_SCORE_BUCKET 단위로 묶은 점수) 조합은 LLM_CACHE_SIZE개까지 캐시
+UPSTAGE_API_KEY = os.getenv("UPSTAGE_API_KEY")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.upstage.ai/v1/solar")
+LLM_MODEL = os.getenv("LLM_MODEL", "solar-1-mini-chat")
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "8"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "2048"))
+LLM_SCORE_BUCKET = float(os.getenv("LLM_SCORE_BUCKET", "5"))
+
+# 배치 채점 (/pron-eval/batch, python -m app.services.pron_batch)
+# 워커 프로세스 수(0이면 코어 수), 한 번에 워커로 보내는 행 수, 최대 행 수, LLM 피드백 선택 시 초당 호출 수
+PRON_BATCH_WORKERS = int(os.getenv("PRON_BATCH_WORKERS", "0"))
+PRON_BATCH_CHUNK = int(os.getenv("PRON_BATCH_CHUNK", "500"))
+PRON_BATCH_MAX_ROWS = int(os.getenv("PRON_BATCH_MAX_ROWS", "50000"))
+PRON_BATCH_LLM_RPS = float(os.getenv("PRON_BATCH_LLM_RPS", "2"))
+
+# 입모양(viseme) 타임라인 (/viseme): 기본 프레임 속도, 문장별 분해/트랙 캐시 크기
+VISEME_FPS = int(os.getenv("VISEME_FPS", "30"))
+VISEME_MAX_FPS = 120
+VISEME_CACHE_SIZE = int(os.getenv("VISEME_CACHE_SIZE", "1024"))
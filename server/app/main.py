@@ -1,17 +1,37 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 
 from fastapi.middleware.cors import CORSMiddleware
-from app.config import CORS_ORIGINS
-from app.routers import health, stt, ipa, pron_eval
-from app.services.whisper_svc import load_model
+from app.common_utils import ApiError
+from app.config import CORS_ORIGINS, IPA_INDEX_PATH
+from app.routers import health, stt, ipa, pron_eval, assess, viseme, metrics
+from app.services import inference
+from app.services.llm_feedback import feedback_client
+from app.services.pron_batch import shutdown_pool
+from app.services.metrics import MetricsMiddleware
+from app.utils.ipa_converter import init_converter
+from app.utils.ipa_index import open_index
 
 # Lifespan 정의
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # ✅ 서버 시작 시 실행
-    load_model()
+    # 모델 로드+워밍업 시작 (백그라운드, INFERENCE_WORKERS > 0 이면 워커 프로세스에서)
+    # 끝날 때까지 /health는 ready=False와 진행 상황을 보여주고 /stt는 503
+    inference.start()
+    # 발음 인덱스가 있으면 g2pk 로딩은 인덱스에 없는 문장이 처음 올 때까지 미룸
+    # 없으면 G2p(사전/형태소 분석기)를 지금 한 번만 로드해서 재사용
+    # (g2pk/mecab이 없거나 로드에 실패해도 /stt 등은 그대로 띄우고, 변환기는 /ipa 첫 요청 때 다시 시도)
+    if open_index(IPA_INDEX_PATH) is None:
+        try:
+            init_converter()
+        except Exception as e:
+            print(f"[ipa] converter preload failed, will retry lazily: {e!r}")
     yield
+    await inference.stop()
+    await feedback_client.aclose()
+    shutdown_pool()
     # ✅ 서버 종료 시 정리할 작업이 있으면 여기에 작성
     # e.g. close_db(), clear_cache(), release_model()
     print("Server shutting down...")
@@ -28,8 +48,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 요청/단계별 지연 시간 계측 (/metrics, ?timings=1)
+app.add_middleware(MetricsMiddleware)
+
+# 업로드 검증/모델 준비 등의 오류는 /stt의 error_response와 같은 {"error": {...}} 모양으로
+@app.exception_handler(ApiError)
+async def api_error_handler(request: Request, exc: ApiError):
+    return JSONResponse(status_code=exc.status, content=exc.body())
+
 # 라우터 등록
 app.include_router(health.router)
 app.include_router(stt.router)
 app.include_router(ipa.router)
 app.include_router(pron_eval.router)
+app.include_router(assess.router)
+app.include_router(viseme.router)
+app.include_router(metrics.router)
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Request, HTTPException
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from app.common_utils import ApiError, now_ms, normalize_text
+from app.schemas import STTResponse, ErrorResponse
+from app.services import inference
+from app.services.upload import read_audio_upload
+from app.services.stt_pipeline import stt_from_bytes
+from app.services.pron_scoring import build_pron_report
+from app.services.pron_feedback import build_ai_style_feedback
+from app.services.metrics import stage, timings_requested, timings_snapshot
+from app.utils.ipa_converter import text_to_ipa
+
+router = APIRouter(tags=["Assess"])
+
+ASSESS_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["audio"],
+            "properties": {
+                "audio": {"type": "string", "format": "binary"},
+                "reference_text": {"type": "string", "description": "비우면 인식 결과를 기준 문장으로 사용"},
+                "language": {"type": "string", "default": "ko"},
+                "feedback": {"type": "string", "default": "1", "description": "0이면 AI 피드백 생략"},
+            },
+        }}},
+    }
+}
+
+
+class AssessResponse(BaseModel):
+    reference_text: str
+    stt: STTResponse
+    reference_ipa: Dict[str, Any]
+    recognized_ipa: Dict[str, Any]
+    report: Dict[str, Any]
+    ai_feedback: Optional[Dict[str, Any]] = None
+    processing_ms: int
+    timings: Optional[Dict[str, Any]] = None  # ?timings=1 일 때 단계별 ms
+
+
+@router.post("/assess", response_model=AssessResponse, responses={400: {"model": ErrorResponse}},
+             openapi_extra=ASSESS_FORM_SCHEMA)
+async def assess(request: Request):
+    """
+    오디오 + reference_text 한 번 업로드로 전사 / 두 문장의 IPA / 점수 / 피드백을 모두 반환.
+    (/stt → /ipa → /pron-eval 세 번 왕복하던 것을 한 번으로)
+    기준 문장 IPA 변환은 오디오 디코드·추론과 동시에 진행
+    """
+    if not inference.is_ready():
+        raise ApiError(503, "MODEL_NOT_READY", "Model not loaded yet")
+
+    upload = await read_audio_upload(request)
+    t0 = now_ms()
+    reference_text = normalize_text(upload.fields.get("reference_text", ""))
+    language = upload.fields.get("language", "ko")
+    want_feedback = upload.fields.get("feedback", "1") != "0"
+
+    ref_ipa_task = asyncio.ensure_future(run_in_threadpool(text_to_ipa, reference_text)) if reference_text else None
+
+    def cancel_ref_ipa():
+        if ref_ipa_task is not None:
+            ref_ipa_task.cancel()
+
+    try:
+        stt_res = await stt_from_bytes(upload.data, language, "word")
+    except (HTTPException, ApiError):
+        cancel_ref_ipa()
+        raise
+    except Exception as e:
+        # /stt와 같은 SERVER_ERROR 응답 (디코드 실패, ffmpeg 오류 등)
+        cancel_ref_ipa()
+        raise ApiError(500, "SERVER_ERROR", f"Unexpected server error: {e}")
+    except BaseException:
+        cancel_ref_ipa()
+        raise
+
+    recognized = stt_res.rawText.strip() or stt_res.normText
+    if not recognized:
+        # 채점할 문장이 없으면 점수/LLM 피드백을 만들지 않음
+        cancel_ref_ipa()
+        raise ApiError(422, "NO_SPEECH", "No speech was recognized in the audio.",
+                       "Speak a little louder or closer to the microphone.", {"duration": stt_res.duration})
+    recognized_ipa = await run_in_threadpool(text_to_ipa, recognized)
+    if ref_ipa_task is not None:
+        reference_ipa = await ref_ipa_task
+    else:
+        # 기준 문장이 없으면 인식 결과를 기준으로 (기존 클라이언트 흐름과 동일)
+        reference_text, reference_ipa = normalize_text(recognized), recognized_ipa
+
+    duration = stt_res.speech_duration if stt_res.speech_duration is not None else stt_res.duration
+    with stage("score"):
+        report = build_pron_report(reference_text, recognized, duration)
+    feedback = None
+    if want_feedback:
+        feedback = await build_ai_style_feedback(reference_text, recognized, report)
+
+    return {
+        "reference_text": reference_text,
+        "stt": stt_res,
+        "reference_ipa": reference_ipa,
+        "recognized_ipa": recognized_ipa,
+        "report": report,
+        "ai_feedback": feedback,
+        "processing_ms": now_ms() - t0,
+        "timings": timings_snapshot() if timings_requested(request.query_params) else None,
+    }
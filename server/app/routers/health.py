@@ -1,17 +1,44 @@
+import os
 from fastapi import APIRouter
+from app.common_utils import process_memory, child_pids
 from app.schemas import HealthResponse
 from app.config import API_VERSION, MODEL_NAME
-from app.services.whisper_svc import is_ready, ready_error, device_name
+from app.services.inference import is_ready, ready_error, device_name, status, worker_pids
 
 router = APIRouter()
 
+def process_memory_breakdown():
+    """
+    이 서버를 이루는 프로세스들의 메모리 (/proc 스캔 + 프로세스마다 smaps 읽기라 /health?memory=1, /metrics에서만).
+    app.serve로 띄웠으면 부모(가중치 preload) + fork된 모든 uvicorn 워커,
+    아니면 이 프로세스 + 추론 워커 프로세스
+    """
+    parent = os.getenv("PRELOAD_PARENT_PID")
+    if parent:
+        procs = [(int(parent), "preload")] + [(pid, "http") for pid in child_pids(int(parent))]
+    else:
+        procs = [(os.getpid(), "http")] + [(pid, "inference") for pid in worker_pids()]
+    out = []
+    for pid, role in procs:
+        mem = process_memory(pid)
+        if mem is not None:
+            out.append(dict(mem, role=role, current=(pid == os.getpid())))
+    return out or None
+
 @router.get("/health", response_model=HealthResponse)
-def health():
+def health(memory: bool = False):
+    """liveness/readiness probe. memory=1이면 프로세스별 메모리(workers)도 같이"""
     ok = is_ready()
+    st = status()
     return HealthResponse(
         ready=ok,
+        status=st["status"],
+        progress=st["progress"],
+        load_ms=st["load_ms"],
+        warmup_ms=st["warmup_ms"],
         model=MODEL_NAME,
         device=device_name(),
         version=API_VERSION,
-        error=None if ok else ready_error()
+        error=None if ok else ready_error(),
+        workers=process_memory_breakdown() if memory else None,
     )
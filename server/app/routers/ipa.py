@@ -1,13 +1,23 @@
+from typing import List
 from fastapi import APIRouter
-from pydantic import BaseModel
-from app.utils.ipa_converter import text_to_ipa
+from pydantic import BaseModel, Field
+from app.config import IPA_BATCH_MAX
+from app.utils.ipa_converter import text_to_ipa, text_to_ipa_many
 
 router = APIRouter(prefix="/ipa", tags=["IPA"])
 
 class IpaRequest(BaseModel):
     text: str
 
+class IpaBatchRequest(BaseModel):
+    texts: List[str] = Field(..., max_length=IPA_BATCH_MAX)
+
 @router.post("/")
 def convert_ipa(req: IpaRequest):
     result = text_to_ipa(req.text)
     return result
+
+@router.post("/batch")
+def convert_ipa_batch(req: IpaBatchRequest):
+    # 연습 화면의 문장 목록을 한 번에 변환 (요청 왕복 1회)
+    return {"results": text_to_ipa_many(req.texts)}
@@ -0,0 +1,64 @@
+from typing import Any, Dict, List, Optional
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.routers.health import process_memory_breakdown
+from app.services import inference, metrics, viseme
+from app.services.llm_feedback import feedback_client
+from app.services.stt_cache import transcript_cache
+from app.utils import ipa_index
+from app.utils.ipa_converter import converter_stats
+
+router = APIRouter(tags=["Metrics"])
+
+
+def _cache_stats() -> Dict[str, Optional[Dict[str, Any]]]:
+    ipa = converter_stats() or {}
+    return {
+        "stt_transcript": transcript_cache.stats(),
+        "llm_feedback": feedback_client.stats(),
+        "ipa_sentence": ipa.get("sentences"),
+        "ipa_word": ipa.get("words"),
+        "ipa_index": ipa_index.stats(),
+        "viseme_units": viseme._units_cache.stats(),
+        "viseme_track": viseme._track_cache.stats(),
+    }
+
+
+def _cache_lines() -> List[str]:
+    stats = {name: s for name, s in _cache_stats().items() if s is not None}
+    series = lambda field: [({"cache": name}, s.get(field, 0)) for name, s in stats.items()]
+    return (
+        metrics.gauge_lines("kotalk_cache_hits_total", "Cache hits", series("hits"), kind="counter")
+        + metrics.gauge_lines("kotalk_cache_misses_total", "Cache misses", series("misses"), kind="counter")
+        + metrics.gauge_lines("kotalk_cache_entries", "Entries currently cached", series("entries"))
+        + metrics.gauge_lines("kotalk_cache_hit_ratio", "Cache hits / lookups since start", series("hit_rate"))
+    )
+
+
+def _model_lines() -> List[str]:
+    st = inference.status()
+    return (
+        metrics.gauge_lines("kotalk_model_ready", "1 when the ASR model is loaded and warmed up",
+                            [({}, 1 if inference.is_ready() else 0)])
+        + metrics.gauge_lines("kotalk_model_load_progress", "Model load/warmup progress (0-1)",
+                              [({}, st.get("progress") or 0)])
+    )
+
+
+def _memory_lines() -> List[str]:
+    procs = process_memory_breakdown() or []
+    mb = 1024 * 1024
+    return metrics.gauge_lines("kotalk_process_memory_bytes", "Memory per server process (rss / pss / shared)",
+                               [({"pid": str(p["pid"]), "role": p["role"], "kind": kind}, p[f"{kind}_mb"] * mb)
+                                for p in procs for kind in ("rss", "pss", "shared")])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Prometheus text format.
+    단계별 지연(kotalk_stage_seconds: upload/decode/vad/inference/asr_model/postprocess/ipa/score/llm),
+    요청 지연, 추론 큐 대기, 배치 크기, 실시간 배율(RTF), 캐시 적중률, 프로세스별 메모리
+    """
+    body = metrics.render(_cache_lines() + _model_lines() + _memory_lines())
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
@@ -1,11 +1,14 @@
-import os, tempfile
-from fastapi import APIRouter, UploadFile, File, Form, Request, HTTPException
+import json
+from fastapi import APIRouter, Request, HTTPException, WebSocket
 from fastapi.responses import JSONResponse
+from app.common_utils import ApiError
 from app.schemas import STTResponse, ErrorResponse
-from app.config import API_VERSION, MAX_BYTES
-from app.common_utils import now_ms, normalize_text
-from app.services.audio import ensure_supported_mime, to_standard_wav, enforce_limits
-from app.services.whisper_svc import is_ready, transcribe_wav
+from app.services.upload import read_audio_upload
+from app.services import inference
+from app.services.stt_cache import transcript_cache
+from app.services.stt_pipeline import stt_from_bytes
+from app.services.stt_stream import StreamSession, StreamLimitError
+from app.services.metrics import timings_requested, timings_snapshot
 
 router = APIRouter()
 
@@ -14,75 +17,99 @@ def error_response(code: str, message: str, status: int = 400, hint: str = None,
         "error": {"code": code, "message": message, "hint": hint, "details": details}
     })
 
-@router.post("/stt", response_model=STTResponse, responses={400: {"model": ErrorResponse}})
-async def stt(
-    request: Request,
-    audio: UploadFile = File(...),
-    language: str = Form("ko"),
-    timestamps: str = Form("word")
-):
-    if not is_ready():
+# multipart 본문을 직접 스트리밍 파싱하므로 OpenAPI 문서용 스키마는 수동 지정
+STT_FORM_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {"multipart/form-data": {"schema": {
+            "type": "object",
+            "required": ["audio"],
+            "properties": {
+                "audio": {"type": "string", "format": "binary"},
+                "language": {"type": "string", "default": "ko"},
+                "timestamps": {"type": "string", "default": "word"},
+            },
+        }}},
+    }
+}
+
+@router.post("/stt", response_model=STTResponse, responses={400: {"model": ErrorResponse}}, openapi_extra=STT_FORM_SCHEMA)
+async def stt(request: Request):
+    if not inference.is_ready():
         return error_response("MODEL_NOT_READY", "Model not loaded yet", 503)
 
-    # Content-Length(옵션): 큰 파일 사전 차단
-    cl = request.headers.get("content-length")
-    if cl and int(cl) > MAX_BYTES:
-        return error_response("PAYLOAD_TOO_LARGE", f"Payload exceeds {MAX_BYTES} bytes", 413)
+    # 청크 단위로 받으면서 바이트/길이 한도 초과 시 즉시 413 (전체 버퍼링 전에)
+    upload = await read_audio_upload(request)
+    language = upload.fields.get("language", "ko")
+    timestamps = upload.fields.get("timestamps", "word")
 
-    if not ensure_supported_mime(audio.content_type or ""):
-        return error_response("UNSUPPORTED_MEDIA_TYPE", "Only webm/wav/m4a/mp4/aac supported", 415)
+    try:
+        # 메모리에서 바로 16kHz mono PCM 디코드 + 샘플 수로 길이 계산
+        # 같은 오디오/옵션이면 캐시 또는 처리 중인 요청 결과를 재사용
+        # 아니면 스케줄러가 동시 요청을 모아 배치 추론 (이벤트 루프는 막지 않음)
+        res = await stt_from_bytes(upload.data, language, timestamps)
+        if timings_requested(request.query_params):
+            res.timings = timings_snapshot()
+        return res
 
-    # 업로드 파일 임시 저장
-    tmp_in = tempfile.mktemp(suffix=os.path.splitext(audio.filename or ".dat")[1])
-    with open(tmp_in, "wb") as f:
-        f.write(await audio.read())
+    except (HTTPException, ApiError):
+        raise
+    except Exception as e:
+        return error_response("SERVER_ERROR", f"Unexpected server error: {e}", 500)
 
-    try:
-        # 표준 WAV 변환 + 길이 측정
-        tmp_wav, duration_s = to_standard_wav(tmp_in)
-        enforce_limits(duration_s, int(cl) if cl else 0)
 
-        t0 = now_ms()
-        result = transcribe_wav(tmp_wav, language=language, want_word_ts=(timestamps == "word"))
-        t1 = now_ms()
+@router.get("/stt/cache")
+def stt_cache_stats():
+    """전사 캐시 크기/적중률 (캐시 예산 조정용)"""
+    return transcript_cache.stats()
 
-        raw_text = result.get("text", "") or ""
-        norm_text = normalize_text(raw_text)
 
-        words = []
-        # Whisper의 word timestamps는 segments[*].words[*]에 존재
-        if timestamps == "word":
-            for seg in result.get("segments", []):
-                for w in seg.get("words", []):
-                    wtext = (w.get("word") or "").strip()
-                    if not wtext:
-                        continue
-                    words.append({
-                        "word": wtext,
-                        "start": round(float(w.get("start", 0.0)), 2),
-                        "end": round(float(w.get("end", 0.0)), 2),
-                    })
+def _is_stop(text: str) -> bool:
+    if text.strip() == "stop":
+        return True
+    try:
+        return json.loads(text).get("type") == "stop"
+    except (ValueError, AttributeError):
+        return False
 
-        return STTResponse(
-            rawText=raw_text,
-            normText=norm_text,
-            words=words,
-            duration=round(float(duration_s), 2),
-            processing_ms=int(t1 - t0),
-            language=language if language != "auto" else (result.get("language") or "auto"),
-            model=result.get("model", "unknown"),
-            version=API_VERSION
-        )
+@router.websocket("/stt/stream")
+async def stt_stream(ws: WebSocket, language: str = "ko", format: str = "webm"):
+    """
+    말하는 동안 오디오 청크를 받아 partial 전사를 보내고, 끝나면 STTResponse 형태의 final을 보낸다.
+    - 클라이언트 → 서버: binary 프레임(MediaRecorder webm 청크, 또는 format=pcm16이면 16kHz mono s16le),
+      녹음 종료 시 텍스트 "stop" 또는 {"type": "stop"}
+    - 서버 → 클라이언트: {"type": "partial", ...} 여러 번, 마지막에 {"type": "final", ...STTResponse}
+      오류 시 {"type": "error", "error": {"code", "message"}}
+    """
+    await ws.accept()
+    if not inference.is_ready():
+        await ws.send_json({"type": "error", "error": {"code": "MODEL_NOT_READY", "message": "Model not loaded yet"}})
+        await ws.close(code=1013)
+        return
 
-    except HTTPException:
-        raise
+    session = StreamSession(language, ws.send_json, fmt=format)
+    try:
+        await session.start()
+        while True:
+            msg = await ws.receive()
+            if msg["type"] == "websocket.disconnect":
+                session.abort()
+                return
+            if msg.get("bytes"):
+                await session.feed(msg["bytes"])
+            elif msg.get("text") is not None and _is_stop(msg["text"]):
+                break
+
+        await ws.send_json(await session.finish())
+        await ws.close()
+    except StreamLimitError as e:
+        session.abort()
+        await ws.send_json({"type": "error", "error": {"code": "PAYLOAD_TOO_LARGE", "message": str(e)}})
+        await ws.close(code=1009)
     except Exception as e:
-        return error_response("SERVER_ERROR", f"Unexpected server error: {e}", 500)
-    finally:
-        # 임시 파일 정리
-        try:
-            if os.path.exists(tmp_in): os.remove(tmp_in)
-        except: pass
+        session.abort()
         try:
-            if os.path.exists(tmp_wav): os.remove(tmp_wav)
-        except: pass
+            await ws.send_json({"type": "error", "error": {"code": "SERVER_ERROR", "message": f"Unexpected server error: {e}"}})
+            await ws.close(code=1011)
+        except Exception:
+            pass
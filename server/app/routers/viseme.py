@@ -0,0 +1,48 @@
+from typing import List, Optional
+from fastapi import APIRouter
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
+from app.common_utils import ApiError
+from app.config import VISEME_FPS, VISEME_MAX_FPS
+from app.schemas import WordStamp, ErrorResponse
+from app.services.viseme import viseme_track
+
+router = APIRouter(tags=["Viseme"])
+
+
+class VisemeRequest(BaseModel):
+    text: str = ""
+    duration_sec: Optional[float] = Field(None, ge=0)
+    words: Optional[List[WordStamp]] = None
+    fps: int = Field(VISEME_FPS, ge=1, le=VISEME_MAX_FPS)
+
+
+class VisemeSegment(BaseModel):
+    start: float
+    end: float
+    viseme: str
+    ipa: str
+    char: str
+
+
+class VisemeResponse(BaseModel):
+    text: str
+    fps: int
+    duration: float
+    segments: List[VisemeSegment]
+    frames: List[str]
+
+
+@router.post("/viseme", response_model=VisemeResponse, responses={422: {"model": ErrorResponse}})
+async def viseme(req: VisemeRequest):
+    """
+    아바타용 입모양 타임라인 (Gooey 원격 립싱크 없이 CPU에서 바로).
+    - words: /stt 단어 타임스탬프 → 실제 발화 시간에 맞춤
+    - text + duration_sec: 기준 문장을 그 길이에 맞춰 배치 (같은 문장은 캐시)
+    viseme 이름은 front-end ipaToMouthGroup.ts의 MouthGroup (public/mouth/*.png)
+    """
+    if not req.words and not (req.text.strip() and req.duration_sec):
+        raise ApiError(422, "MISSING_FIELD", "Provide words (from /stt) or text with duration_sec")
+    words = [w.model_dump() for w in req.words] if req.words else None
+    # 처음 보는 문장은 g2pk 변환이 필요할 수 있음 → threadpool
+    return await run_in_threadpool(viseme_track, req.text, req.duration_sec or 0.0, words, req.fps)
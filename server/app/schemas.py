@@ -11,10 +11,12 @@ class STTResponse(BaseModel):
     normText: str
     words: List[WordStamp]
     duration: float
+    speech_duration: Optional[float] = None  # 앞뒤 무음을 뺀 실제 발화 길이(s), 유창성 계산용
     processing_ms: int
     language: str
     model: str
     version: str
+    timings: Optional[Dict[str, Any]] = None  # ?timings=1 일 때 단계별 ms (upload/decode/vad/queue_wait/inference ...)
 
 class ErrorBody(BaseModel):
     code: str
@@ -27,7 +29,13 @@ class ErrorResponse(BaseModel):
 
 class HealthResponse(BaseModel):
     ready: bool
+    status: str = "ready"              # loading / warming / ready / error
+    progress: float = 1.0              # 0~1 (가중치 로드 + 워밍업 단계 기준)
+    load_ms: Optional[int] = None      # 모델 로드 시간
+    warmup_ms: Optional[int] = None    # 워밍업 추론 시간
     model: str
     device: str
     version: str
     error: Optional[str] = None
+    # 프로세스별 메모리 (MB): [{pid, role, rss_mb, pss_mb, shared_mb}], /proc 없으면 None
+    workers: Optional[List[Dict[str, Any]]] = None
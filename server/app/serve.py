@@ -0,0 +1,145 @@
+"""
+모델 가중치를 한 번만 로드하고 여러 uvicorn 워커가 공유하는 실행기 (Linux, fork 기반).
+
+    python -m app.serve --host 0.0.0.0 --port 8000 --workers 4
+
+`uvicorn --workers N`은 워커마다 lifespan에서 모델을 따로 로드해서 메모리가 워커 수만큼 늘어난다.
+여기서는 부모가 가중치를 로드하고 리슨 소켓을 연 다음 fork하므로, 가중치 페이지는 copy-on-write로
+모든 워커가 공유한다 (추론은 가중치를 읽기만 함). 워커별 RSS/PSS는 /health?memory=1의 workers 또는 /metrics에서 확인.
+"""
+import argparse, gc, os, signal, socket, sys, time
+
+RESTART_DELAY_S = 1.0
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _child(index: int, cores, app, sock: socket.socket, host: str, port: int):
+    """
+    fork된 워커: 코어 고정 + 스레드 수 지정 후 공유 소켓으로 uvicorn 실행.
+    어떤 경우에도 os._exit로 끝낸다 (예외가 부모의 spawn 루프로 돌아가서 자식이 워커를 또 fork하지 않게)
+    """
+    code = 1
+    try:
+        if cores and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cores)
+        n_threads = max(1, len(cores))
+        try:
+            import torch
+            torch.set_num_threads(n_threads)
+        except ImportError:
+            pass
+
+        import uvicorn
+        config = uvicorn.Config(app, host=host, port=port, log_level="info")
+        server = uvicorn.Server(config)
+        print(f"[serve] worker{index} pid={os.getpid()} cores={cores}")
+        server.run(sockets=[sock])
+        code = 0
+    except BaseException as e:
+        print(f"[serve] worker{index} pid={os.getpid()} crashed: {e!r}", file=sys.stderr)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preload model weights once and fork uvicorn workers")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=0, help="0이면 사용 가능한 코어 수")
+    args = parser.parse_args(argv)
+
+    if not hasattr(os, "fork"):
+        sys.exit("app.serve requires fork(); use uvicorn directly on this platform")
+
+    # app.config를 읽기 전에 설정: 각 워커가 자기 프로세스 안에서 추론 (워커 프로세스 풀과 같이 쓰지 않음)
+    os.environ["INFERENCE_WORKERS"] = "0"
+    os.environ.setdefault("PRELOAD_PARENT_PID", str(os.getpid()))
+
+    cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+    n = args.workers or len(cores)
+    per = max(1, len(cores) // n)
+
+    # 부모에서는 병렬 연산 스레드 풀을 만들지 않는다 (fork 후 자식에서 OpenMP가 멈추는 문제 방지)
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+
+    from app.services import whisper_svc
+    try:
+        whisper_svc.preload()
+        print(f"[serve] weights loaded in {whisper_svc.status()['load_ms']}ms, forking {n} workers")
+    except Exception as e:
+        # 워커가 각자 다시 로드를 시도하고 /health에 오류를 보고
+        print(f"[serve] preload failed: {e}")
+    # 앱 모듈과 발음 변환기/인덱스도 fork 전에 준비해서 같이 공유 (lifespan의 호출은 이미 있으면 그대로 사용)
+    from app.config import IPA_INDEX_PATH
+    from app.main import app
+    from app.utils.ipa_converter import init_converter
+    from app.utils.ipa_index import open_index
+    if open_index(IPA_INDEX_PATH) is None:
+        try:
+            init_converter()
+        except Exception as e:
+            print(f"[serve] ipa converter preload failed, workers will load it lazily: {e!r}")
+    # 로드된 객체를 GC 추적 대상에서 빼서 자식의 GC가 공유 페이지를 건드리지(복사하지) 않게
+    gc.freeze()
+
+    sock = _bind(args.host, args.port)
+    children = {}
+
+    def spawn(index: int):
+        my_cores = [cores[(index * per + k) % len(cores)] for k in range(per)]
+        pid = os.fork()
+        if pid == 0:
+            _child(index, my_cores, app, sock, args.host, args.port)
+        children[pid] = index
+
+    for i in range(n):
+        spawn(i)
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # 죽은 워커는 (가중치를 가진) 부모에서 다시 fork
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = children.pop(pid, None)
+        if index is None or stopping:
+            continue
+        print(f"[serve] worker{index} pid={pid} exited (status={status}), restarting")
+        time.sleep(RESTART_DELAY_S)
+        spawn(index)
+    sock.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional
+from app.config import MODEL_NAME, LANGUAGE_DEFAULT, ASR_COMPUTE_TYPE, ASR_STUB_RTF, ASR_STUB_TEXT
+from app.services.forced_align import forced_result
+
+# transcribe()의 temperature fallback 기준과 동일
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+class AsrBackend:
+    """
+    ASR 엔진 공통 인터페이스. 어떤 엔진이든 결과 모양은 openai-whisper transcribe()와 같다:
+    {"text", "segments": [{"start", "end", "text", "words": [{"word", "start", "end"}]}], "language"}
+    """
+    name = "base"
+    device = "cpu"
+    supports_reference = False   # score_reference (기준 문장 강제 정렬) 지원 여부
+
+    def load(self):
+        raise NotImplementedError
+
+    def transcribe(self, audio: np.ndarray, language: str = LANGUAGE_DEFAULT, want_word_ts: bool = True) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: str = LANGUAGE_DEFAULT,
+                         want_word_ts: bool = True) -> List[Dict[str, Any]]:
+        """배치 경로가 없는 엔진은 한 건씩"""
+        return [self.transcribe(a, language=language, want_word_ts=want_word_ts) for a in audios]
+
+    def score_reference(self, audio: np.ndarray, reference_text: str, language: str = LANGUAGE_DEFAULT) -> Dict[str, Any]:
+        """기준 문장을 디코더에 강제로 넣어 토큰/단어/음절별 log-likelihood 계산 (forced_align.forced_result 모양)"""
+        raise NotImplementedError(f"ASR backend '{self.name}' does not support reference scoring")
+
+
+class WhisperBackend(AsrBackend):
+    """openai-whisper PyTorch (GPU 있으면 fp16, 없으면 fp32)"""
+    name = "whisper"
+    supports_reference = True
+
+    def __init__(self):
+        import torch
+        self.model = None
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+
+    def load(self):
+        import whisper
+        self.model = whisper.load_model(MODEL_NAME, device=self.device)
+
+    def transcribe(self, audio: np.ndarray, language: str = LANGUAGE_DEFAULT, want_word_ts: bool = True) -> Dict[str, Any]:
+        """audio는 16kHz mono float32 배열 (ffmpeg 재실행 없음)"""
+        return self.model.transcribe(
+            audio,
+            language=language if language != "auto" else None,
+            word_timestamps=want_word_ts,
+            fp16=self.device == "cuda",
+        )
+
+    def _mel_segment(self, audio: np.ndarray):
+        """30초 창 하나짜리 log-mel (transcribe()와 같은 방식으로 패딩)"""
+        import torch
+        from whisper.audio import N_SAMPLES, N_FRAMES, HOP_LENGTH, log_mel_spectrogram, pad_or_trim
+        mel = log_mel_spectrogram(torch.from_numpy(np.ascontiguousarray(audio)), self.model.dims.n_mels, padding=N_SAMPLES)
+        num_frames = len(audio) // HOP_LENGTH
+        return pad_or_trim(mel[:, :num_frames], N_FRAMES), num_frames
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: str = LANGUAGE_DEFAULT,
+                         want_word_ts: bool = True) -> List[Dict[str, Any]]:
+        """
+        여러 클립을 한 번의 encoder/decoder 패스로 처리.
+        - 30초 이하 클립: mel을 (N, n_mels, 3000) 텐서로 쌓아서 whisper.decode 1회 (greedy, temperature 0)
+        - 30초 초과 클립 또는 품질 기준 미달(반복/저확률) 결과: 단건 transcribe()로 재처리
+        """
+        import torch
+        from whisper.audio import N_SAMPLES, SAMPLE_RATE
+        from whisper.decoding import DecodingOptions, decode
+        from whisper.timing import add_word_timestamps
+        from whisper.tokenizer import get_tokenizer
+
+        results: List[Dict[str, Any]] = [None] * len(audios)
+        short = [i for i, a in enumerate(audios) if 0 < len(a) <= N_SAMPLES]
+        for i in range(len(audios)):
+            if i not in short:
+                results[i] = self.transcribe(audios[i], language=language, want_word_ts=want_word_ts)
+        if len(short) == 1:
+            i = short[0]
+            results[i] = self.transcribe(audios[i], language=language, want_word_ts=want_word_ts)
+            return results
+        if not short:
+            return results
+
+        model = self.model
+        fp16 = self.device == "cuda"
+        mels, frames = zip(*(self._mel_segment(audios[i]) for i in short))
+        mel_batch = torch.stack(mels).to(model.device).to(torch.float16 if fp16 else torch.float32)
+        options = DecodingOptions(
+            task="transcribe",
+            language=language if language != "auto" else None,
+            temperature=0.0,
+            without_timestamps=True,
+            fp16=fp16,
+        )
+        decoded = decode(model, mel_batch, options)
+
+        for k, i in enumerate(short):
+            res = decoded[k]
+            needs_fallback = (res.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                              or res.avg_logprob < LOGPROB_THRESHOLD)
+            is_silence = res.no_speech_prob > NO_SPEECH_THRESHOLD and res.avg_logprob < LOGPROB_THRESHOLD
+            if needs_fallback and not is_silence:
+                results[i] = self.transcribe(audios[i], language=language, want_word_ts=want_word_ts)
+                continue
+
+            text = "" if is_silence else res.text
+            tokens = [] if is_silence else list(res.tokens)
+            segments = []
+            if tokens:
+                segments.append({
+                    "id": 0, "seek": 0,
+                    "start": 0.0, "end": round(len(audios[i]) / SAMPLE_RATE, 3),
+                    "text": text, "tokens": tokens, "temperature": 0.0,
+                    "avg_logprob": res.avg_logprob, "compression_ratio": res.compression_ratio,
+                    "no_speech_prob": res.no_speech_prob,
+                })
+                if want_word_ts:
+                    tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                              language=res.language, task="transcribe")
+                    add_word_timestamps(segments=segments, model=model, tokenizer=tokenizer,
+                                        mel=mels[k].to(mel_batch.device, mel_batch.dtype), num_frames=frames[k],
+                                        last_speech_timestamp=0.0)
+            results[i] = {"text": text, "segments": segments, "language": res.language}
+        return results
+
+    def score_reference(self, audio: np.ndarray, reference_text: str, language: str = LANGUAGE_DEFAULT) -> Dict[str, Any]:
+        """
+        encoder 1회 + 기준 문장 토큰을 teacher forcing한 decoder 1회 (빔 서치/temperature fallback 없음).
+        같은 패스에서 cross-attention으로 단어 시간도 구한다 (whisper.timing.find_alignment)
+        """
+        import torch
+        from whisper.audio import N_SAMPLES, SAMPLE_RATE
+        from whisper.timing import find_alignment
+        from whisper.tokenizer import get_tokenizer
+
+        if len(audio) > N_SAMPLES:
+            raise ValueError("Reference scoring supports clips up to 30 seconds")
+        model = self.model
+        tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages,
+                                  language=language if language != "auto" else LANGUAGE_DEFAULT, task="transcribe")
+        text_tokens = tokenizer.encode(" " + reference_text.strip())
+        mel, num_frames = self._mel_segment(audio)
+        mel = mel.to(model.device)
+
+        # find_alignment 내부의 forward 결과(logits)를 hook으로 받아 토큰 logprob 계산 → 추가 패스 없음
+        captured = []
+        hook = model.decoder.register_forward_hook(lambda _m, _i, out: captured.append(out))
+        try:
+            timings = find_alignment(model, tokenizer, text_tokens, mel, num_frames)
+        finally:
+            hook.remove()
+        logits = captured[-1][0].float()
+        # [sot..., no_timestamps, text..., eot] 중 no_timestamps 위치부터가 text 토큰 예측
+        start = len(tokenizer.sot_sequence)
+        logprobs = torch.log_softmax(logits[start:start + len(text_tokens), :tokenizer.eot], dim=-1)
+        token_lps = logprobs[torch.arange(len(text_tokens)), torch.tensor(text_tokens)].tolist()
+
+        token_bytes = [tokenizer.encoding.decode_single_token_bytes(t) for t in text_tokens]
+        words = [{"word": t.word, "start": t.start, "end": t.end, "n_tokens": len(t.tokens)} for t in timings]
+        return forced_result(token_bytes, token_lps, words, len(audio) / SAMPLE_RATE, tokenizer.language)
+
+
+class WhisperInt8Backend(WhisperBackend):
+    """
+    openai-whisper + torch 동적 양자화: Linear 가중치를 int8로 (CPU 전용).
+    GPU 없는 서버에서 fp32 대비 지연/메모리가 크게 줄고 결과 모양은 그대로
+    """
+    name = "whisper-int8"
+
+    def __init__(self):
+        self.model = None
+        self.device = "cpu"
+
+    def load(self):
+        import torch, whisper
+        model = whisper.load_model(MODEL_NAME, device="cpu")
+        # whisper.model.Linear는 forward에서 dtype만 맞춰주는 nn.Linear 서브클래스.
+        # quantize_dynamic은 정확한 타입(nn.Linear)만 변환하므로 CPU fp32에서 동작이 같은 nn.Linear로 되돌린다
+        for m in model.modules():
+            if isinstance(m, whisper.model.Linear):
+                m.__class__ = torch.nn.Linear
+        self.model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _segments_to_result(segments, language: Optional[str]) -> Dict[str, Any]:
+    """faster-whisper Segment/Word 객체 → openai-whisper transcribe() 결과 모양"""
+    out = []
+    for seg in segments:
+        out.append({
+            "id": seg.id, "start": seg.start, "end": seg.end, "text": seg.text,
+            "avg_logprob": seg.avg_logprob, "no_speech_prob": seg.no_speech_prob,
+            "words": [{"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                      for w in (seg.words or [])],
+        })
+    return {"text": "".join(s["text"] for s in out), "segments": out, "language": language}
+
+
+class FasterWhisperBackend(AsrBackend):
+    """
+    faster-whisper (CTranslate2). CPU 기본 int8, GPU면 float16. ASR_COMPUTE_TYPE로 변경 가능.
+    MODEL_NAME은 같은 이름(base, small, ...) 또는 변환된 모델 경로
+    """
+    name = "faster-whisper"
+
+    def __init__(self):
+        self.model = None
+        self.device = "cpu"
+
+    def load(self):
+        import ctranslate2
+        from faster_whisper import WhisperModel
+        self.device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        compute_type = ASR_COMPUTE_TYPE or ("float16" if self.device == "cuda" else "int8")
+        self.model = WhisperModel(MODEL_NAME, device=self.device, compute_type=compute_type)
+
+    def transcribe(self, audio: np.ndarray, language: str = LANGUAGE_DEFAULT, want_word_ts: bool = True) -> Dict[str, Any]:
+        segments, info = self.model.transcribe(
+            audio,
+            language=language if language != "auto" else None,
+            word_timestamps=want_word_ts,
+            beam_size=1,        # openai-whisper transcribe() 기본과 같은 greedy
+            vad_filter=False,   # VAD는 파이프라인에서 이미 처리
+        )
+        return _segments_to_result(list(segments), info.language)
+
+
+class StubBackend(AsrBackend):
+    """
+    모델 없는 벤치마크용 엔진: 업로드/디코드/스케줄러/캐시 등 나머지 경로의 오버헤드만 재기 위함.
+    오디오 1초당 ASR_STUB_RTF초 대기(배치는 가장 긴 클립 기준) 후 ASR_STUB_TEXT를 오디오 길이에 고르게 배치
+    """
+    name = "stub"
+
+    def __init__(self, text: str = ASR_STUB_TEXT, rtf: float = ASR_STUB_RTF):
+        self.text = text
+        self.rtf = rtf
+
+    def load(self):
+        pass
+
+    def _result(self, audio: np.ndarray, language: str, want_word_ts: bool) -> Dict[str, Any]:
+        dur = len(audio) / 16000
+        words = self.text.split()
+        step = dur / len(words) if words else 0.0
+        seg = {"id": 0, "start": 0.0, "end": round(dur, 3), "text": " " + self.text}
+        if want_word_ts:
+            seg["words"] = [{"word": " " + w, "start": round(i * step, 3), "end": round((i + 1) * step, 3)}
+                            for i, w in enumerate(words)]
+        return {"text": " " + self.text, "segments": [seg],
+                "language": language if language != "auto" else LANGUAGE_DEFAULT}
+
+    def transcribe(self, audio: np.ndarray, language: str = LANGUAGE_DEFAULT, want_word_ts: bool = True) -> Dict[str, Any]:
+        if self.rtf > 0:
+            time.sleep(len(audio) / 16000 * self.rtf)
+        return self._result(audio, language, want_word_ts)
+
+    def transcribe_batch(self, audios: List[np.ndarray], language: str = LANGUAGE_DEFAULT,
+                         want_word_ts: bool = True) -> List[Dict[str, Any]]:
+        if self.rtf > 0 and audios:
+            time.sleep(max(len(a) for a in audios) / 16000 * self.rtf)
+        return [self._result(a, language, want_word_ts) for a in audios]
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    WhisperInt8Backend.name: WhisperInt8Backend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+def create_backend(name: str) -> AsrBackend:
+    cls = BACKENDS.get(name)
+    if cls is None:
+        raise ValueError(f"Unknown ASR_BACKEND '{name}' (choose from: {', '.join(BACKENDS)})")
+    return cls()
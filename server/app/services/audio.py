@@ -1,42 +1,389 @@
-import os, subprocess, tempfile
-from pydub import AudioSegment
-from typing import Tuple
+import subprocess, tempfile, struct
+import numpy as np
+from typing import List, Tuple, Optional
+from app.common_utils import ApiError
 from app.config import MAX_SECONDS
+from app.services.metrics import stage
 
 SUPPORTED_MIME = {"audio/webm", "audio/wav", "audio/x-wav", "audio/m4a", "audio/mp4", "audio/aac"}
 
+# Whisper 입력 규격: 16kHz mono float32
+SAMPLE_RATE = 16000
+
 def ensure_supported_mime(mime: str) -> bool:
     return mime in SUPPORTED_MIME
 
-def webm_to_wav16k(in_path: str, out_path: str) -> None:
-    # ffmpeg로 16kHz mono PCM wav
-    cmd = [
-        "ffmpeg", "-y", "-i", in_path,
-        "-ac", "1", "-ar", "16000", "-f", "wav", out_path
+def _ffmpeg_pcm_cmd(src: str) -> list:
+    # ffmpeg로 16kHz mono float32 raw PCM을 stdout으로 출력
+    return [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", src,
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "f32le", "-acodec", "pcm_f32le", "pipe:1"
     ]
-    subprocess.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
 
-def get_duration_seconds(path: str) -> float:
-    # pydub으로 길이(ms) → s
-    audio = AudioSegment.from_file(path)
-    return round(len(audio) / 1000.0, 2)
+def _is_mp4_family(data: bytes) -> bool:
+    # ISO BMFF(m4a/mp4): 4~8 바이트에 'ftyp' 박스
+    return len(data) >= 12 and data[4:8] == b"ftyp"
+
+def sniff_container(data: bytes) -> str:
+    """헤더 매직 바이트로 컨테이너 종류 추정: wav / webm / mp4 / ogg / unknown"""
+    if len(data) >= 12 and data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "wav"
+    if data[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if _is_mp4_family(data):
+        return "mp4"
+    if data[:4] == b"OggS":
+        return "ogg"
+    return "unknown"
+
+# ==========================
+# WAV in-process 파싱 (ffmpeg 생략)
+# ==========================
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+def parse_wav_header(data: bytes) -> Optional[dict]:
+    """
+    RIFF 청크를 훑어서 fmt 정보와 data 청크 위치를 반환.
+    지원하지 않는 형식이면 None (→ ffmpeg로 처리)
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    pos, fmt = 12, None
+    while pos + 8 <= len(data):
+        cid, size = data[pos:pos + 4], struct.unpack_from("<I", data, pos + 4)[0]
+        body = pos + 8
+        if cid == b"fmt " and body + 16 <= len(data):
+            tag, channels, rate, byte_rate, block_align, bits = struct.unpack_from("<HHIIHH", data, body)
+            if tag == WAVE_FORMAT_EXTENSIBLE and size >= 40 and body + 26 <= len(data):
+                # SubFormat GUID의 앞 2바이트가 실제 format tag
+                tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = {"tag": tag, "channels": channels, "rate": rate,
+                   "byte_rate": byte_rate, "block_align": block_align, "bits": bits}
+        elif cid == b"data":
+            if fmt is None or fmt["channels"] == 0 or fmt["block_align"] == 0:
+                return None
+            # 스트리밍으로 쓰인 WAV는 size가 0 / 0xFFFFFFFF 일 수 있음 → 남은 바이트 사용
+            fmt["declared_size"] = size
+            avail = len(data) - body
+            if size == 0 or size > avail:
+                size = avail
+            fmt["data_offset"] = body
+            fmt["data_size"] = size - size % fmt["block_align"]
+            return fmt
+        pos = body + size + (size & 1)  # 청크는 2바이트 정렬
+    return None
+
+def _wav_samples(data: bytes, fmt: dict) -> Optional[np.ndarray]:
+    """data 청크를 float32 [-1, 1] 배열 (frames, channels)로. 미지원 형식은 None"""
+    tag, bits, ch = fmt["tag"], fmt["bits"], fmt["channels"]
+    off, size = fmt["data_offset"], fmt["data_size"]
+
+    if tag == WAVE_FORMAT_PCM and bits == 16:
+        # 헤더 뒤 버퍼를 그대로 보는 view (복사 없음) → float 변환 1회만
+        raw = np.frombuffer(data, dtype="<i2", count=size // 2, offset=off)
+        x = np.multiply(raw, 1.0 / 32768.0, dtype=np.float32)
+    elif tag == WAVE_FORMAT_PCM and bits == 8:
+        raw = np.frombuffer(data, dtype=np.uint8, count=size, offset=off)
+        x = np.multiply(raw.astype(np.int16) - 128, 1.0 / 128.0, dtype=np.float32)
+    elif tag == WAVE_FORMAT_PCM and bits == 24:
+        raw = np.frombuffer(data, dtype=np.uint8, count=size, offset=off).reshape(-1, 3)
+        i32 = (raw[:, 0].astype(np.int32) | (raw[:, 1].astype(np.int32) << 8)
+               | (raw[:, 2].astype(np.int32) << 16))
+        i32 = np.where(i32 & 0x800000, i32 - 0x1000000, i32)
+        x = np.multiply(i32, 1.0 / 8388608.0, dtype=np.float32)
+    elif tag == WAVE_FORMAT_PCM and bits == 32:
+        raw = np.frombuffer(data, dtype="<i4", count=size // 4, offset=off)
+        x = np.multiply(raw, 1.0 / 2147483648.0, dtype=np.float32)
+    elif tag == WAVE_FORMAT_IEEE_FLOAT and bits == 32:
+        x = np.frombuffer(data, dtype="<f4", count=size // 4, offset=off)
+    elif tag == WAVE_FORMAT_IEEE_FLOAT and bits == 64:
+        x = np.frombuffer(data, dtype="<f8", count=size // 8, offset=off).astype(np.float32)
+    else:
+        return None
+    return x.reshape(-1, ch)
+
+def _lowpass(x: np.ndarray, cutoff: float, taps: int = 101) -> np.ndarray:
+    """windowed-sinc FIR 저역통과 (cutoff: 나이퀴스트 대비 0~1). 출력 길이 = 입력 길이"""
+    n = np.arange(taps) - (taps - 1) / 2.0
+    h = cutoff * np.sinc(cutoff * n) * np.hamming(taps)
+    h /= h.sum()
+    # mode="same"은 max(len(x), taps)를 돌려주므로 taps보다 짧은 입력에서 길이가 늘어남 → full에서 x 기준 가운데만
+    start = (taps - 1) // 2
+    return np.convolve(x, h.astype(np.float32), mode="full")[start:start + len(x)].astype(np.float32)
+
+def resample(x: np.ndarray, src_rate: int, dst_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    in-process 리샘플링. 다운샘플 시 aliasing 방지용 저역통과 후
+    정수배면 decimation, 아니면 선형 보간
+    """
+    if src_rate == dst_rate or len(x) == 0:
+        return x
+    if dst_rate < src_rate:
+        x = _lowpass(x, 0.95 * dst_rate / src_rate)
+        if src_rate % dst_rate == 0:
+            return np.ascontiguousarray(x[::src_rate // dst_rate])
+    n_out = int(round(len(x) * dst_rate / float(src_rate)))
+    t = np.arange(n_out, dtype=np.float64) * (src_rate / float(dst_rate))
+    return np.interp(t, np.arange(len(x)), x).astype(np.float32)
+
+# ==========================
+# 길이 probe (앞부분 헤더만으로)
+# ==========================
+def _probe_wav(head: bytes) -> Tuple[Optional[float], bool]:
+    fmt = parse_wav_header(head)
+    if fmt is None or fmt["byte_rate"] <= 0:
+        return None, False
+    declared = fmt["declared_size"]
+    if declared not in (0, 0xFFFFFFFF):
+        return declared / float(fmt["byte_rate"]), True
+    # 크기 미기재 WAV: 지금까지 받은 양이 최소 길이
+    return (len(head) - fmt["data_offset"]) / float(fmt["byte_rate"]), False
+
+def _probe_mp4(head: bytes) -> Optional[float]:
+    # top-level 박스를 따라가다 moov > mvhd 의 timescale/duration 읽기
+    pos = 0
+    while pos + 8 <= len(head):
+        size, kind = struct.unpack_from(">I4s", head, pos)
+        hdr = 8
+        if size == 1:
+            if pos + 16 > len(head):
+                return None
+            size, hdr = struct.unpack_from(">Q", head, pos + 8)[0], 16
+        elif size == 0:
+            size = len(head) - pos
+        if size < hdr:
+            return None
+        if kind == b"moov":
+            child = pos + hdr
+            while child + 8 <= min(pos + size, len(head)):
+                csize, ckind = struct.unpack_from(">I4s", head, child)
+                if ckind == b"mvhd" and child + 40 <= len(head):
+                    version = head[child + 8]
+                    if version == 1:
+                        timescale, duration = struct.unpack_from(">IQ", head, child + 28)
+                    else:
+                        timescale, duration = struct.unpack_from(">II", head, child + 20)
+                    return duration / float(timescale) if timescale else None
+                if csize < 8:
+                    return None
+                child += csize
+            return None
+        pos += size
+    return None
+
+def _ebml_vint(buf: bytes, pos: int, strip_marker: bool) -> Tuple[Optional[int], int]:
+    if pos >= len(buf):
+        return None, pos
+    first = buf[pos]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8 or pos + length > len(buf):
+        return None, pos
+    value = first & ((0x80 >> (length - 1)) - 1) if strip_marker else first
+    for b in buf[pos + 1:pos + length]:
+        value = (value << 8) | b
+    return value, pos + length
+
+def _probe_webm(head: bytes) -> Optional[float]:
+    # Segment > Info > (TimecodeScale, Duration). MediaRecorder webm은 Duration이 없음 → None
+    SEGMENT, INFO, CLUSTER = 0x18538067, 0x1549A966, 0x1F43B675
+    TIMECODE_SCALE, DURATION = 0x2AD7B1, 0x4489
+    pos = 0
+    while pos < len(head):
+        eid, p = _ebml_vint(head, pos, strip_marker=False)
+        size, p = _ebml_vint(head, p, strip_marker=True)
+        if eid is None or size is None:
+            return None
+        if eid == SEGMENT:
+            pos = p  # 자식으로 내려감 (unknown-size 세그먼트도 OK)
+            continue
+        if eid == CLUSTER:
+            return None
+        if eid == INFO:
+            end, scale, dur = min(p + size, len(head)), 1000000, None
+            while p < end:
+                cid, q = _ebml_vint(head, p, strip_marker=False)
+                csize, q = _ebml_vint(head, q, strip_marker=True)
+                if cid is None or csize is None or q + csize > len(head):
+                    return None
+                if cid == TIMECODE_SCALE:
+                    scale = int.from_bytes(head[q:q + csize], "big")
+                elif cid == DURATION and csize in (4, 8):
+                    dur = struct.unpack(">f" if csize == 4 else ">d", head[q:q + csize])[0]
+                p = q + csize
+            return dur * scale / 1e9 if dur is not None else None
+        pos = p + size
+    return None
+
+def probe_duration(head: bytes) -> Tuple[Optional[float], bool]:
+    """
+    업로드 앞부분만 보고 길이(s)를 추정 (디코드 없음).
+    (길이, 확정여부)를 반환. 확정이 아니면 지금까지 받은 양 기준의 최소 길이.
+    알 수 없으면 (None, False)
+    """
+    kind = sniff_container(head)
+    if kind == "wav":
+        return _probe_wav(head)
+    if kind == "mp4":
+        dur = _probe_mp4(head)
+    elif kind == "webm":
+        dur = _probe_webm(head)
+    else:
+        dur = None
+    return dur, dur is not None
+
+def decode_wav_bytes(data: bytes) -> Optional[np.ndarray]:
+    """
+    WAV를 ffmpeg 없이 16kHz mono float32로. 16k/mono/PCM16이면 리샘플/다운믹스 생략.
+    처리할 수 없는 WAV면 None
+    """
+    fmt = parse_wav_header(data)
+    if fmt is None or fmt["rate"] <= 0:
+        return None
+    x = _wav_samples(data, fmt)
+    if x is None:
+        return None
+    # 다운믹스 (mono면 reshape view 그대로)
+    mono = x[:, 0] if x.shape[1] == 1 else x.mean(axis=1, dtype=np.float32)
+    return resample(mono, fmt["rate"], SAMPLE_RATE)
 
-def to_standard_wav(file_path: str) -> Tuple[str, float]:
+def _decode_via_tempfile(data: bytes) -> bytes:
     """
-    입력 파일을 16kHz mono WAV로 변환해서 temp 파일 경로와 길이(s)를 반환
+    moov 박스가 파일 끝에 있는 m4a/mp4는 pipe 입력으로 demux가 안 되므로
+    이 경우에만 임시 파일을 거친다. (with 블록으로 항상 정리)
     """
-    tmp_wav = tempfile.mktemp(suffix=".wav")
-    webm_to_wav16k(file_path, tmp_wav)
-    dur = get_duration_seconds(tmp_wav)
-    return tmp_wav, dur
+    with tempfile.NamedTemporaryFile(suffix=".m4a") as tmp:
+        tmp.write(data)
+        tmp.flush()
+        res = subprocess.run(_ffmpeg_pcm_cmd(tmp.name), stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return res.stdout
+
+def decode_audio_bytes(data: bytes) -> Tuple[np.ndarray, float]:
+    """
+    업로드 바이트를 16kHz mono float32 PCM으로 디코드. 샘플 배열과 길이(s)를 반환
+    - WAV: 프로세스 내에서 파싱 (+ 필요시 리샘플/다운믹스)
+    - 압축 컨테이너(webm/m4a/aac): ffmpeg stdin → stdout (디스크 왕복 없음)
+    """
+    with stage("decode"):
+        return _decode_audio_bytes(data)
+
+def _decode_audio_bytes(data: bytes) -> Tuple[np.ndarray, float]:
+    if sniff_container(data) == "wav":
+        samples = decode_wav_bytes(data)
+        if samples is not None:
+            return samples, duration_of(samples)
+
+    try:
+        res = subprocess.run(_ffmpeg_pcm_cmd("pipe:0"), input=data,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        pcm = res.stdout
+    except subprocess.CalledProcessError:
+        if not _is_mp4_family(data):
+            raise
+        pcm = _decode_via_tempfile(data)
+
+    samples = np.frombuffer(pcm, dtype=np.float32)
+    return samples, duration_of(samples)
+
+def duration_of(samples: np.ndarray) -> float:
+    # 샘플 수 → 길이(s)
+    return round(len(samples) / float(SAMPLE_RATE), 2)
+
+# ==========================
+# VAD: 프레임 에너지 + zero-crossing 기반 음성 구간 검출 (NumPy 벡터화)
+# ==========================
+VAD_FRAME_MS = 25
+VAD_HOP_MS = 10
+VAD_PAD_MS = 150          # 검출 구간 앞뒤로 남길 여유 (자음 시작/끝 보호)
+VAD_MIN_SPEECH_MS = 60    # 이보다 짧은 튐은 잡음으로 보고 버림
+VAD_HANGOVER_MS = 200     # 이보다 짧은 끊김은 같은 구간으로 이어붙임
+
+def detect_speech(samples: np.ndarray, sr: int = SAMPLE_RATE) -> List[Tuple[int, int]]:
+    """
+    음성 구간 [(start, end), ...] (샘플 단위, 패딩 전)을 반환.
+    - 에너지: 하위 10% 프레임을 잡음 바닥으로 보고 그보다 10dB 이상 큰 프레임
+    - 마찰음(ㅅ/ㅎ 등)처럼 에너지는 작고 ZCR이 높은 프레임도 음성으로 포함
+    """
+    frame, hop = sr * VAD_FRAME_MS // 1000, sr * VAD_HOP_MS // 1000
+    if len(samples) < frame:
+        return []
+    frames = np.lib.stride_tricks.sliding_window_view(samples, frame)[::hop]
+    energy = 10.0 * np.log10(np.mean(np.square(frames, dtype=np.float32), axis=1) + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame)
+
+    # 클립 전체가 말소리라 잡음 바닥이 높게 잡혀도 최대치 -20dB 위쪽은 음성으로 본다
+    noise = np.percentile(energy, 10)
+    threshold = max(min(noise + 10.0, energy.max() - 20.0), -60.0)
+    speech = (energy > threshold) | ((energy > threshold - 8.0) & (zcr > 0.25))
+
+    # 짧은 끊김 메우기(hangover) → 짧은 튐 제거
+    idx = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+    runs = idx.reshape(-1, 2)  # [시작 프레임, 끝 프레임)
+    if len(runs) == 0:
+        return []
+    gap_frames = VAD_HANGOVER_MS // VAD_HOP_MS
+    merged = [list(runs[0])]
+    for a, b in runs[1:]:
+        if a - merged[-1][1] <= gap_frames:
+            merged[-1][1] = b
+        else:
+            merged.append([a, b])
+    min_frames = max(1, VAD_MIN_SPEECH_MS // VAD_HOP_MS)
+    return [(int(a * hop), int(min(len(samples), (b - 1) * hop + frame)))
+            for a, b in merged if b - a >= min_frames]
+
+class SpeechMap:
+    """잘라낸 오디오의 시간 → 원본 시간 변환 (조각별 (잘린 쪽 시작, 원본 시작, 길이), 초 단위)"""
+
+    def __init__(self, pieces: List[Tuple[int, int]], sr: int = SAMPLE_RATE):
+        self.pieces = []
+        t = 0
+        for a, b in pieces:
+            self.pieces.append((t / sr, a / sr, (b - a) / sr))
+            t += b - a
+
+    def to_original(self, t: float) -> float:
+        for cut_start, orig_start, length in self.pieces:
+            if t <= cut_start + length:
+                return orig_start + max(0.0, t - cut_start)
+        cut_start, orig_start, length = self.pieces[-1]
+        return orig_start + (t - cut_start)
+
+def trim_silence(samples: np.ndarray, collapse_pause_sec: float = 0.0,
+                 sr: int = SAMPLE_RATE) -> Tuple[np.ndarray, Optional[SpeechMap], float]:
+    """
+    앞뒤 무음을 잘라낸 오디오, 시간 매핑(SpeechMap, 자르지 않았으면 None), 실제 발화 길이(s)를 반환.
+    collapse_pause_sec > 0 이면 그보다 긴 중간 쉼은 앞뒤 패딩만 남기고 잘라낸다.
+    발화 길이 = 첫 음성 시작 ~ 마지막 음성 끝 (중간 쉼 포함, 녹음 버튼 전후 무음 제외)
+    """
+    spans = detect_speech(samples, sr)
+    if not spans:
+        # 음성을 못 찾으면 (아주 작은 목소리일 수 있으니) 그대로 모델에 맡김
+        return samples, None, round(len(samples) / float(sr), 2)
+
+    speech_duration = round((spans[-1][1] - spans[0][0]) / float(sr), 2)
+    pad = sr * VAD_PAD_MS // 1000
+    padded = [(max(0, a - pad), min(len(samples), b + pad)) for a, b in spans]
+    pieces = [list(padded[0])]
+    for a, b in padded[1:]:
+        if collapse_pause_sec > 0 and a - pieces[-1][1] > collapse_pause_sec * sr:
+            pieces.append([a, b])
+        else:
+            pieces[-1][1] = b
+
+    if len(pieces) == 1 and pieces[0][0] == 0 and pieces[0][1] == len(samples):
+        return samples, None, speech_duration
+    trimmed = np.concatenate([samples[a:b] for a, b in pieces]) if len(pieces) > 1 else samples[pieces[0][0]:pieces[0][1]]
+    return trimmed, SpeechMap([tuple(p) for p in pieces], sr), speech_duration
 
 def enforce_limits(duration_s: float, content_length: int):
     if duration_s > MAX_SECONDS:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=413, detail={
-            "code": "PAYLOAD_TOO_LARGE",
-            "message": f"Audio length exceeds {MAX_SECONDS} seconds.",
-            "hint": "Try recording a shorter clip.",
-            "details": {"maxSeconds": MAX_SECONDS}
-        })
+        raise ApiError(413, "PAYLOAD_TOO_LARGE", f"Audio length exceeds {MAX_SECONDS} seconds.",
+                       hint="Try recording a shorter clip.", details={"maxSeconds": MAX_SECONDS})
     # content_length는 라우터에서 헤더로 검증(옵션)
@@ -0,0 +1,74 @@
+import math
+from typing import Any, Dict, List, Optional
+
+# 기준 문장 강제 정렬(teacher forcing) 결과를 토큰 / 단어 / 음절 점수로 정리하는 부분 (torch 없음)
+
+
+def _is_syllable(ch: str) -> bool:
+    return "가" <= ch <= "힣"
+
+
+def spread_to_chars(token_bytes: List[bytes], token_logprobs: List[float]) -> List[tuple]:
+    """
+    BPE 토큰은 한글 음절(UTF-8 3바이트) 경계와 맞지 않으므로
+    토큰 logprob를 바이트 수 비율로 나눠 문자별 logprob로 합친다. [(문자, logprob)]
+    """
+    byte_lp: List[float] = []
+    for b, lp in zip(token_bytes, token_logprobs):
+        if b:
+            byte_lp.extend([lp / len(b)] * len(b))
+    text = b"".join(token_bytes).decode("utf-8", errors="replace")
+    chars, pos = [], 0
+    for ch in text:
+        n = len(ch.encode("utf-8")) if ch != "�" else 1
+        chars.append((ch, sum(byte_lp[pos:pos + n])))
+        pos += n
+    return chars
+
+
+def forced_result(token_bytes: List[bytes], token_logprobs: List[float], words: List[Dict[str, Any]],
+                  duration: float, language: Optional[str]) -> Dict[str, Any]:
+    """
+    words: [{"word", "start", "end", "n_tokens"}] (토큰 순서대로, n_tokens 합 = 토큰 수)
+    음절 시간은 단어 구간을 음절 수로 균등 분할한 근사값
+    """
+    if not words and token_bytes:
+        text = b"".join(token_bytes).decode("utf-8", errors="replace")
+        words = [{"word": text, "start": 0.0, "end": duration, "n_tokens": len(token_bytes)}]
+
+    out_words, syllables = [], []
+    k = 0
+    for wi, w in enumerate(words):
+        tb = token_bytes[k:k + w["n_tokens"]]
+        lps = token_logprobs[k:k + w["n_tokens"]]
+        k += w["n_tokens"]
+        lp = sum(lps)
+        out_words.append({
+            "word": w["word"].strip(),
+            "start": round(float(w["start"]), 2),
+            "end": round(float(w["end"]), 2),
+            "logprob": round(lp, 4),
+            "prob": round(math.exp(lp / len(lps)), 4) if lps else 0.0,
+        })
+        sylls = [(ch, clp) for ch, clp in spread_to_chars(tb, lps) if _is_syllable(ch)]
+        span = (float(w["end"]) - float(w["start"])) / len(sylls) if sylls else 0.0
+        for j, (ch, clp) in enumerate(sylls):
+            syllables.append({
+                "syllable": ch,
+                "word_index": wi,
+                "start": round(float(w["start"]) + j * span, 2),
+                "end": round(float(w["start"]) + (j + 1) * span, 2),
+                "logprob": round(clp, 4),
+                "prob": round(math.exp(clp), 4),
+            })
+
+    tokens = [{"token": b.decode("utf-8", errors="replace"), "logprob": round(lp, 4)}
+              for b, lp in zip(token_bytes, token_logprobs)]
+    return {
+        "tokens": tokens,
+        "words": out_words,
+        "syllables": syllables,
+        "avg_logprob": round(sum(token_logprobs) / len(token_logprobs), 4) if token_logprobs else 0.0,
+        "confidence": round(sum(s["prob"] for s in syllables) / len(syllables), 4) if syllables else 0.0,
+        "language": language,
+    }
@@ -0,0 +1,66 @@
+import asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.config import INFERENCE_WORKERS, WORKER_THREADS, ASR_BACKEND
+from app.services import whisper_svc
+from app.services.asr_backends import BACKENDS
+from app.services.scheduler import InferenceScheduler, local_runner
+from app.services.worker_pool import WorkerPool
+
+# 라우터는 모델을 직접 부르지 않고 이 모듈을 통해 스케줄러에 요청을 넣는다
+# INFERENCE_WORKERS > 0 이면 모델은 워커 프로세스에만 있고, 웹 프로세스는 디스패치만 한다
+_scheduler: Optional[InferenceScheduler] = None
+_pool: Optional[WorkerPool] = None
+# INFERENCE_WORKERS=0일 때 모델 호출을 직렬화하는 스레드 (배치 전사와 기준 문장 채점이 공유)
+_executor: Optional[ThreadPoolExecutor] = None
+
+def start():
+    global _scheduler, _pool, _executor
+    if INFERENCE_WORKERS > 0:
+        _pool = WorkerPool(INFERENCE_WORKERS, WORKER_THREADS)
+        _pool.start()
+        _scheduler = InferenceScheduler(_pool.run_batch, max_concurrency=INFERENCE_WORKERS)
+    else:
+        # 로드/워밍업은 백그라운드 스레드에서: 서버는 바로 연결을 받고 /health로 진행 상황을 보여준다
+        threading.Thread(target=whisper_svc.load_model, name="whisper-load", daemon=True).start()
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+        _scheduler = InferenceScheduler(local_runner(whisper_svc.transcribe_batch, _executor))
+    _scheduler.start()
+
+async def stop():
+    if _scheduler is not None:
+        await _scheduler.stop()
+    if _pool is not None:
+        await _pool.stop()
+
+def is_ready() -> bool:
+    return _pool.is_ready() if _pool is not None else whisper_svc.is_ready()
+
+def ready_error() -> str:
+    return _pool.ready_error() if _pool is not None else whisper_svc.ready_error()
+
+def status() -> Dict[str, Any]:
+    """{"status": loading/warming/ready/error, "progress", "load_ms", "warmup_ms", "device", "error"}"""
+    return _pool.status() if _pool is not None else whisper_svc.status()
+
+def device_name() -> str:
+    return _pool.device_name() if _pool is not None else whisper_svc.device_name()
+
+async def transcribe(audio: np.ndarray, language: str, want_word_ts: bool) -> Dict[str, Any]:
+    return await _scheduler.submit(audio, language, want_word_ts)
+
+def supports_reference_scoring() -> bool:
+    backend = BACKENDS.get(ASR_BACKEND)
+    return backend is not None and backend.supports_reference
+
+async def score_reference(audio: np.ndarray, reference_text: str, language: str) -> Dict[str, Any]:
+    """기준 문장 강제 정렬 채점 (배치 없이 한 건씩, 모델이 있는 곳에서)"""
+    if _pool is not None:
+        return await _pool.call("score_reference", audio, reference_text, language)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, whisper_svc.score_reference, audio, reference_text, language)
+
+def worker_pids() -> List[int]:
+    """추론 워커 프로세스 pid (INFERENCE_WORKERS=0이면 빈 리스트)"""
+    return [w.proc.pid for w in _pool.workers if w.proc is not None] if _pool is not None else []
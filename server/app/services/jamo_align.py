@@ -0,0 +1,113 @@
+import numpy as np
+from typing import Any, Dict, List, Tuple
+
+# 기준 문장 ↔ 인식 결과 음절 정렬 (자모 단위 가중 편집 거리, NumPy)
+# 음절을 (초성, 중성, 종성) 정수 배열로 분해하고, 음절 대치 비용 = 다른 자모의 가중치 합.
+# → '좋' ↔ '조'는 종성만 달라서 일부 감점, '좋' ↔ '나'는 완전 대치
+
+HANGUL_BASE, HANGUL_END = 0xAC00, 0xD7A3
+# 대치 비용에서 초성/중성/종성 가중치 (합 1 = 삽입/삭제 비용)
+JAMO_WEIGHTS = np.array([0.4, 0.4, 0.2])
+JAMO_PARTS = ("onset", "nucleus", "coda")
+INDEL_COST = 1.0
+
+
+def _keep_mask(codes: np.ndarray) -> np.ndarray:
+    """normalize_korean과 같은 기준: 한글 음절 / 숫자만 남김"""
+    return ((codes >= HANGUL_BASE) & (codes <= HANGUL_END)) | ((codes >= 0x30) & (codes <= 0x39))
+
+
+def decompose(text: str) -> Dict[str, Any]:
+    """
+    text → {"chars": 남은 문자 배열, "pos": 원문에서의 위치, "jamo": (n, 3) int32}
+    숫자는 세 칸 모두 같은 고유 코드 (한글 음절과는 항상 완전 대치)
+    """
+    codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.int32)
+    pos = np.flatnonzero(_keep_mask(codes))
+    codes = codes[pos]
+    s = codes - HANGUL_BASE
+    hangul = (s >= 0)
+    jamo = np.empty((len(codes), 3), dtype=np.int32)
+    jamo[:, 0] = np.where(hangul, s // 588, -codes)
+    jamo[:, 1] = np.where(hangul, (s % 588) // 28, -codes)
+    jamo[:, 2] = np.where(hangul, s % 28, -codes)
+    return {"chars": [chr(c) for c in codes], "pos": pos, "jamo": jamo}
+
+
+def _cost_table(ref: Dict[str, Any], hyp: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    D[i, j] = ref[:i] ↔ hyp[:j] 최소 비용.
+    행 단위로 벡터화: 대각/위쪽은 이전 행에서 한 번에, 같은 행 안의 삽입 연쇄는
+    D[i, j] = min_k (T[k] + (j - k)) = j + cummin(T[k] - k) 로 한 번에 계산
+    """
+    n, m = len(ref["chars"]), len(hyp["chars"])
+    rj, hj = ref["jamo"], hyp["jamo"]
+    sub = np.zeros((n, m), dtype=np.float64)
+    for k, w in enumerate(JAMO_WEIGHTS):
+        sub += (rj[:, k, None] != hj[None, :, k]) * w
+    D = np.empty((n + 1, m + 1), dtype=np.float64)
+    steps = np.arange(m + 1, dtype=np.float64) * INDEL_COST
+    D[0] = steps
+    t = np.empty(m + 1, dtype=np.float64)
+    for i in range(1, n + 1):
+        prev = D[i - 1]
+        t[0] = prev[0] + INDEL_COST
+        np.minimum(prev[:-1] + sub[i - 1], prev[1:] + INDEL_COST, out=t[1:])
+        D[i] = steps + np.minimum.accumulate(t - steps)
+    return D, sub
+
+
+def _common_affix(a: np.ndarray, b: np.ndarray) -> Tuple[int, int]:
+    """앞/뒤로 같은 음절 수 (편집 거리 계산 전에 잘라냄)"""
+    k = min(len(a), len(b))
+    same = np.flatnonzero((a[:k] != b[:k]).any(axis=1))
+    pre = int(same[0]) if len(same) else k
+    k -= pre
+    tail = (a[len(a) - k:] != b[len(b) - k:]).any(axis=1)[::-1] if k else np.zeros(0, dtype=bool)
+    same = np.flatnonzero(tail)
+    suf = int(same[0]) if len(same) else k
+    return pre, suf
+
+
+def align(reference: str, hypothesis: str) -> Dict[str, Any]:
+    """
+    기준 문장과 인식 결과를 음절 단위로 정렬.
+    {"accuracy": 0~100, "errors": [{"op": "sub"|"del"|"ins", "ref_index", "hyp_index", "ref", "hyp",
+                                    "ref_pos", "jamo"?}]}
+    ref_index/hyp_index는 한글·숫자만 남긴 문자열 기준, ref_pos는 원래 reference 문자열에서의 위치
+    (삽입은 그 앞 기준 음절 위치). sub의 jamo는 달라진 자모 (onset/nucleus/coda)
+    """
+    ref, hyp = decompose(reference), decompose(hypothesis)
+    n, m = len(ref["chars"]), len(hyp["chars"])
+    if n == 0:
+        return {"accuracy": 0.0, "errors": []}
+
+    # 대부분 앞뒤가 같으므로 다른 가운데 부분만 DP
+    pre, suf = _common_affix(ref["jamo"], hyp["jamo"])
+    mid = lambda d, k: {key: d[key][pre:k - suf] for key in ("chars", "jamo")}
+    D, sub = _cost_table(mid(ref, n), mid(hyp, m))
+    cost = float(D[-1, -1])
+    accuracy = max(0.0, 1.0 - cost / max(n, m)) * 100.0
+
+    errors: List[Dict[str, Any]] = []
+    i, j = n - pre - suf, m - pre - suf
+    eps = 1e-9
+    while i > 0 or j > 0:
+        ri, hj = pre + i - 1, pre + j - 1   # 원래 인덱스
+        if i > 0 and j > 0 and abs(D[i, j] - (D[i - 1, j - 1] + sub[i - 1, j - 1])) < eps:
+            if sub[i - 1, j - 1] > 0:
+                diff = ref["jamo"][ri] != hyp["jamo"][hj]
+                errors.append({"op": "sub", "ref_index": ri, "hyp_index": hj, "ref": ref["chars"][ri],
+                               "hyp": hyp["chars"][hj], "ref_pos": int(ref["pos"][ri]),
+                               "jamo": [p for p, d in zip(JAMO_PARTS, diff) if d]})
+            i, j = i - 1, j - 1
+        elif i > 0 and abs(D[i, j] - (D[i - 1, j] + INDEL_COST)) < eps:
+            errors.append({"op": "del", "ref_index": ri, "hyp_index": hj + 1, "ref": ref["chars"][ri], "hyp": None,
+                           "ref_pos": int(ref["pos"][ri])})
+            i -= 1
+        else:
+            errors.append({"op": "ins", "ref_index": ri + 1, "hyp_index": hj, "ref": None, "hyp": hyp["chars"][hj],
+                           "ref_pos": int(ref["pos"][ri]) if ri >= 0 else -1})
+            j -= 1
+    errors.reverse()
+    return {"accuracy": accuracy, "errors": errors}
@@ -0,0 +1,262 @@
+import asyncio
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+from app.common_utils import LRUCache, normalize_text
+from app.config import (UPSTAGE_API_KEY, LLM_BASE_URL, LLM_MODEL, LLM_TIMEOUT_S, LLM_MAX_CONCURRENCY,
+                        LLM_CACHE_SIZE, LLM_SCORE_BUCKET)
+
+# UPSTAGE_API_KEY(윈도우 환경변수/ .env 등)가 있으면 Solar 사용, 없으면 호출 쪽에서 룰 기반 피드백
+# Upstage Solar Chat API는 OpenAI 호환이라 base_url(LLM_BASE_URL)만 바꿔서 사용
+
+
+class FeedbackClient:
+    """
+    OpenAI 호환 Chat API 비동기 클라이언트 (피드백 생성용).
+    - httpx 연결 풀을 재사용하는 AsyncOpenAI 하나를 공유 (이벤트 루프를 막지 않음)
+    - 호출마다 timeout_s 데드라인: 세마포어 대기 시간 포함, 넘기면 None → 호출 쪽에서 룰 기반으로 대체
+    - 동시 호출 수 제한 (max_concurrency)
+    - 성공한 결과는 LRU 캐시, 같은 키로 처리 중인 호출은 그 결과를 같이 기다림
+    """
+
+    def __init__(self, api_key: Optional[str] = UPSTAGE_API_KEY, base_url: str = LLM_BASE_URL,
+                 model: str = LLM_MODEL, timeout_s: float = LLM_TIMEOUT_S,
+                 max_concurrency: int = LLM_MAX_CONCURRENCY, cache_size: int = LLM_CACHE_SIZE,
+                 score_bucket: float = LLM_SCORE_BUCKET):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.timeout_s = timeout_s
+        self.max_concurrency = max_concurrency
+        self.score_bucket = score_bucket
+        self.cache = LRUCache(max_items=cache_size)
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._client = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[Tuple, asyncio.Future] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.api_key)
+
+    def _get_client(self):
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,  # 재시도 대신 데드라인 안에서 한 번만
+                timeout=self.timeout_s,
+                http_client=DefaultAsyncHttpxClient(
+                    limits=httpx.Limits(max_connections=self.max_concurrency,
+                                        max_keepalive_connections=self.max_concurrency),
+                ),
+            )
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def cache_key(self, reference_text: str, recognized_text: str, report: Dict[str, Any]) -> Tuple:
+        """점수는 score_bucket 단위로 묶어서 거의 같은 시도끼리 캐시를 공유"""
+        b = self.score_bucket or 1.0
+        bucket = lambda v: int(float(v) // b)
+        flu = report.get("fluency", {})
+        return (
+            normalize_text(reference_text), normalize_text(recognized_text),
+            bucket(report.get("overall", 0)), bucket(report.get("accuracy", 0)), bucket(flu.get("score", 0)),
+            round(float(flu.get("syllables_per_second", 0)) * 2) / 2,
+        )
+
+    async def _complete(self, messages: List[Dict[str, str]], temperature: float) -> str:
+        client = self._get_client()
+        async with self._sem:
+            self.calls += 1
+            resp = await client.chat.completions.create(model=self.model, messages=messages, temperature=temperature)
+        return resp.choices[0].message.content or ""
+
+    async def run(self, key: Tuple, messages: List[Dict[str, str]], parse: Callable[[str], Dict[str, Any]],
+                  temperature: float = 0.7) -> Optional[Dict[str, Any]]:
+        """
+        캐시 → (같은 키 처리 중이면 합류) → 데드라인 안에서 호출 + parse.
+        실패/시간 초과면 None (캐시하지 않음)
+        """
+        if not self.enabled:
+            return None
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        value = None
+        try:
+            content = await asyncio.wait_for(self._complete(messages, temperature), self.timeout_s)
+            value = parse(content)
+            self.cache.put(key, value)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            print(f"[llm_feedback] timed out after {self.timeout_s}s")
+        except Exception as e:
+            self.errors += 1
+            print(f"[llm_feedback] LLM API error: {e}")
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(value)
+        return value
+
+    async def stream(self, messages: List[Dict[str, str]], temperature: float = 0.7) -> AsyncIterator[str]:
+        """
+        content 조각을 생성되는 대로 yield (stream=True).
+        슬롯 대기부터 마지막 조각까지 전체가 timeout_s 안에 끝나야 하고, 넘기면 asyncio.TimeoutError
+        """
+        client = self._get_client()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout_s
+        remaining = lambda: max(0.0, deadline - loop.time())
+        try:
+            await asyncio.wait_for(self._sem.acquire(), remaining())
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        resp = None
+        try:
+            self.calls += 1
+            resp = await asyncio.wait_for(
+                client.chat.completions.create(model=self.model, messages=messages,
+                                               temperature=temperature, stream=True),
+                remaining())
+            chunks = resp.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), remaining())
+                except StopAsyncIteration:
+                    break
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self._sem.release()
+            if resp is not None:
+                await resp.close()
+
+    def stats(self) -> Dict[str, Any]:
+        s = self.cache.stats()
+        s.update({"enabled": self.enabled, "calls": self.calls, "timeouts": self.timeouts,
+                  "errors": self.errors, "inflight": len(self._inflight)})
+        return s
+
+
+class JsonFieldStreamer:
+    """
+    생성 중인 JSON 텍스트를 조각 단위로 받아, 최상위 객체의 지정한 필드 값 문자열을 글자 단위로 꺼낸다.
+    문자열 값이면 (필드, None, 텍스트), 문자열 배열이면 (필드, 항목 번호, 텍스트).
+    JSON 앞의 잡음(```json 등)은 첫 '{'까지 무시
+    """
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = set(fields)
+        self.stack: List[str] = []       # "obj" / "arr"
+        self.expect_key = False          # 최상위 객체에서 다음 문자열이 key인지
+        self.key: Optional[str] = None   # 최상위 객체의 현재 key
+        self.item = -1                   # 대상 배열 안의 현재 문자열 항목 번호
+        self.in_string = False
+        self.string_is_key = False
+        self.escape = ""                 # 처리 중인 escape (\uXXXX 포함)
+        self.buf: List[str] = []
+
+    def _target(self) -> Optional[Tuple[str, Optional[int]]]:
+        if self.key not in self.fields or self.string_is_key:
+            return None
+        if self.stack == ["obj"]:
+            return self.key, None
+        if self.stack == ["obj", "arr"]:
+            return self.key, self.item
+        return None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Optional[int], str]]:
+        out: List[Tuple[str, Optional[int], str]] = []
+        emit: List[str] = []
+        target = self._target() if self.in_string else None
+
+        def flush():
+            if emit and target is not None:
+                out.append((target[0], target[1], "".join(emit)))
+            emit.clear()
+
+        for ch in chunk:
+            if self.in_string:
+                if self.escape:
+                    self.escape += ch
+                    if self.escape[1] == "u":
+                        if len(self.escape) < 6:
+                            continue
+                        try:
+                            text = chr(int(self.escape[2:], 16))
+                        except ValueError:
+                            text = ""
+                    else:
+                        text = self._ESCAPES.get(ch, ch)
+                    self.escape = ""
+                elif ch == "\\":
+                    self.escape = ch
+                    continue
+                elif ch == '"':
+                    self.in_string = False
+                    if self.string_is_key:
+                        self.key = "".join(self.buf)
+                    flush()
+                    target = None
+                    continue
+                else:
+                    text = ch
+                if self.string_is_key:
+                    self.buf.append(text)
+                elif target is not None:
+                    emit.append(text)
+                continue
+
+            if not self.stack and ch != "{":
+                continue
+            if ch == '"':
+                self.in_string = True
+                self.string_is_key = self.stack == ["obj"] and self.expect_key
+                self.buf = []
+                if self.stack == ["obj", "arr"]:
+                    self.item += 1
+                target = self._target()
+            elif ch == "{":
+                self.stack.append("obj")
+                self.expect_key = len(self.stack) == 1
+            elif ch == "[":
+                self.stack.append("arr")
+                if self.stack == ["obj", "arr"]:
+                    self.item = -1
+            elif ch in "}]":
+                if self.stack:
+                    self.stack.pop()
+            elif ch == ":" and self.stack == ["obj"]:
+                self.expect_key = False
+            elif ch == "," and self.stack == ["obj"]:
+                self.expect_key = True
+        flush()
+        return out
+
+
+feedback_client = FeedbackClient()
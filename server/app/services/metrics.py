@@ -0,0 +1,175 @@
+import threading, time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# 단계별 지연 시간 / 큐 대기 / 실시간 배율(RTF) 계측 → /metrics (Prometheus text format)
+# 외부 라이브러리 없이 프로세스 안 메모리에 누적 (워커 프로세스/uvicorn 워커별로 따로 집계됨)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _fmt(v: float) -> str:
+    return "+Inf" if v == float("inf") else repr(float(v))
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{str(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List] = {}   # labels → [버킷별 개수, 합, 개수]
+
+    def observe(self, value: float, *labels: str):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            s[0][i] += 1
+            s[1] += value
+            s[2] += 1
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+        for labels, counts, total, n in sorted(series):
+            acc = 0
+            for le, c in zip(self.buckets + (float("inf"),), counts):
+                acc += c
+                le_label = 'le="' + _fmt(le) + '"'
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le_label)} {acc}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, labels)} {n}")
+        return out
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        out += [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+        return out
+
+
+def gauge_lines(name: str, help: str, samples: Sequence[Tuple[Dict[str, str], float]], kind: str = "gauge") -> List[str]:
+    """호출 시점 값으로 만드는 시계열 (캐시 크기, 다른 모듈이 세는 누적 hit 수 등)"""
+    out = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    for labels, v in samples:
+        out.append(f"{name}{_labels(list(labels), list(labels.values()))} {_fmt(v)}")
+    return out
+
+
+STAGE_SECONDS = Histogram("kotalk_stage_seconds", "Time spent per processing stage", ["stage"])
+REQUEST_SECONDS = Histogram("kotalk_request_seconds", "HTTP request latency", ["method", "route", "status"])
+QUEUE_WAIT_SECONDS = Histogram("kotalk_queue_wait_seconds", "Time a clip waited in the inference queue")
+BATCH_SIZE = Histogram("kotalk_batch_size", "Clips per inference batch", buckets=(1, 2, 4, 8, 16, 32))
+AUDIO_SECONDS = Counter("kotalk_inference_audio_seconds_total", "Seconds of audio sent to the ASR model")
+INFERENCE_SECONDS = Counter("kotalk_inference_wall_seconds_total", "Wall-clock seconds spent in ASR batches")
+
+# 요청별 단계 시간 (timings=1 응답용). 요청 시작 시 dict를 넣고, 같은 컨텍스트(스레드풀 포함)에서 채운다
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("timings", default=None)
+
+
+def start_timings() -> Dict[str, float]:
+    t: Dict[str, float] = {}
+    _timings.set(t)
+    return t
+
+
+def current_timings() -> Optional[Dict[str, float]]:
+    return _timings.get()
+
+
+def timings_requested(query_params) -> bool:
+    """?timings=1 이면 응답에 단계별 시간(ms)을 같이 넣는다"""
+    return query_params.get("timings") in ("1", "true")
+
+
+def timings_snapshot() -> Optional[Dict[str, float]]:
+    t = _timings.get()
+    return dict(t) if t is not None else None
+
+
+def record(stage: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage)
+    t = _timings.get()
+    if t is not None:
+        key = f"{stage}_ms"
+        t[key] = round(t.get(key, 0.0) + seconds * 1000.0, 2)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """with stage("decode"): ... → kotalk_stage_seconds{stage="decode"} + 요청별 timings["decode_ms"]"""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - t0)
+
+
+def realtime_factor() -> float:
+    """누적 (오디오 초 / 추론 wall 초). 1보다 크면 실시간보다 빠름"""
+    wall = INFERENCE_SECONDS.value()
+    return AUDIO_SECONDS.value() / wall if wall > 0 else 0.0
+
+
+def render(extra: Sequence[str] = ()) -> str:
+    lines: List[str] = []
+    for m in (REQUEST_SECONDS, STAGE_SECONDS, QUEUE_WAIT_SECONDS, BATCH_SIZE, AUDIO_SECONDS, INFERENCE_SECONDS):
+        lines += m.render()
+    lines += gauge_lines("kotalk_realtime_factor", "Audio seconds transcribed per wall-clock second",
+                         [({}, realtime_factor())])
+    lines += list(extra)
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    순수 ASGI 미들웨어: 요청마다 timings dict를 새로 만들고, 끝나면 라우트 템플릿 기준으로 지연 시간 기록
+    (경로 대신 라우트 템플릿을 라벨로 써서 시계열 수가 늘어나지 않게)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start_timings()
+        t0 = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - t0, scope["method"], route, str(status["code"]))
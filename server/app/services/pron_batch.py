@@ -0,0 +1,166 @@
+"""
+발음 점수 배치 채점. (reference_text, recognized_text, duration_sec) 행 수천 개를 여러 코어에서 나눠 계산.
+
+    python -m app.services.pron_batch attempts.csv -o scores.jsonl [--feedback rule|none|llm] [--workers N]
+
+입력은 CSV(헤더: reference_text, recognized_text, duration_sec [, id]) 또는 JSONL. 결과는 입력 순서대로 JSONL.
+"""
+import argparse, asyncio, csv, json, os, sys, time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from app.config import PRON_BATCH_WORKERS, PRON_BATCH_CHUNK, PRON_BATCH_LLM_RPS
+from app.services.pron_scoring import build_pron_report, build_rule_based_feedback
+
+FEEDBACK_MODES = ("rule", "none", "llm")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def score_rows(rows: List[Dict[str, Any]], feedback: str = "rule") -> List[Dict[str, Any]]:
+    """워커 프로세스에서 실행: 행마다 report (+ 룰 기반 피드백)"""
+    out = []
+    for row in rows:
+        ref = str(row.get("reference_text") or "")
+        rec = str(row.get("recognized_text") or "")
+        try:
+            dur = float(row.get("duration_sec") or 0.0)
+        except (TypeError, ValueError):
+            dur = 0.0
+        item = {"id": row.get("id"), "report": build_pron_report(ref, rec, dur)}
+        if feedback == "rule":
+            item["ai_feedback"] = build_rule_based_feedback(ref, rec, item["report"])
+        out.append(item)
+    return out
+
+
+def get_pool(workers: int = PRON_BATCH_WORKERS) -> ProcessPoolExecutor:
+    """배치 채점용 프로세스 풀 (처음 쓸 때 생성해서 재사용, spawn: 부모의 스레드/락 상태를 물려받지 않음)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1, mp_context=mp.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def _chunks(rows: List[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class RateLimiter:
+    """초당 rate번까지 acquire 통과 (호출 간격을 1/rate초 이상으로 벌림)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+async def iter_scores(rows: List[Dict[str, Any]], feedback: str = "rule",
+                      chunk_size: int = PRON_BATCH_CHUNK) -> AsyncIterator[Dict[str, Any]]:
+    """
+    행을 chunk_size씩 프로세스 풀에 동시에 보내고, 결과는 입력 순서대로 하나씩 yield ({"index", "id", "report", ...}).
+    feedback="llm"이면 점수는 풀에서, 피드백은 PRON_BATCH_LLM_RPS로 속도를 제한해 LLM에 요청하고
+    응답이 온 행부터 (입력 순서를 지키며) 바로 yield (LLM 실패/시간 초과 행은 룰 기반 피드백)
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    worker_mode = "rule" if feedback == "rule" else "none"
+    futures = [loop.run_in_executor(pool, score_rows, chunk, worker_mode) for chunk in _chunks(rows, chunk_size)]
+    limiter = RateLimiter(PRON_BATCH_LLM_RPS) if feedback == "llm" else None
+
+    async def with_llm(row: Dict[str, Any], item: Dict[str, Any]) -> Dict[str, Any]:
+        from app.services.pron_feedback import build_ai_style_feedback
+        await limiter.acquire()
+        item["ai_feedback"] = await build_ai_style_feedback(
+            str(row.get("reference_text") or ""), str(row.get("recognized_text") or ""), item["report"])
+        return item
+
+    tasks: List[asyncio.Future] = []
+    index = 0
+    try:
+        for chunk, future in zip(_chunks(rows, chunk_size), futures):
+            try:
+                items = await future
+            except BrokenProcessPool:
+                shutdown_pool()   # 워커가 죽은 풀은 버리고 다음 요청에서 새로 생성
+                raise
+            if limiter is not None:
+                # 청크 전체를 기다리지 않고, 앞 행부터 LLM 응답이 오는 대로 순서대로 내보냄
+                tasks = [asyncio.ensure_future(with_llm(row, item)) for row, item in zip(chunk, items)]
+                for task in tasks:
+                    yield {"index": index, **(await task)}
+                    index += 1
+                continue
+            for item in items:
+                yield {"index": index, **item}
+                index += 1
+    finally:
+        for future in futures + tasks:
+            future.cancel()
+
+
+def read_rows(path: str) -> List[Dict[str, Any]]:
+    """CSV(헤더 필수) 또는 JSONL ('-'면 stdin, JSONL로 읽음)"""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+    try:
+        if path.lower().endswith(".csv"):
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+async def _run_cli(rows: List[Dict[str, Any]], out, feedback: str, chunk_size: int) -> int:
+    n = 0
+    async for item in iter_scores(rows, feedback, chunk_size):
+        out.write(json.dumps(item, ensure_ascii=False) + "\n")
+        n += 1
+    if feedback == "llm":
+        from app.services.llm_feedback import feedback_client
+        await feedback_client.aclose()
+    return n
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch pronunciation scoring (CSV/JSONL → JSONL)")
+    parser.add_argument("input", help="CSV with reference_text,recognized_text,duration_sec[,id] or JSONL ('-' = stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output JSONL ('-' = stdout)")
+    parser.add_argument("--feedback", choices=FEEDBACK_MODES, default="rule")
+    parser.add_argument("--workers", type=int, default=PRON_BATCH_WORKERS, help="0이면 코어 수")
+    parser.add_argument("--chunk", type=int, default=PRON_BATCH_CHUNK)
+    args = parser.parse_args(argv)
+
+    rows = read_rows(args.input)
+    get_pool(args.workers)
+    t0 = time.perf_counter()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        n = asyncio.run(_run_cli(rows, out, args.feedback, args.chunk))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        shutdown_pool()
+    print(f"scored {n} rows in {time.perf_counter() - t0:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import json, re
+from typing import Any, AsyncIterator, Dict, List
+from app.services.llm_feedback import JsonFieldStreamer, feedback_client
+from app.services.metrics import stage
+from app.services.pron_scoring import build_rule_based_feedback
+
+# 발음 평가 AI 피드백 (Upstage Solar 프롬프트 / 응답 파싱 / 룰 기반 fallback)
+# /pron-eval, /pron-eval/stream, /assess 라우터와 배치 채점(pron_batch)이 같이 사용
+# 연결/캐시/데드라인과 API 설정은 llm_feedback에서 관리
+
+
+def _parse_feedback(content: str) -> Dict[str, Any]:
+    """LLM 응답에서 JSON 부분만 안전하게 추출 (실패하면 예외 → fallback)"""
+    m = re.search(r"\{.*\}", content or "{}", re.DOTALL)
+    return json.loads(m.group(0) if m else content)
+
+
+# 프롬프트에는 틀린 음절 목록 전체 대신 종류별 개수와 앞의 몇 개만 (틀린 곳이 많아도 토큰 수/지연 일정)
+PROMPT_ERROR_EXAMPLES = 3
+
+
+def _prompt_report(report: Dict[str, Any]) -> Dict[str, Any]:
+    errors = report.get("errors")
+    if errors is None:
+        return report
+    out = {k: v for k, v in report.items() if k != "errors"}
+    out["errors"] = {
+        "count": {op: sum(e["op"] == op for e in errors) for op in ("sub", "del", "ins")},
+        "examples": [f"{e['ref'] or '∅'}→{e['hyp'] or '∅'}" for e in errors[:PROMPT_ERROR_EXAMPLES]],
+    }
+    return out
+
+
+def _feedback_messages(reference_text: str, recognized_text: str, report: Dict[str, Any]) -> List[Dict[str, str]]:
+    system_msg = (
+        "너는 한국어 발음 전문 코치이자 언어치료사야. "
+        "학습자의 발음 결과와 정량 점수(report)를 바탕으로, "
+        "전문적인 코칭 리포트를 한국어로 작성해야 한다. "
+        "반드시 JSON만 출력하고, 다른 텍스트는 출력하지 마."
+    )
+
+    user_msg = f"""
+[입력 정보]
+- 연습해야 했던 문장(reference_text): {reference_text}
+- 실제 음성 인식 결과(recognized_text): {recognized_text}
+- 발음 평가 점수(report): {json.dumps(_prompt_report(report), ensure_ascii=False)}
+
+[설명]
+- report.overall: 종합 점수 (0~100)
+- report.accuracy: 발음 정확도 (스크립트와 일치하는 정도, 0~100)
+- report.fluency.score: 유창성 점수 (속도 안정성, 0~100)
+- report.fluency.syllables_per_second: 초당 음절 수
+- report.errors.count: 틀린 음절 수 (sub 다르게 발음 / del 빠뜨림 / ins 덧붙임)
+- report.errors.examples: 앞쪽 틀린 음절 예시 (기준→인식, ∅ = 없음)
+
+[역할]
+너는 위 정보를 바탕으로 다음을 수행해야 한다:
+1. recognized_text가 다소 부정확해도, reference_text와 비교하여
+   학습자가 원래 말하려던 자연스러운 문장(intended_sentence)을 추론한다.
+2. 발음을 다음 네 가지 축으로 전문적으로 분석한다:
+   - 발음 정확도 (스크립트 일치도, 음운 대치/탈락 여부)
+   - 말 속도 및 유창성 (너무 빠름/느림, 끊김 여부)
+   - 리듬·억양 (문장 전체의 강세/억양 패턴이 자연스러운지)
+   - 명료도 (자음·모음 분리, 끝소리 처리 등)
+
+[summary 필드 작성 규칙]
+- 3~5줄 정도의 짧은 리포트로 작성하되, 줄바꿈과 번호를 활용해 전문적인 느낌을 내라.
+- 예시:
+  "1) 발음 정확도: OO%로, 주요 내용은 잘 전달되지만 '~' 부분에서 소리가 흐려집니다.
+   2) 말 속도·유창성: 초당 X음절로, 약간 빠른 편이라 모음이 뭉개지는 경향이 있습니다.
+   3) 리듬·명료도: 문장 끝에서 음절이 약해지는 습관이 있어 마무리가 조금 흐립니다."
+
+[tips 필드 작성 규칙]
+- 최소 2개, 최대 4개 정도의 구체적인 연습 팁을 제공하라.
+- 각 팁은 실제 발음 연습에서 바로 사용할 수 있을 정도로 구체적으로 작성한다.
+- 예를 들어:
+  - "‘좋네요’의 'ㅈ'과 'ㄴ' 자음을 또박또박 구분해서 읽는 연습을 해보세요."
+  - "문장 첫 단어를 한 박자 길게 끌어서 시작하면, 전체 리듬이 안정됩니다."
+
+[level 필드 작성 규칙]
+- overall, accuracy, fluency.score를 종합해서 '초급', '중급', '고급' 중 하나로 판단한다.
+- 대략적인 기준 예시:
+  - overall ≥ 90 또는 accuracy ≥ 90 AND fluency.score ≥ 85 → "고급"
+  - overall ≥ 70 → "중급"
+  - 그 이하는 "초급"
+
+[recommended_sentence 필드 작성 규칙]
+- intended_sentence와 비슷한 패턴이지만, 더 짧고 발음 연습에 좋은 문장을 하나 제안한다.
+- 발음 연습용 문장으로, 받침·모음이 골고루 섞여 있으면서도 길이가 너무 길지 않게 한다.
+
+[최종 출력 형식(JSON만 출력)]
+{{
+  "intended_sentence": "사용자가 원래 말하려던 자연스러운 한국어 문장",
+  "summary": "번호/줄바꿈을 활용한 전문적인 발음 리포트 (3~5줄, 한국어)",
+  "tips": [
+    "첫 번째 구체적인 발음 연습 팁(한국어)",
+    "두 번째 구체적인 발음 연습 팁(한국어)"
+  ],
+  "level": "초급/중급/고급 중 하나",
+  "recommended_sentence": "연습용으로 좋은 한국어 문장 1개"
+}}
+"""
+
+    return [
+        {"role": "system", "content": system_msg},
+        {"role": "user", "content": user_msg},
+    ]
+
+
+def _finalize_feedback(data: Dict[str, Any], reference_text: str, recognized_text: str) -> Dict[str, Any]:
+    """LLM이 준 JSON에서 빠진 필드를 기본값으로 채워 최종 피드백 형태로"""
+    intended = data.get("intended_sentence") or reference_text or recognized_text
+    summary = data.get("summary") or "전반적인 발음 경향을 분석한 결과입니다."
+    tips = data.get("tips") or [
+        "조금 더 천천히, 입 모양을 크게 벌려서 발음해 보세요.",
+        "문장을 짧게 나눠서 여러 번 반복해서 읽어보세요.",
+    ]
+    level = data.get("level") or "중급"
+    recommended = data.get("recommended_sentence") or intended
+
+    return {
+        "summary": summary,
+        "tips": tips,
+        "level": level,
+        "recommended_sentence": recommended,
+        "intended_sentence": intended,
+    }
+
+
+async def build_ai_style_feedback(reference_text: str, recognized_text: str, report: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Upstage Solar LLM(solar-1-mini-chat)을 사용해서:
+    - 사용자가 원래 말하려던 문장(intended_sentence) 추측
+    - 점수 기반 전문 코칭 리포트 생성
+    Solar 호출 실패/시간 초과 시에는 룰 기반으로 fallback.
+    """
+
+    if not feedback_client.enabled:
+        return build_rule_based_feedback(reference_text, recognized_text, report)
+
+    with stage("llm"):
+        data = await feedback_client.run(
+            feedback_client.cache_key(reference_text, recognized_text, report),
+            _feedback_messages(reference_text, recognized_text, report),
+            _parse_feedback,
+            temperature=0.7,
+        )
+    if data is None:
+        return build_rule_based_feedback(reference_text, recognized_text, report)
+    return _finalize_feedback(data, reference_text, recognized_text)
+
+
+async def stream_ai_style_feedback(reference_text: str, recognized_text: str,
+                                   report: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    LLM 응답을 받는 대로 summary / tips 글자를 delta 이벤트로 내보내고, 마지막에 검증된 피드백을 final로.
+    스트림 도중 오류/시간 초과면 그때까지의 delta는 버리고 룰 기반 피드백을 final(fallback=true)로 보낸다
+    """
+    if not feedback_client.enabled:
+        yield {"type": "final", "ai_feedback": build_rule_based_feedback(reference_text, recognized_text, report),
+               "fallback": True}
+        return
+
+    key = feedback_client.cache_key(reference_text, recognized_text, report)
+    cached = feedback_client.cache.get(key)
+    if cached is not None:
+        yield {"type": "final", "ai_feedback": _finalize_feedback(cached, reference_text, recognized_text),
+               "cached": True}
+        return
+
+    fields = JsonFieldStreamer(("summary", "tips"))
+    content = []
+    try:
+        async for chunk in feedback_client.stream(_feedback_messages(reference_text, recognized_text, report)):
+            content.append(chunk)
+            for field, index, text in fields.feed(chunk):
+                yield {"type": "delta", "field": field, "index": index, "text": text}
+        data = _parse_feedback("".join(content))
+    except Exception as e:
+        print(f"[pron_feedback] Solar stream error: {e}")
+        yield {"type": "final", "ai_feedback": build_rule_based_feedback(reference_text, recognized_text, report),
+               "fallback": True}
+        return
+    feedback_client.cache.put(key, data)
+    yield {"type": "final", "ai_feedback": _finalize_feedback(data, reference_text, recognized_text)}
@@ -0,0 +1,109 @@
+import re
+from typing import Any, Dict, List, Tuple
+from app.services.jamo_align import align
+
+# 발음 점수/룰 기반 피드백 계산 (웹 의존성 없음 → /pron-eval, /assess, 배치 채점 워커 프로세스가 같이 사용)
+
+
+# ---------- 유틸 함수들 (정량 점수 계산) ----------
+
+def normalize_korean(text: str) -> str:
+    """한글/숫자만 남기고 나머지는 제거"""
+    text = re.sub(r"[^가-힣0-9]", "", text)
+    return text
+
+
+def char_accuracy(ref: str, hyp: str) -> float:
+    """
+    음절 정렬(자모 단위 가중 편집 거리)로 정확도(0~100) 계산: (1 - 비용 / max(기준 음절 수, 인식 음절 수)) × 100.
+    예전 difflib ratio와 값이 다름 (받침만 틀리면 부분 점수, 빠뜨린 음절은 더 크게 감점)
+    """
+    return align(ref, hyp)["accuracy"]
+
+
+def speech_rate_score(text: str, duration_sec: float) -> Tuple[float, float]:
+    """
+    말 속도(음절/초)와 유창성 점수(0~100)를 반환
+    이상적인 속도 범위를 3.0~5.0 음절/초 정도로 가정
+    """
+    norm = normalize_korean(text)
+    syllables = len(norm)
+    if duration_sec <= 0 or syllables == 0:
+        return 0.0, 0.0
+
+    rate = syllables / duration_sec  # 음절/초
+    ideal_min, ideal_max = 3.0, 5.0
+
+    if ideal_min <= rate <= ideal_max:
+        score = 100.0
+    else:
+        diff = min(abs(rate - ideal_min), abs(rate - ideal_max))
+        score = max(0.0, 100.0 - diff * 20.0)
+
+    return rate, score
+
+
+def build_pron_report(reference_text: str, recognized_text: str, duration_sec: float) -> Dict[str, Any]:
+    """errors: 틀린 음절 위치 (jamo_align.align) → UI에서 바로 강조 표시"""
+    alignment = align(reference_text, recognized_text)
+    acc = alignment["accuracy"]
+    rate, flu = speech_rate_score(recognized_text, duration_sec)
+    overall = round(0.7 * acc + 0.3 * flu, 1)
+
+    return {
+        "overall": overall,
+        "accuracy": round(acc, 1),
+        "fluency": {
+            "score": round(flu, 1),
+            "syllables_per_second": round(rate, 2),
+        },
+        "errors": alignment["errors"],
+    }
+
+
+# ---------- 룰 기반 fallback (Solar 안 될 때용) ----------
+
+def build_rule_based_feedback(reference_text: str, recognized_text: str, report: Dict[str, Any]) -> Dict[str, Any]:
+    overall = report["overall"]
+    accuracy = report["accuracy"]
+    flu = report["fluency"]["score"]
+    rate = report["fluency"]["syllables_per_second"]
+
+    if overall >= 90:
+        level = "고급"
+    elif overall >= 75:
+        level = "중급"
+    else:
+        level = "초급"
+
+    if accuracy >= 90:
+        summary = "발음이 전반적으로 매우 정확해요. 자연스럽게 잘 읽어주셨어요."
+    elif accuracy >= 75:
+        summary = "전체적으로 잘 읽었지만, 몇몇 부분에서 다소 부정확한 발음이 보여요."
+    else:
+        summary = "스크립트와 다른 부분이 꽤 있어서, 조금 더 천천히 따라 읽어보면 좋아요."
+
+    tips: List[str] = []
+    if accuracy < 90:
+        tips.append("스크립트를 눈으로 한 번 더 따라 읽으면서, 글자를 하나씩 또박또박 소리 내 보세요.")
+
+    if rate > 0:
+        if rate < 3.0:
+            tips.append("말 속도가 조금 느린 편이에요. 문장을 더 끊김 없이 이어서 말해 보세요.")
+        elif rate > 5.0:
+            tips.append("조금 빠르게 말하는 경향이 있어요. 한 단어씩 분리해서 더 또렷하게 읽어보면 좋습니다.")
+        else:
+            tips.append("말 속도가 적당해서 듣기 편해요. 지금 속도를 유지하면서 발음만 조금 더 또박또박 하면 좋아요.")
+
+    if not tips:
+        tips.append("지금처럼 연습을 꾸준히 이어가면 발음이 더 자연스러워질 거예요!")
+
+    intended = reference_text.strip() or recognized_text.strip()
+
+    return {
+        "summary": summary,
+        "tips": tips,
+        "level": level,
+        "recommended_sentence": intended,
+        "intended_sentence": intended,
+    }
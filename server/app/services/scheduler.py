@@ -0,0 +1,154 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+from app.config import BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS
+from app.services import metrics
+from app.services.audio import SAMPLE_RATE
+
+# run_batch(audios, language, want_word_ts) -> 결과 리스트 (audios와 같은 순서)
+BatchRunner = Callable[[List[np.ndarray], str, bool], Awaitable[List[Dict[str, Any]]]]
+
+
+class _Job:
+    __slots__ = ("audio", "language", "want_word_ts", "future", "enqueued", "timings")
+
+    def __init__(self, audio: np.ndarray, language: str, want_word_ts: bool, future: asyncio.Future):
+        self.audio = audio
+        self.language = language
+        self.want_word_ts = want_word_ts
+        self.future = future
+        self.enqueued = future.get_loop().time()
+        self.timings = metrics.current_timings()  # 요청별 timings (스케줄러 task는 다른 컨텍스트라 직접 들고 감)
+
+
+class InferenceScheduler:
+    """
+    동적 마이크로 배칭 스케줄러.
+    첫 요청이 들어오면 max_wait_ms 동안(또는 max_batch_size까지) 뒤따르는 요청을 모은 뒤
+    같은 (language, want_word_ts) 끼리 묶어 runner 한 번으로 추론하고, 결과를 각 요청에 돌려준다.
+    동시에 돌 수 있는 배치 수(max_concurrency, 예: 워커 프로세스 수)가 모두 차 있으면
+    그동안 들어온 요청은 큐에 쌓였다가 다음 배치로 묶인다.
+    """
+
+    def __init__(self, runner: BatchRunner, max_batch_size: int = BATCH_MAX_SIZE,
+                 max_wait_ms: int = BATCH_MAX_WAIT_MS, max_concurrency: int = 1):
+        self.runner = runner
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self.max_concurrency = max(1, max_concurrency)
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        for t in list(self._running):
+            t.cancel()
+        # 남아 있는 요청은 에러로 정리
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Inference scheduler stopped"))
+
+    async def submit(self, audio: np.ndarray, language: str, want_word_ts: bool) -> Dict[str, Any]:
+        if self._task is None:
+            raise RuntimeError("Inference scheduler is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_Job(audio, language, want_word_ts, future))
+        return await future
+
+    async def _collect(self) -> List[_Job]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                # 대기 시간은 끝났어도 이미 큐에 있는 건 같이 가져감
+                if self._queue.empty():
+                    break
+                batch.append(self._queue.get_nowait())
+                continue
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _loop(self):
+        while True:
+            # 빈 슬롯이 생길 때까지 기다렸다가 모으기 시작 (그동안 요청은 큐에 쌓임)
+            async with self._slots:
+                pass
+            batch = await self._collect()
+            groups: Dict[Tuple[str, bool], List[_Job]] = {}
+            for job in batch:
+                # 기다리다 취소된 요청은 추론하지 않음
+                if not job.future.done():
+                    groups.setdefault((job.language, job.want_word_ts), []).append(job)
+
+            for (language, want_word_ts), jobs in groups.items():
+                await self._slots.acquire()
+                task = asyncio.create_task(self._run_group(jobs, language, want_word_ts))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _run_group(self, jobs: List[_Job], language: str, want_word_ts: bool):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for j in jobs:
+            metrics.QUEUE_WAIT_SECONDS.observe(started - j.enqueued)
+            if j.timings is not None:
+                j.timings["queue_wait_ms"] = round((started - j.enqueued) * 1000.0, 2)
+        metrics.BATCH_SIZE.observe(len(jobs))
+        try:
+            results = await self.runner([j.audio for j in jobs], language, want_word_ts)
+            elapsed = loop.time() - started
+            metrics.STAGE_SECONDS.observe(elapsed, "inference")
+            metrics.INFERENCE_SECONDS.inc(elapsed)
+            metrics.AUDIO_SECONDS.inc(sum(len(j.audio) for j in jobs) / SAMPLE_RATE)
+            for j in jobs:
+                if j.timings is not None:
+                    j.timings["inference_ms"] = round(elapsed * 1000.0, 2)
+                    j.timings["batch_size"] = len(jobs)
+        except Exception as e:
+            for j in jobs:
+                if not j.future.done():
+                    j.future.set_exception(e)
+            return
+        finally:
+            self._slots.release()
+        for j, res in zip(jobs, results):
+            if not j.future.done():
+                j.future.set_result(res)
+
+
+def local_runner(batch_fn: Callable[[List[np.ndarray], str, bool], List[Dict[str, Any]]],
+                 executor: Optional[ThreadPoolExecutor] = None) -> BatchRunner:
+    """
+    같은 프로세스의 모델로 배치를 돌리는 runner.
+    추론은 전용 스레드 1개에서 실행 → 이벤트 루프(/health 등)를 막지 않고, 모델 호출은 직렬화
+    (배치 외 모델 호출도 같은 스레드에서 돌도록 executor를 넘겨 공유할 수 있음)
+    """
+    executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+
+    async def run(audios: List[np.ndarray], language: str, want_word_ts: bool) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, batch_fn, audios, language, want_word_ts)
+
+    return run
@@ -0,0 +1,154 @@
+import asyncio, hashlib, json, os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import numpy as np
+from app.common_utils import LRUCache
+from app.config import MODEL_NAME, ASR_BACKEND, STT_CACHE_MAX_BYTES, STT_CACHE_DIR
+
+
+def _json_size(value: Dict[str, Any]) -> int:
+    return len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+
+
+def slim_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """캐시에 넣을 최소 형태: 라우터가 쓰는 text / language / model / segments[*].words만 남김"""
+    return {
+        "text": result.get("text", ""),
+        "language": result.get("language"),
+        "model": result.get("model"),
+        "segments": [
+            {"words": [{"word": w.get("word", ""), "start": w.get("start", 0.0), "end": w.get("end", 0.0)}
+                       for w in seg.get("words", [])]}
+            for seg in result.get("segments", [])
+        ],
+    }
+
+
+class TranscriptCache:
+    """
+    디코드된 PCM 해시 + (language, timestamps, MODEL_NAME, ASR_BACKEND) 기준 전사 결과 캐시.
+    - 메모리: 바이트 예산이 있는 LRU
+    - 디스크(선택): STT_CACHE_DIR/<2자리>/<key>.json, 재시작 후에도 유지
+    - 같은 키 요청이 처리 중이면 새로 추론하지 않고 그 결과를 같이 기다림 (coalescing)
+    """
+
+    def __init__(self, max_bytes: int = STT_CACHE_MAX_BYTES, disk_dir: str = STT_CACHE_DIR):
+        self.enabled = max_bytes > 0
+        self.memory = LRUCache(max_bytes=max_bytes, sizeof=_json_size)
+        self.disk_dir = disk_dir or None
+        self.disk_hits = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def make_key(samples: np.ndarray, language: str, timestamps: str) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        h.update(memoryview(np.ascontiguousarray(samples)).cast("B"))
+        h.update(f"|{language}|{timestamps}|{MODEL_NAME}|{ASR_BACKEND}".encode("utf-8"))
+        return h.hexdigest()
+
+    # ---------- disk tier ----------
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, key: str, value: Dict[str, Any]):
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp, path)  # 쓰는 도중 읽혀도 깨진 파일이 보이지 않도록
+        except OSError as e:
+            print(f"[stt_cache] disk write failed: {e}")
+
+    # ---------- main ----------
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Tuple[Dict[str, Any], str]:
+        """
+        (결과, 출처)를 반환. 출처: "memory" / "disk" / "coalesced" / "miss"
+        """
+        if not self.enabled:
+            return slim_result(await compute()), "miss"
+
+        value = self.memory.get(key)
+        if value is not None:
+            return value, "memory"
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            return await asyncio.shield(pending), "coalesced"
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            if self.disk_dir:
+                value = await asyncio.to_thread(self._disk_get, key)
+                if value is not None:
+                    self.disk_hits += 1
+                    self.memory.put(key, value)
+                    future.set_result(value)
+                    return value, "disk"
+
+            # 첫 요청이 취소돼도 같이 기다리는 요청을 위해 추론은 별도 task로
+            task = asyncio.ensure_future(compute())
+            try:
+                value = slim_result(await asyncio.shield(task))
+            except asyncio.CancelledError:
+                task.add_done_callback(lambda t: self._settle(key, future, t))
+                raise
+            except Exception as e:
+                future.set_exception(e)
+                future.exception()  # 기다리는 쪽이 없어도 경고가 나지 않도록
+                raise
+            self._store(key, value)
+            future.set_result(value)
+            return value, "miss"
+        finally:
+            if future.done():
+                self._inflight.pop(key, None)
+
+    def _settle(self, key: str, future: asyncio.Future, task: asyncio.Task):
+        # 첫 요청이 취소된 뒤 끝난 추론 결과를 대기 중인 요청들에게 전달
+        self._inflight.pop(key, None)
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+            future.exception()
+        else:
+            value = slim_result(task.result())
+            self._store(key, value)
+            future.set_result(value)
+
+    def _store(self, key: str, value: Dict[str, Any]):
+        self.memory.put(key, value)
+        if self.disk_dir:
+            loop = asyncio.get_running_loop()
+            loop.run_in_executor(None, self._disk_put, key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        s = self.memory.stats()
+        s.update({
+            "enabled": self.enabled,
+            "max_bytes": self.memory.max_bytes,
+            "disk_enabled": bool(self.disk_dir),
+            "disk_hits": self.disk_hits,
+            "coalesced": self.coalesced,
+            "inflight": len(self._inflight),
+        })
+        return s
+
+
+transcript_cache = TranscriptCache()
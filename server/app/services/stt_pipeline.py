@@ -0,0 +1,107 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from app.common_utils import now_ms, normalize_text
+from app.config import API_VERSION, VAD_ENABLED, VAD_COLLAPSE_PAUSE_SEC
+from app.schemas import STTResponse
+from app.services import inference
+from starlette.concurrency import run_in_threadpool
+from app.services.audio import SpeechMap, trim_silence, duration_of, decode_audio_bytes, enforce_limits
+from app.services.stt_cache import transcript_cache
+from app.services.metrics import stage, current_timings
+
+
+def flatten_words(result: Dict[str, Any], offset: float = 0.0) -> List[Dict[str, Any]]:
+    """Whisper의 word timestamps(segments[*].words[*])를 평평한 리스트로. offset(s)만큼 시간 이동"""
+    words = []
+    for seg in result.get("segments", []):
+        for w in seg.get("words", []):
+            wtext = (w.get("word") or "").strip()
+            if not wtext:
+                continue
+            words.append({
+                "word": wtext,
+                "start": round(float(w.get("start", 0.0)) + offset, 2),
+                "end": round(float(w.get("end", 0.0)) + offset, 2),
+            })
+    return words
+
+
+def remap_times(result: Dict[str, Any], smap: SpeechMap) -> Dict[str, Any]:
+    """VAD로 잘라낸 오디오 기준 시간을 원본 오디오 시간으로 되돌림"""
+    for seg in result.get("segments", []):
+        for k in ("start", "end"):
+            if k in seg:
+                seg[k] = smap.to_original(float(seg[k]))
+        for w in seg.get("words", []):
+            w["start"] = smap.to_original(float(w.get("start", 0.0)))
+            w["end"] = smap.to_original(float(w.get("end", 0.0)))
+    return result
+
+
+def vad_trim(samples: np.ndarray) -> Tuple[np.ndarray, Optional[SpeechMap], float]:
+    """VAD 무음 제거 → (모델 입력, SpeechMap 또는 None, 발화 길이 s). VAD를 끄면 원본 그대로 (NumPy 연산이라 스레드풀에서)"""
+    if not VAD_ENABLED:
+        return samples, None, duration_of(samples)
+    with stage("vad"):
+        return trim_silence(samples, VAD_COLLAPSE_PAUSE_SEC)
+
+
+def decode_and_trim(data: bytes) -> Tuple[np.ndarray, float, Tuple[np.ndarray, Optional[SpeechMap], float]]:
+    """스레드풀에서 실행: 디코드 → 길이 검사 → VAD를 한 번에 (이벤트 루프를 막지 않게)"""
+    samples, duration_s = decode_audio_bytes(data)
+    enforce_limits(duration_s, len(data))
+    return samples, duration_s, vad_trim(samples)
+
+
+async def transcribe_samples(samples: np.ndarray, language: str, timestamps: str,
+                             trimmed: Optional[Tuple[np.ndarray, Optional[SpeechMap], float]] = None
+                             ) -> Tuple[Dict[str, Any], int, float]:
+    """
+    캐시/coalescing → (VAD 무음 제거) → 스케줄러(배치 추론) 순으로 전사.
+    trimmed(vad_trim 결과)를 안 주면 여기서 스레드풀로 VAD를 돌린다.
+    (결과, 처리 시간 ms, 실제 발화 길이 s)를 반환. 결과의 시간은 항상 원본 오디오 기준
+    """
+    t0 = now_ms()
+    if trimmed is None:
+        trimmed = await run_in_threadpool(vad_trim, samples)
+    model_input, smap, speech_s = trimmed
+
+    async def compute():
+        result = await inference.transcribe(model_input, language=language, want_word_ts=(timestamps == "word"))
+        return remap_times(result, smap) if smap is not None else result
+
+    # 캐시 키는 원본 PCM 기준 (VAD 설정과 무관하게 같은 업로드면 같은 키)
+    key = transcript_cache.make_key(samples, language, timestamps)
+    result, source = await transcript_cache.get_or_compute(key, compute)
+    timings = current_timings()
+    if timings is not None:
+        timings["transcript_cache"] = source
+    return result, now_ms() - t0, speech_s
+
+
+def build_stt_response(raw_text: str, words: List[Dict[str, Any]], duration_s: float, processing_ms: int,
+                       language: str, result: Dict[str, Any], speech_duration: Optional[float] = None) -> STTResponse:
+    return STTResponse(
+        rawText=raw_text,
+        normText=normalize_text(raw_text),
+        words=words,
+        duration=round(float(duration_s), 2),
+        speech_duration=round(float(speech_duration), 2) if speech_duration is not None else None,
+        processing_ms=int(processing_ms),
+        language=language if language != "auto" else (result.get("language") or "auto"),
+        model=result.get("model") or "unknown",
+        version=API_VERSION
+    )
+
+
+async def stt_from_bytes(data: bytes, language: str, timestamps: str) -> STTResponse:
+    """
+    업로드된 오디오 바이트 → STTResponse (/stt, /assess 공용)
+    메모리에서 바로 16kHz mono PCM 디코드 → 길이 검사 → VAD (스레드풀) → 캐시/배치 추론
+    """
+    samples, duration_s, trimmed = await run_in_threadpool(decode_and_trim, data)
+    result, processing_ms, speech_s = await transcribe_samples(samples, language, timestamps, trimmed)
+    with stage("postprocess"):
+        raw_text = result.get("text", "") or ""
+        words = flatten_words(result) if timestamps == "word" else []
+    return build_stt_response(raw_text, words, duration_s, processing_ms, language, result, speech_s)
@@ -0,0 +1,197 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import numpy as np
+from app.common_utils import now_ms, normalize_text
+from app.config import MAX_BYTES, MAX_SECONDS, STREAM_STEP_SEC, STREAM_HOLDBACK_SEC, STREAM_MAX_WINDOW_SEC
+from app.services import inference
+from app.services.audio import SAMPLE_RATE, detect_speech
+from app.services.stt_pipeline import flatten_words, build_stt_response
+from starlette.concurrency import run_in_threadpool
+
+
+class StreamLimitError(Exception):
+    pass
+
+
+class FfmpegStreamDecoder:
+    """
+    webm/ogg 등 청크를 상주 ffmpeg 프로세스의 stdin으로 흘려보내고
+    stdout의 16kHz mono float32 PCM을 on_pcm 콜백으로 넘긴다.
+    (MediaRecorder 청크는 첫 청크에만 헤더가 있어서 청크별 단독 디코드가 안 됨)
+    """
+
+    def __init__(self, on_pcm: Callable[[np.ndarray], None]):
+        self.on_pcm = on_pcm
+        self.proc = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self.proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+            "-fflags", "nobuffer", "-probesize", "4096", "-analyzeduration", "0",
+            "-i", "pipe:0",
+            "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "f32le", "-flush_packets", "1", "pipe:1",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+        )
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        carry = b""
+        while True:
+            data = await self.proc.stdout.read(65536)
+            if not data:
+                break
+            data = carry + data
+            n = len(data) - len(data) % 4
+            carry = data[n:]
+            if n:
+                self.on_pcm(np.frombuffer(data[:n], dtype=np.float32))
+
+    async def feed(self, chunk: bytes):
+        self.proc.stdin.write(chunk)
+        await self.proc.stdin.drain()
+
+    async def finish(self):
+        """입력을 닫고 남은 PCM을 모두 받을 때까지 대기"""
+        if self.proc.stdin and not self.proc.stdin.is_closing():
+            self.proc.stdin.close()
+        await self._reader
+        await self.proc.wait()
+
+    def kill(self):
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.kill()
+
+
+class Pcm16Decoder:
+    """이미 16kHz mono s16le로 보내는 클라이언트용: 변환 없이 바로 버퍼에"""
+
+    def __init__(self, on_pcm: Callable[[np.ndarray], None]):
+        self.on_pcm = on_pcm
+        self._carry = b""
+
+    async def start(self):
+        pass
+
+    async def feed(self, chunk: bytes):
+        data = self._carry + chunk
+        n = len(data) - len(data) % 2
+        self._carry = data[n:]
+        if n:
+            self.on_pcm(np.multiply(np.frombuffer(data[:n], dtype="<i2"), 1.0 / 32768.0, dtype=np.float32))
+
+    async def finish(self):
+        pass
+
+    def kill(self):
+        pass
+
+
+def _same_word(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
+    return normalize_text(a["word"]) == normalize_text(b["word"])
+
+
+class StreamSession:
+    """
+    WebSocket 스트리밍 전사 세션.
+    - 들어온 PCM은 MAX_SECONDS 크기로 미리 잡아둔 버퍼에 이어 붙인다
+    - partial: 아직 확정되지 않은 뒷부분(offset 이후)만 전사하고,
+      직전 partial과 앞부분이 일치하면서 끝에서 holdback 이상 떨어진 단어는 확정(commit)한다.
+      확정된 구간은 다시 전사하지 않으므로 한 번의 partial 비용은 버퍼 전체가 아니라 미확정 구간 길이에 비례
+    - final: 남은 미확정 구간만 전사해서 확정 단어와 합친 STTResponse 형태
+    """
+
+    def __init__(self, language: str, send: Callable[[Dict[str, Any]], Awaitable[None]], fmt: str = "webm"):
+        self.language = language
+        self.send = send
+        self.pcm = np.zeros(int(MAX_SECONDS * SAMPLE_RATE), dtype=np.float32)
+        self.n = 0                # 받은 샘플 수
+        self.offset = 0           # 확정된 구간의 끝 (샘플)
+        self.committed: List[Dict[str, Any]] = []
+        self.pending: List[Dict[str, Any]] = []   # 직전 partial의 미확정 단어 (절대 시간)
+        self.bytes_in = 0
+        self.last_partial_n = 0
+        self.last_result: Dict[str, Any] = {}
+        self.overflow = False
+        self._partial_task: Optional[asyncio.Task] = None
+        self.decoder = Pcm16Decoder(self._on_pcm) if fmt == "pcm16" else FfmpegStreamDecoder(self._on_pcm)
+
+    async def start(self):
+        await self.decoder.start()
+
+    def _on_pcm(self, samples: np.ndarray):
+        room = len(self.pcm) - self.n
+        if len(samples) > room:
+            self.overflow = True
+            samples = samples[:room]
+        self.pcm[self.n:self.n + len(samples)] = samples
+        self.n += len(samples)
+
+    async def feed(self, chunk: bytes):
+        self.bytes_in += len(chunk)
+        if self.bytes_in > MAX_BYTES:
+            raise StreamLimitError(f"Stream exceeds {MAX_BYTES} bytes")
+        await self.decoder.feed(chunk)
+        if self.overflow:
+            raise StreamLimitError(f"Audio length exceeds {MAX_SECONDS} seconds.")
+        # 새 오디오가 충분히 쌓였고 진행 중인 partial이 없으면 백그라운드로 partial 전사
+        busy = self._partial_task is not None and not self._partial_task.done()
+        if not busy and self.n - self.last_partial_n >= STREAM_STEP_SEC * SAMPLE_RATE:
+            self.last_partial_n = self.n
+            self._partial_task = asyncio.create_task(self._partial())
+
+    async def _transcribe_tail(self, end: int) -> List[Dict[str, Any]]:
+        tail = self.pcm[self.offset:end].copy()
+        result = await inference.transcribe(tail, self.language, True)
+        self.last_result = result
+        return flatten_words(result, offset=self.offset / SAMPLE_RATE)
+
+    async def _partial(self):
+        end = self.n
+        hyp = await self._transcribe_tail(end)
+
+        # LocalAgreement: 직전 가설과 앞부분이 같은 단어 중 holdback 밖에 있는 것만 확정
+        window_end = end / SAMPLE_RATE
+        horizon = window_end - STREAM_HOLDBACK_SEC
+        force = (end - self.offset) / SAMPLE_RATE > STREAM_MAX_WINDOW_SEC
+        k = 0
+        while k < len(hyp) and hyp[k]["end"] <= horizon and (
+                force or (k < len(self.pending) and _same_word(hyp[k], self.pending[k]))):
+            k += 1
+        if k:
+            self.committed.extend(hyp[:k])
+            self.offset = max(self.offset, int(hyp[k - 1]["end"] * SAMPLE_RATE))
+        self.pending = hyp[k:]
+
+        await self.send({
+            "type": "partial",
+            "committed_text": " ".join(w["word"] for w in self.committed),
+            "tentative_text": " ".join(w["word"] for w in self.pending),
+            "words": [dict(w, final=True) for w in self.committed] + [dict(w, final=False) for w in self.pending],
+            "duration": round(window_end, 2),
+        })
+
+    async def finish(self) -> Dict[str, Any]:
+        t0 = now_ms()
+        await self.decoder.finish()
+        if self._partial_task is not None:
+            try:
+                await self._partial_task
+            except Exception:
+                pass  # partial 실패는 최종 결과에 영향 없음 (남은 구간을 다시 전사)
+
+        tail_words: List[Dict[str, Any]] = []
+        if self.n - self.offset >= int(0.1 * SAMPLE_RATE):
+            tail_words = await self._transcribe_tail(self.n)
+        words = self.committed + tail_words
+        raw_text = " ".join(w["word"] for w in words)
+        spans = await run_in_threadpool(detect_speech, self.pcm[:self.n])
+        speech_s = (spans[-1][1] - spans[0][0]) / SAMPLE_RATE if spans else self.n / SAMPLE_RATE
+        resp = build_stt_response(raw_text, words, self.n / SAMPLE_RATE, now_ms() - t0, self.language,
+                                  self.last_result, speech_s)
+        return {"type": "final", **resp.model_dump()}
+
+    def abort(self):
+        if self._partial_task is not None:
+            self._partial_task.cancel()
+        self.decoder.kill()
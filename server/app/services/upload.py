@@ -0,0 +1,132 @@
+from typing import Dict, Optional
+from fastapi import Request
+from app.common_utils import ApiError
+from multipart.multipart import MultipartParser, parse_options_header
+from app.config import MAX_BYTES, MAX_SECONDS
+from app.services.audio import ensure_supported_mime, probe_duration
+from app.services.metrics import stage
+
+# multipart 헤더/텍스트 필드용 여유분 (오디오 본문과 별도)
+FORM_OVERHEAD_BYTES = 64 * 1024
+# 길이 probe는 앞부분 이 크기까지만 시도 (moov/Info가 앞에 있을 때만 의미 있음)
+PROBE_MAX_BYTES = 256 * 1024
+
+
+class AudioUpload:
+    """스트리밍으로 읽은 multipart 업로드 (오디오 바이트 + 텍스트 필드)"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.filename: Optional[str] = None
+        self.content_type: str = ""
+        self.fields: Dict[str, str] = {}
+
+
+def _too_large(message: str, hint: str, details: dict):
+    return ApiError(413, "PAYLOAD_TOO_LARGE", message, hint, details)
+
+
+def _bad_request(code: str, message: str, status: int = 400):
+    return ApiError(status, code, message)
+
+
+async def read_audio_upload(request: Request, field: str = "audio",
+                            max_bytes: int = MAX_BYTES, max_seconds: int = MAX_SECONDS) -> AudioUpload:
+    """
+    multipart 본문을 청크 단위로 읽으면서
+    - 누적 바이트가 max_bytes를 넘는 즉시 413
+    - 오디오 앞부분 헤더로 길이를 probe해서 max_seconds 초과면 즉시 413
+    - 지원하지 않는 MIME이면 본문을 다 받기 전에 415
+    전체를 다 받은 뒤 검사하던 방식과 달리, 거절할 요청은 메모리/CPU를 쓰기 전에 끊는다.
+    """
+    cl = request.headers.get("content-length")
+    if cl and cl.isdigit() and int(cl) > max_bytes + FORM_OVERHEAD_BYTES:
+        raise _too_large(f"Payload exceeds {max_bytes} bytes", "Try recording a shorter clip.", {"maxBytes": max_bytes})
+
+    ctype, params = parse_options_header(request.headers.get("content-type", ""))
+    if ctype != b"multipart/form-data" or b"boundary" not in params:
+        raise _bad_request("BAD_REQUEST", "multipart/form-data with a boundary is required")
+
+    upload = AudioUpload()
+    state = {"name": None, "is_file": False, "header_name": b"", "header_value": b"",
+             "disposition": b"", "ctype": b"", "buf": bytearray(), "probed": False}
+
+    def on_part_begin():
+        state.update(name=None, is_file=False, disposition=b"", ctype=b"", buf=bytearray())
+
+    def on_header_field(data, start, end):
+        state["header_name"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        name = state["header_name"].lower()
+        if name == b"content-disposition":
+            state["disposition"] = state["header_value"]
+        elif name == b"content-type":
+            state["ctype"] = state["header_value"]
+        state["header_name"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished():
+        _, opts = parse_options_header(state["disposition"])
+        state["name"] = opts.get(b"name", b"").decode("utf-8", "replace")
+        state["is_file"] = state["name"] == field
+        if state["is_file"]:
+            upload.filename = opts.get(b"filename", b"").decode("utf-8", "replace") or None
+            upload.content_type = state["ctype"].decode("latin-1").strip()
+            if not ensure_supported_mime(upload.content_type):
+                raise _bad_request("UNSUPPORTED_MEDIA_TYPE", "Only webm/wav/m4a/mp4/aac supported", 415)
+
+    def on_part_data(data, start, end):
+        if not state["is_file"]:
+            state["buf"] += data[start:end]
+            if len(state["buf"]) > FORM_OVERHEAD_BYTES:
+                raise _too_large("Form field too large", None, {"maxFieldBytes": FORM_OVERHEAD_BYTES})
+            return
+        upload.data += data[start:end]
+        if len(upload.data) > max_bytes:
+            raise _too_large(f"Payload exceeds {max_bytes} bytes", "Try recording a shorter clip.", {"maxBytes": max_bytes})
+        if not state["probed"]:
+            _probe(upload.data, max_seconds, state)
+
+    def on_part_end():
+        if state["name"] and not state["is_file"]:
+            upload.fields[state["name"]] = bytes(state["buf"]).decode("utf-8", "replace")
+
+    parser = MultipartParser(params[b"boundary"], {
+        "on_part_begin": on_part_begin,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+    })
+
+    received = 0
+    with stage("upload"):  # 클라이언트 전송 시간 포함
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes + FORM_OVERHEAD_BYTES:
+                raise _too_large(f"Payload exceeds {max_bytes} bytes", "Try recording a shorter clip.", {"maxBytes": max_bytes})
+            parser.write(chunk)
+        parser.finalize()
+
+    if upload.filename is None and not upload.data:
+        raise _bad_request("BAD_REQUEST", f"'{field}' file field is required", 422)
+    return upload
+
+
+def _probe(head: bytearray, max_seconds: int, state: dict):
+    """
+    앞부분 바이트로 길이를 알 수 있으면 즉시 한도 검사. 확정 길이가 나오면 더 probe하지 않음.
+    (크기 미기재 WAV는 받은 양 기준 최소 길이라 청크마다 다시 검사)
+    """
+    dur, exact = probe_duration(head)
+    if dur is not None and dur > max_seconds:
+        raise _too_large(f"Audio length exceeds {max_seconds} seconds.", "Try recording a shorter clip.",
+                         {"maxSeconds": max_seconds, "probedSeconds": round(dur, 2)})
+    if exact or (dur is None and len(head) >= PROBE_MAX_BYTES):
+        state["probed"] = True
@@ -0,0 +1,190 @@
+import re, threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.common_utils import LRUCache, normalize_text
+from app.config import VISEME_FPS, VISEME_CACHE_SIZE
+from app.utils.ipa_converter import (HANGUL_BASE, HANGUL_END, ONSETS, NUCLEI, CODAS,
+                                     ONSET_IPA, NUCLEUS_IPA, CODA_IPA, text_to_ipa)
+
+# 입모양(viseme) 타임라인: ipa_converter 음절 분해 → 자모별 IPA → 입모양 그룹 → 시간축 트랙
+# 그룹 이름/이미지는 front-end/src/lib/ipaToMouthGroup.ts (public/mouth/*.png)와 같다
+
+NEUTRAL = "NEUTRAL"
+
+# ipaToMouthGroup.ts의 IPA_PATTERNS와 같은 순서 (+ 한국어 ㄹ 탄설음 ɾ → L)
+IPA_PATTERNS: List[Tuple[re.Pattern, str]] = [(re.compile(p, re.I), g) for p, g in [
+    (r"aɪ|eɪ|oʊ|ɔɪ|aʊ", "O"),
+    (r"iː", "EE"),
+    (r"θ|ð", "TH"),
+    (r"t͡?ʃ|d͡?ʒ|tɕ|dʑ|ʃ|ʒ|ɕ", "CHJSH"),
+    (r"w", "QW"),
+    (r"l|ɾ", "L"),
+    (r"ɹ|r", "R"),
+    (r"b|m|p", "BMP"),
+    (r"i|ɪ|e|ɛ|æ|a", "AEI"),
+    (r"u|ʊ|ɯ", "U"),
+    (r"o|ɔ|oʊ|ʌ", "O"),
+    (r"k|g|ŋ|t|d|n|s|z|j|x|ç|h", "CORE"),
+]]
+
+# 음절 안에서 초성 / 중성 / 종성이 차지하는 시간 비율 (모음이 가장 길게 보임)
+ONSET_WEIGHT, NUCLEUS_WEIGHT, CODA_WEIGHT = 0.3, 1.0, 0.4
+
+_units_cache = LRUCache(max_items=VISEME_CACHE_SIZE)
+_track_cache = LRUCache(max_items=VISEME_CACHE_SIZE)
+# viseme_track은 threadpool에서 불리고 LRUCache는 스레드 안전하지 않음 → get/put만 잠금 (계산은 잠그지 않음)
+_cache_lock = threading.Lock()
+
+
+def ipa_to_group(ipa: str) -> str:
+    if not ipa:
+        return NEUTRAL
+    for pattern, group in IPA_PATTERNS:
+        if pattern.search(ipa):
+            return group
+    return NEUTRAL
+
+
+def syllable_segments(ch: str) -> List[Tuple[str, str, float]]:
+    """발음형 음절 한 글자 → [(입모양, IPA, 시간 비중)] (ㅘ/ㅝ 같은 w 이중모음은 QW → 모음 두 구간)"""
+    i = ord(ch) - HANGUL_BASE
+    if not 0 <= i <= HANGUL_END - HANGUL_BASE:
+        return []
+    onset, nucleus, coda = ONSETS[i // 588], NUCLEI[(i % 588) // 28], CODAS[i % 28]
+    segs = []
+    o = ONSET_IPA.get(onset, "")
+    if o:
+        segs.append((ipa_to_group(o), o, ONSET_WEIGHT))
+    n = NUCLEUS_IPA[nucleus]
+    if n.startswith("w") and len(n) > 1:
+        segs.append(("QW", "w", NUCLEUS_WEIGHT * 0.4))
+        segs.append((ipa_to_group(n[1:]), n[1:], NUCLEUS_WEIGHT * 0.6))
+    else:
+        # j/ɰ 활음은 입모양 차이가 작아서 뒤 모음으로
+        v = n[1:] if n[0] in "jɰ" and len(n) > 1 else n
+        segs.append((ipa_to_group(v), n, NUCLEUS_WEIGHT))
+    c = CODA_IPA.get(coda, "")
+    if c:
+        segs.append((ipa_to_group(c), c, CODA_WEIGHT))
+    return segs
+
+
+def viseme_units(text: str) -> List[List[Dict[str, Any]]]:
+    """
+    문장 → 단어별 음절 목록 [[{"char", "ipa", "segments"}]] (문장 단위 캐시).
+    발음 변환(연음 등)은 text_to_ipa 결과의 발음형 음절을 그대로 사용
+    """
+    key = normalize_text(text)
+    with _cache_lock:
+        cached = _units_cache.get(key)
+    if cached is not None:
+        return cached
+    words, cur = [], []
+    for syl in text_to_ipa(key)["syllables"]:
+        if syl["char"] == " ":
+            if cur:
+                words.append(cur)
+            cur = []
+            continue
+        segs = syllable_segments(syl["char"])
+        if segs:
+            cur.append({"char": syl["char"], "ipa": syl["ipa"], "segments": segs})
+    if cur:
+        words.append(cur)
+    with _cache_lock:
+        _units_cache.put(key, words)
+    return words
+
+
+def _word_spans(units: List[List[Dict[str, Any]]], words: Optional[Sequence[Dict[str, Any]]],
+                duration: float) -> List[Tuple[float, float]]:
+    """
+    단어별 (start, end).
+    STT 단어 수가 발음형 단어 수와 같으면 단어 타임스탬프를 그대로, 다르면(띄어쓰기 차이 등)
+    STT 전체 구간을 음절 수 비율로 나눈다. 타임스탬프가 없으면 0 ~ duration
+    """
+    if words and len(words) == len(units):
+        return [(float(w["start"]), float(w["end"])) for w in words]
+    if words:
+        start, end = float(words[0]["start"]), float(words[-1]["end"])
+    else:
+        start, end = 0.0, duration
+    total = sum(len(u) for u in units) or 1
+    spans, t = [], start
+    for u in units:
+        d = (end - start) * len(u) / total
+        spans.append((t, t + d))
+        t += d
+    return spans
+
+
+def build_track(units: List[List[Dict[str, Any]]], spans: List[Tuple[float, float]], duration: float,
+                fps: int = VISEME_FPS) -> Dict[str, Any]:
+    """
+    segments: [{"start", "end", "viseme", "ipa", "char"}] (연속된 같은 입모양은 합침, 단어 사이는 NEUTRAL)
+    frames: fps 간격으로 샘플링한 입모양 이름 배열 (frames[k] = k / fps 초)
+    """
+    segments: List[Dict[str, Any]] = []
+
+    def push(start: float, end: float, viseme: str, ipa: str = "", char: str = ""):
+        if end <= start:
+            return
+        last = segments[-1] if segments else None
+        if last and last["viseme"] == viseme and abs(last["end"] - start) < 1e-6:
+            last["end"] = end
+            last["ipa"] += ipa
+            last["char"] += char if char not in last["char"][-1:] else ""
+            return
+        segments.append({"start": start, "end": end, "viseme": viseme, "ipa": ipa, "char": char})
+
+    t = 0.0
+    for word, (ws, we) in zip(units, spans):
+        push(t, ws, NEUTRAL)
+        per_syll = (we - ws) / len(word) if word else 0.0
+        for k, syl in enumerate(word):
+            s0 = ws + k * per_syll
+            total_w = sum(w for _, _, w in syl["segments"])
+            for group, ipa, w in syl["segments"]:
+                d = per_syll * w / total_w
+                push(s0, s0 + d, group, ipa, syl["char"])
+                s0 += d
+        t = max(t, we)
+    duration = max(duration, t)
+    push(t, duration, NEUTRAL)
+
+    n_frames = int(round(duration * fps))
+    frames, k = [], 0
+    for f in range(n_frames):
+        ft = f / fps
+        while k < len(segments) - 1 and segments[k]["end"] <= ft:
+            k += 1
+        seg = segments[k] if segments else None
+        frames.append(seg["viseme"] if seg and seg["start"] <= ft < seg["end"] else NEUTRAL)
+
+    for seg in segments:
+        seg["start"], seg["end"] = round(seg["start"], 3), round(seg["end"], 3)
+    return {"fps": fps, "duration": round(duration, 3), "segments": segments, "frames": frames}
+
+
+def viseme_track(text: str, duration: float = 0.0, words: Optional[Sequence[Dict[str, Any]]] = None,
+                 fps: int = VISEME_FPS) -> Dict[str, Any]:
+    """
+    - words(/stt 단어 타임스탬프)가 있으면 그 시간에 맞춰서, text가 비어 있으면 단어들로 문장 구성
+    - 없으면 text를 0 ~ duration에 음절 수 비율로 배치 (기준 문장 재생용, 문장/길이/fps 단위로 캐시)
+    """
+    if not text and words:
+        text = " ".join(str(w["word"]).strip() for w in words)
+    key = (normalize_text(text), round(duration, 2), fps) if not words else None
+    if key is not None:
+        with _cache_lock:
+            cached = _track_cache.get(key)
+        if cached is not None:
+            return cached
+    units = viseme_units(text)
+    if words:
+        duration = max(duration, float(words[-1]["end"]))
+    track = build_track(units, _word_spans(units, words, duration), duration, fps)
+    track["text"] = normalize_text(text)
+    if key is not None:
+        with _cache_lock:
+            _track_cache.put(key, track)
+    return track
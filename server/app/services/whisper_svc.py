@@ -1,37 +1,133 @@
-import whisper, torch
-from typing import Dict, Any, List
-from app.config import MODEL_NAME, LANGUAGE_DEFAULT
+import time
+import numpy as np
+from typing import Callable, Dict, Any, List, Optional
+from app.config import MODEL_NAME, LANGUAGE_DEFAULT, ASR_BACKEND, WARMUP_RUNS, WARMUP_SECONDS
+from app.services.asr_backends import AsrBackend, create_backend
+from app.services.metrics import stage
 
-_model = None
-_device = "cuda" if torch.cuda.is_available() else "cpu"
+# 실제 엔진은 ASR_BACKEND로 선택 (whisper / whisper-int8 / faster-whisper / stub)
+# 라우터·스케줄러·워커는 이 모듈 함수만 부르므로 엔진이 바뀌어도 결과 모양(STTResponse 계약)은 같다
+_backend: Optional[AsrBackend] = None
 _ready_error = None
 
-def load_model():
-    global _model, _ready_error
+# 시작 상태: idle → loading → warming → ready (실패 시 error)
+# progress는 (가중치 로드 1단계 + 워밍업 WARMUP_RUNS단계) 중 끝난 비율
+_status = "idle"
+_steps_done = 0
+_load_ms: Optional[int] = None
+_warmup_ms: Optional[int] = None
+
+def _warmup_audio(seconds: float = WARMUP_SECONDS, sr: int = 16000) -> np.ndarray:
+    """워밍업용 합성 음성: 음절처럼 끊기는 배음 + 약한 잡음 (무음이면 디코더/word timestamp 경로가 안 돎)"""
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    f0 = 140.0 + 30.0 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.5 * (1 - np.cos(2 * np.pi * 4.0 * t))
+    noise = np.random.default_rng(0).standard_normal(len(t)) * 0.003
+    return (0.2 * voice * envelope + noise).astype(np.float32)
+
+def warmup(runs: int = WARMUP_RUNS, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+    """
+    첫 요청이 치르는 비용(커널 선택, mel 필터뱅크 생성, 메모리 할당 등)을 미리 치름.
+    배치 경로를 타도록 클립 2개로 transcribe_batch 실행
+    """
+    global _steps_done
+    clip = _warmup_audio()
+    for _ in range(runs):
+        _backend.transcribe_batch([clip, clip[: len(clip) // 2]], language=LANGUAGE_DEFAULT, want_word_ts=True)
+        _steps_done += 1
+        if on_progress:
+            on_progress(status())
+
+def preload():
+    """
+    가중치만 로드 (워밍업/추론 없음). app.serve가 fork 전에 부모 프로세스에서 호출 →
+    자식 워커들은 copy-on-write로 같은 가중치 메모리를 공유하고 load_model()에서 로드를 건너뛴다
+    """
+    global _backend, _load_ms
+    t0 = time.perf_counter()
+    backend = create_backend(ASR_BACKEND)
+    backend.load()
+    _backend = backend
+    _load_ms = int((time.perf_counter() - t0) * 1000)
+
+def load_model(on_progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+    """
+    엔진 로드(preload된 경우 생략) + 워밍업. 끝나야 is_ready()가 True.
+    on_progress(status()): 단계가 바뀔 때마다 호출 (워커 프로세스가 부모에게 진행 상황 보고용)
+    """
+    global _backend, _ready_error, _status, _steps_done, _load_ms, _warmup_ms
+    _status, _steps_done, _ready_error = "loading", 0, None
+    if on_progress:
+        on_progress(status())
     try:
-        _model = whisper.load_model(MODEL_NAME, device=_device)
-        _ready_error = None
+        if _backend is None:
+            preload()
+        _steps_done = 1
+        _status = "warming"
+        if on_progress:
+            on_progress(status())
+
+        t0 = time.perf_counter()
+        try:
+            warmup(on_progress=on_progress)
+        except Exception as e:
+            # 워밍업 실패는 첫 요청이 느려질 뿐이므로 서비스는 계속
+            print(f"[whisper_svc] warmup failed: {e}")
+        _warmup_ms = int((time.perf_counter() - t0) * 1000)
+        _steps_done = 1 + WARMUP_RUNS
+        _status = "ready"
     except Exception as e:
         _ready_error = str(e)
+        _status = "error"
+    if on_progress:
+        on_progress(status())
 
 def is_ready() -> bool:
-    return _model is not None and _ready_error is None
+    return _status == "ready" and _backend is not None
+
+def status() -> Dict[str, Any]:
+    return {
+        "status": _status,
+        "progress": round(_steps_done / (1 + WARMUP_RUNS), 3),
+        "load_ms": _load_ms,
+        "warmup_ms": _warmup_ms,
+        "device": device_name(),
+        "error": _ready_error,
+    }
 
 def ready_error() -> str:
     return _ready_error or ""
 
 def device_name() -> str:
-    return _device
+    return _backend.device if _backend is not None else ""
+
+def model_label() -> str:
+    """응답의 model 필드: 엔진별 A/B 비교용 (예: base/whisper-int8)"""
+    return f"{MODEL_NAME}/{ASR_BACKEND}"
+
+def _tag(result: Dict[str, Any]) -> Dict[str, Any]:
+    result["model"] = model_label()
+    return result
 
-def transcribe_wav(path: str, language: str = LANGUAGE_DEFAULT, want_word_ts: bool = True) -> Dict[str, Any]:
+def transcribe_audio(audio: np.ndarray, language: str = LANGUAGE_DEFAULT, want_word_ts: bool = True) -> Dict[str, Any]:
     """
-    Whisper transcribe 호출. word timestamps를 원하면 True.
+    단건 전사. audio는 16kHz mono float32 배열
+    word timestamps를 원하면 True.
     """
-    result = _model.transcribe(
-        path,
-        language=language if language != "auto" else None,
-        word_timestamps=want_word_ts,
-        # 초기엔 VAD off (문장 자르기 이슈 방지). 필요시 넣기: vad_filter=True
-        # fp16=True if _device == "cuda" else False
-    )
-    return result
+    return _tag(_backend.transcribe(audio, language=language, want_word_ts=want_word_ts))
+
+def transcribe_batch(audios: List[np.ndarray], language: str = LANGUAGE_DEFAULT, want_word_ts: bool = True) -> List[Dict[str, Any]]:
+    """
+    여러 클립을 엔진의 배치 경로로 처리 (배치 경로가 없는 엔진은 한 건씩).
+    결과 모양은 transcribe()와 같다: {"text", "segments": [{..., "words"}], "language"}
+    """
+    with stage("asr_model"):
+        results = _backend.transcribe_batch(audios, language=language, want_word_ts=want_word_ts)
+    return [_tag(r) for r in results]
+
+def score_reference(audio: np.ndarray, reference_text: str, language: str = LANGUAGE_DEFAULT) -> Dict[str, Any]:
+    """기준 문장 강제 정렬 점수 (자유 디코딩 없이 teacher forcing 1회)"""
+    with stage("asr_model"):
+        return _tag(_backend.score_reference(audio, reference_text, language=language))
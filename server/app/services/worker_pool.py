@@ -0,0 +1,271 @@
+import asyncio, itertools, os, threading, time
+import multiprocessing as mp
+from typing import Any, Dict, List, Optional
+from app.config import INFERENCE_TIMEOUT_S
+
+# spawn: 부모의 torch 스레드/락 상태를 물려받지 않도록 새 인터프리터로 시작
+_ctx = mp.get_context("spawn")
+
+MONITOR_INTERVAL_S = 1.0
+# 준비 전에 죽는 워커(모델 로드 실패 등)는 재시작 간격을 늘려 crash loop 방지
+RESTART_BACKOFF_MAX_S = 30.0
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+# 입력 문제를 뜻하는 예외는 타입을 살려서 넘김 (라우터가 422 등으로 매핑), 나머지는 RuntimeError
+_PASSTHROUGH_ERRORS = {"ValueError": ValueError, "NotImplementedError": NotImplementedError}
+
+
+def _remote_error(name: str, message: str) -> Exception:
+    cls = _PASSTHROUGH_ERRORS.get(name)
+    return cls(message) if cls is not None else RuntimeError(f"{name}: {message}")
+
+
+def _worker_main(index: int, cores: List[int], req_q, res_q):
+    """
+    추론 워커 프로세스 본체.
+    코어 고정 → (torch import 전에) 스레드 수 지정 → 모델 로드 → 요청 루프
+    요청: (job_id, fn_name, args) / 응답: (index, job_id, ok, value), 실패면 value = (예외 이름, 메시지)
+    """
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    n_threads = str(max(1, len(cores)))
+    os.environ["OMP_NUM_THREADS"] = n_threads
+    os.environ["MKL_NUM_THREADS"] = n_threads
+
+    try:
+        import torch
+        torch.set_num_threads(int(n_threads))
+    except ImportError:
+        pass  # torch를 쓰지 않는 엔진(faster-whisper)은 OMP_NUM_THREADS만으로 충분
+    from app.services import whisper_svc
+
+    # 로드/워밍업 단계마다 상태 보고: (index, None, ready, whisper_svc.status())
+    whisper_svc.load_model(on_progress=lambda st: res_q.put((index, None, st["status"] == "ready", st)))
+    if not whisper_svc.is_ready():
+        # 로드 실패: 요청 루프에 남지 않고 종료 → 부모 _watch가 retire + backoff 후 재시작
+        res_q.close()
+        res_q.join_thread()  # 마지막 상태 보고(error)가 부모에 전달된 뒤 종료
+        os._exit(1)
+
+    while True:
+        msg = req_q.get()
+        if msg is None:
+            break
+        job_id, fn_name, args = msg
+        try:
+            value = getattr(whisper_svc, fn_name)(*args)
+            res_q.put((index, job_id, True, value))
+        except Exception as e:
+            res_q.put((index, job_id, False, (type(e).__name__, str(e))))
+
+
+class _Worker:
+    def __init__(self, index: int, cores: List[int]):
+        self.index = index
+        self.cores = cores
+        self.proc = None
+        self.req_q = None
+        self.ready = False
+        self.error: Optional[str] = None
+        self.device = "cpu"
+        self.state: Dict[str, Any] = {"status": "idle", "progress": 0.0}
+        self.restarts = 0
+        self.backoff_s = 0.0
+        self.restart_at = 0.0
+        # job_id -> (future, deadline)
+        self.inflight: Dict[int, tuple] = {}
+
+
+class WorkerPool:
+    """
+    모델 복제본을 하나씩 가진 추론 워커 프로세스 풀.
+    - 요청은 in-flight가 가장 적은 준비된 워커로 보낸다
+    - 워커가 죽거나 INFERENCE_TIMEOUT_S 넘게 응답이 없으면 진행 중 요청을 실패 처리하고 재시작
+    HTTP 서버 프로세스는 모델을 들고 있지 않으므로 워커 장애가 /health 등에 영향을 주지 않는다.
+    """
+
+    def __init__(self, n_workers: int, threads_per_worker: int = 0, timeout_s: float = INFERENCE_TIMEOUT_S):
+        cores = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+        per = threads_per_worker or max(1, len(cores) // n_workers)
+        self.workers = [
+            _Worker(i, [cores[(i * per + k) % len(cores)] for k in range(per)])
+            for i in range(n_workers)
+        ]
+        self.timeout_s = timeout_s
+        self._res_q = _ctx.Queue()
+        self._ids = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reader: Optional[threading.Thread] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._closing = False
+
+    # ---------- lifecycle ----------
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        for w in self.workers:
+            self._spawn(w)
+        self._reader = threading.Thread(target=self._read_results, name="worker-pool-reader", daemon=True)
+        self._reader.start()
+        self._monitor = asyncio.create_task(self._watch())
+
+    def _spawn(self, w: _Worker):
+        w.req_q = _ctx.Queue()
+        w.ready = False
+        w.state = {"status": "loading", "progress": 0.0}
+        w.proc = _ctx.Process(target=_worker_main, args=(w.index, w.cores, w.req_q, self._res_q),
+                              name=f"whisper-worker-{w.index}", daemon=True)
+        w.proc.start()
+
+    async def stop(self):
+        self._closing = True
+        if self._monitor is not None:
+            self._monitor.cancel()
+        for w in self.workers:
+            try:
+                w.req_q.put(None)
+            except Exception:
+                pass
+        deadline = time.monotonic() + 5
+        for w in self.workers:
+            w.proc.join(max(0.0, deadline - time.monotonic()))
+            if w.proc.is_alive():
+                w.proc.kill()
+            self._fail_inflight(w, RuntimeError("Worker pool stopped"))
+        self._res_q.put(None)  # reader 스레드 종료
+
+    # ---------- status ----------
+
+    def is_ready(self) -> bool:
+        return any(w.ready for w in self.workers)
+
+    def ready_error(self) -> str:
+        errors = [f"worker{w.index}: {w.error}" for w in self.workers if w.error]
+        return "; ".join(errors)
+
+    def device_name(self) -> str:
+        devices = {w.device for w in self.workers if w.ready}
+        return ",".join(sorted(devices)) or "cpu"
+
+    def status(self) -> Dict[str, Any]:
+        """
+        whisper_svc.status()와 같은 모양으로 워커들을 합침.
+        하나라도 ready면 ready, 모두 error면 error, 아니면 가장 앞선 워커의 단계
+        """
+        states = [w.state for w in self.workers]
+        if any(w.ready for w in self.workers):
+            status = "ready"
+        elif all(st["status"] == "error" for st in states):
+            status = "error"
+        else:
+            status = "warming" if any(st["status"] == "warming" for st in states) else "loading"
+        load = [st["load_ms"] for st in states if st.get("load_ms") is not None]
+        warm = [st["warmup_ms"] for st in states if st.get("warmup_ms") is not None]
+        return {
+            "status": status,
+            "progress": round(sum(st["progress"] for st in states) / len(states), 3),
+            "load_ms": max(load) if load else None,
+            "warmup_ms": max(warm) if warm else None,
+            "device": self.device_name(),
+            "error": self.ready_error() or None,
+        }
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [{"index": w.index, "pid": w.proc.pid if w.proc else None, "ready": w.ready,
+                 "status": w.state["status"], "inflight": len(w.inflight), "restarts": w.restarts, "cores": w.cores}
+                for w in self.workers]
+
+    # ---------- dispatch ----------
+
+    async def call(self, fn_name: str, *args) -> Any:
+        """whisper_svc.<fn_name>(*args)를 가장 한가한 워커에서 실행"""
+        ready = [w for w in self.workers if w.ready]
+        if not ready:
+            raise RuntimeError("No inference worker is ready")
+        w = min(ready, key=lambda x: len(x.inflight))
+        job_id = next(self._ids)
+        future = self._loop.create_future()
+        w.inflight[job_id] = (future, time.monotonic() + self.timeout_s)
+        w.req_q.put((job_id, fn_name, args))
+        try:
+            return await future
+        finally:
+            w.inflight.pop(job_id, None)
+
+    async def run_batch(self, audios, language: str, want_word_ts: bool):
+        # InferenceScheduler runner 규격
+        return await self.call("transcribe_batch", audios, language, want_word_ts)
+
+    # ---------- result / health handling ----------
+
+    def _read_results(self):
+        while True:
+            try:
+                msg = self._res_q.get()
+            except (EOFError, OSError):
+                return
+            if msg is None:
+                return
+            self._loop.call_soon_threadsafe(self._resolve, msg)
+
+    def _resolve(self, msg):
+        index, job_id, ok, value = msg
+        w = self.workers[index]
+        if job_id is None:
+            # 워커 로드/워밍업 진행 상황 보고 (value = whisper_svc.status())
+            w.ready, w.state, w.error = ok, value, value.get("error")
+            if value.get("device"):
+                w.device = value["device"]
+            if ok:
+                w.backoff_s = 0.0
+            return
+        entry = w.inflight.pop(job_id, None)
+        if entry is None or entry[0].done():
+            return
+        if ok:
+            entry[0].set_result(value)
+        else:
+            entry[0].set_exception(_remote_error(*value))
+
+    def _fail_inflight(self, w: _Worker, exc: Exception):
+        for future, _ in list(w.inflight.values()):
+            if not future.done():
+                future.set_exception(exc)
+        w.inflight.clear()
+
+    def _retire(self, w: _Worker, reason: str):
+        """죽었거나 멈춘 워커 정리: 진행 중 요청 실패 처리 + 재시작 시각 결정"""
+        print(f"[worker_pool] worker{w.index} (pid={w.proc.pid}) down: {reason}")
+        if w.proc.is_alive():
+            w.proc.kill()
+        w.proc.join(1)
+        self._fail_inflight(w, WorkerCrashed(reason))
+        if w.ready:
+            w.backoff_s = 0.0
+        else:
+            w.backoff_s = min(RESTART_BACKOFF_MAX_S, max(MONITOR_INTERVAL_S, w.backoff_s * 2))
+        w.ready = False
+        w.error = reason
+        w.state = dict(w.state, status="error", error=reason)
+        w.restart_at = time.monotonic() + w.backoff_s
+
+    async def _watch(self):
+        while not self._closing:
+            await asyncio.sleep(MONITOR_INTERVAL_S)
+            now = time.monotonic()
+            for w in self.workers:
+                if w.restart_at:
+                    if w.restart_at <= now:
+                        w.restart_at = 0.0
+                        w.restarts += 1
+                        self._spawn(w)
+                elif not w.proc.is_alive():
+                    # 로드 실패로 종료했으면 워커가 마지막에 보고한 오류를 같이 남김 (/health error)
+                    reason = f"exited with code {w.proc.exitcode}"
+                    self._retire(w, f"{reason} ({w.error})" if w.error else reason)
+                elif any(deadline < now for _, deadline in w.inflight.values()):
+                    self._retire(w, f"no response within {self.timeout_s}s")
@@ -1,6 +1,9 @@
-from g2pk import G2p
-import hgtk
-from hgtk import checker, letter
+import threading
+from typing import Dict, Any, List, Optional
+from app.common_utils import LRUCache, normalize_text
+from app.config import IPA_CACHE_SIZE, IPA_WORD_CACHE_SIZE
+from app.utils import ipa_index
+from app.services.metrics import stage
 
 # ==========================
 # IPA & Romanization 매핑
@@ -34,52 +37,152 @@ CODA_ROMA = {
 }
 
 
+# ==========================
+# 음절표: 완성형 11,172자(U+AC00~U+D7A3)를 한 번에 미리 계산
+# codepoint - 0xAC00 = (초성 * 21 + 중성) * 28 + 종성
+# ==========================
+HANGUL_BASE, HANGUL_END = 0xAC00, 0xD7A3
+ONSETS = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+NUCLEI = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+CODAS = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+         "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+def _build_tables():
+    ipa_table, roma_table = [], []
+    for onset in ONSETS:
+        for nucleus in NUCLEI:
+            for coda in CODAS:
+                ipa_table.append(ONSET_IPA.get(onset, "") + NUCLEUS_IPA.get(nucleus, "") + CODA_IPA.get(coda, ""))
+                roma_table.append(ONSET_ROMA.get(onset, "") + NUCLEUS_ROMA.get(nucleus, "") + CODA_ROMA.get(coda, ""))
+    # 낱자모(ㄱ, ㅏ 등)는 초성 → 중성 → 종성 순으로 해석
+    jamo = {}
+    for c in CODAS[1:]:
+        jamo[c] = (CODA_IPA.get(c, ""), CODA_ROMA.get(c, ""))
+    for c in NUCLEI:
+        jamo[c] = (NUCLEUS_IPA[c], NUCLEUS_ROMA[c])
+    for c in ONSETS:
+        jamo[c] = (ONSET_IPA[c], ONSET_ROMA[c])
+    return ipa_table, roma_table, jamo
+
+IPA_TABLE, ROMA_TABLE, JAMO_TABLE = _build_tables()
+
+
 # ==========================
 # Helper: 한 글자 변환
 # ==========================
 def map_syllable(ch: str):
-    if not checker.is_hangul(ch):
-        return ch, ch
-    onset, nucleus, coda = letter.decompose(ch)
-    if coda == " ":
-        coda = ""
+    i = ord(ch) - HANGUL_BASE
+    if 0 <= i <= HANGUL_END - HANGUL_BASE:
+        return IPA_TABLE[i], ROMA_TABLE[i]
+    return JAMO_TABLE.get(ch, (ch, ch))
 
-    ipa = ONSET_IPA.get(onset, "") + NUCLEUS_IPA.get(nucleus, "") + CODA_IPA.get(coda, "")
-    roma = ONSET_ROMA.get(onset, "") + NUCLEUS_ROMA.get(nucleus, "") + CODA_ROMA.get(coda, "")
-    return ipa, roma
+def map_word(word: str):
+    """
+    단어 단위 변환 → (ipa, 로마자, 음절 리스트).
+    완성형 음절로만 된 단어(대부분)는 인덱스 조회 + join 한 번으로 처리
+    """
+    idx = [ord(ch) - HANGUL_BASE for ch in word]
+    if all(0 <= i <= HANGUL_END - HANGUL_BASE for i in idx):
+        ipas = [IPA_TABLE[i] for i in idx]
+        romas = [ROMA_TABLE[i] for i in idx]
+    else:
+        pairs = [map_syllable(ch) for ch in word]
+        ipas = [p[0] for p in pairs]
+        romas = [p[1] for p in pairs]
+    syllables = [{"char": ch, "ipa": ipa, "roman": roma} for ch, ipa, roma in zip(word, ipas, romas)]
+    return "".join(ipas), "".join(romas), syllables
 
 
 # ==========================
 # Main: 문장 변환
 # ==========================
+class IpaConverter:
+    """
+    G2p는 사전/형태소 분석기 로딩 비용이 커서 한 번만 만들어 재사용한다.
+    - 문장 결과: 정규화한 문장 기준 LRU
+    - 단어 결과(발음형 단어 → IPA/로마자/음절): 단어 기준 LRU
+    """
+
+    def __init__(self, sentence_cache_size: int = IPA_CACHE_SIZE, word_cache_size: int = IPA_WORD_CACHE_SIZE):
+        # g2pk import 자체가 무거워서 실제로 변환기가 필요할 때만 import
+        from g2pk import G2p
+        self._g2p = G2p()
+        # G2p(mecab)와 LRU 모두 스레드 안전하지 않음 → sync 라우터가 threadpool에서 불러도 안전하게
+        self._lock = threading.Lock()
+        self._sentences = LRUCache(max_items=sentence_cache_size)
+        self._words = LRUCache(max_items=word_cache_size)
+
+    def _convert_word(self, word: str):
+        cached = self._words.get(word)
+        if cached is None:
+            cached = map_word(word)
+            self._words.put(word, cached)
+        return cached
+
+    def _convert(self, text: str) -> Dict[str, Any]:
+        phonetic = self._g2p(text)  # "좋아요" → "조아요"
+
+        ipa_words, roman_words = [], []
+        syllable_list = []  # 음절별 구조
+
+        for word in phonetic.split():
+            ipa, roma, syllables = self._convert_word(word)
+            ipa_words.append(ipa)
+            roman_words.append(roma)
+            syllable_list.extend(syllables)
+            syllable_list.append({"char": " ", "ipa": " ", "roman": " "})  # 단어 간 구분
+
+        return {
+            "phonetic": phonetic,
+            "ipa": " ".join(ipa_words),
+            "romanized": " ".join(roman_words),
+            "syllables": syllable_list,
+        }
+
+    def convert(self, sentence: str) -> Dict[str, Any]:
+        key = normalize_text(sentence)
+        with self._lock:
+            cached = self._sentences.get(key)
+            if cached is None:
+                cached = self._convert(key)
+                self._sentences.put(key, cached)
+        return {"original": sentence, **cached}
+
+    def convert_many(self, sentences: List[str]) -> List[Dict[str, Any]]:
+        return [self.convert(s) for s in sentences]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sentences": self._sentences.stats(), "words": self._words.stats()}
+
+
+_converter: Optional[IpaConverter] = None
+_converter_lock = threading.Lock()
+
+def init_converter() -> IpaConverter:
+    """서버 시작 시(lifespan) 한 번 호출. 이후 요청은 같은 인스턴스를 사용"""
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            _converter = IpaConverter()
+    return _converter
+
+def get_converter() -> IpaConverter:
+    return _converter if _converter is not None else init_converter()
+
+def converter_stats() -> Optional[Dict[str, Any]]:
+    """변환기를 아직 만들지 않았으면 None (g2pk 로딩을 일으키지 않음)"""
+    return _converter.stats() if _converter is not None else None
+
 def text_to_ipa(sentence: str):
-    g2p = G2p()
-    phonetic = g2p(sentence)  # "좋아요" → "조아요"
-
-    words = phonetic.split()
-    ipa_words, roman_words = [], []
-    syllable_list = []  # 음절별 구조
-
-    for word in words:
-        ipa_word, roma_word = [], []
-
-        for ch in word:
-            ipa, roma = map_syllable(ch)
-            ipa_word.append(ipa)
-            roma_word.append(roma)
-            syllable_list.append({"char": ch, "ipa": ipa, "roman": roma})
-
-        ipa_words.append("".join(ipa_word))
-        roman_words.append("".join(roma_word))
-        syllable_list.append({"char": " ", "ipa": " ", "roman": " "})  # 단어 간 구분
-
-    return {
-        "original": sentence,
-        "phonetic": phonetic,
-        "ipa": " ".join(ipa_words),
-        "romanized": " ".join(roman_words),
-        "syllables": syllable_list,
-    }
+    """발음 인덱스에 있으면 그대로(g2pk 없이), 없으면 live 변환"""
+    with stage("ipa"):
+        hit = ipa_index.lookup(sentence)
+        if hit is not None:
+            return hit
+        return get_converter().convert(sentence)
+
+def text_to_ipa_many(sentences: List[str]) -> List[Dict[str, Any]]:
+    return [text_to_ipa(s) for s in sentences]
 
 
 # ==========================
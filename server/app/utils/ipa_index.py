@@ -0,0 +1,144 @@
+"""
+연습 문장 발음 인덱스 (mmap).
+
+빌드:  python -m app.utils.ipa_index build sentences.txt pron.idx
+확인:  python -m app.utils.ipa_index lookup pron.idx "저는 학생입니다."
+
+파일 구조 (little-endian)
+- header : magic(8) version(u32) count(u32) capacity(u32) reserved(u32) table_offset(u64) blob_offset(u64)
+- table  : capacity개 슬롯 (hash u64, offset u64, length u32, pad u32), open addressing + linear probing
+- blob   : 레코드 JSON(utf-8). phonetic / ipa / romanized / syllables + 정규화 문장(key)
+
+읽기는 mmap(ACCESS_READ)이라 여러 uvicorn 워커가 같은 페이지 캐시를 공유한다.
+조회는 해시 → 슬롯 직접 접근이라 O(1)이며 g2pk를 import하지 않는다.
+"""
+import hashlib, json, mmap, os, struct, sys
+from typing import Any, Dict, Iterable, Optional
+from app.common_utils import normalize_text
+from app.config import IPA_INDEX_PATH
+
+MAGIC = b"KOIPAIX1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIQQ")
+SLOT = struct.Struct("<QQII")
+
+
+def text_hash(key: str) -> int:
+    h = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return h or 1  # 0은 빈 슬롯 표시
+
+
+class PronIndex:
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self.capacity, _, self._table, self._blob = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a pronunciation index (v{VERSION})")
+        self._mask = self.capacity - 1
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        key = normalize_text(text)
+        h = text_hash(key)
+        slot = h & self._mask
+        for _ in range(self.capacity):
+            sh, off, length, _ = SLOT.unpack_from(self._mm, self._table + slot * SLOT.size)
+            if sh == 0:
+                return None
+            if sh == h:
+                rec = json.loads(self._mm[self._blob + off:self._blob + off + length])
+                if rec.pop("key") == key:  # 64bit 해시 충돌 대비 원문 확인
+                    return {"original": text, **rec}
+            slot = (slot + 1) & self._mask
+        return None
+
+    def close(self):
+        self._mm.close()
+
+
+def build_index(sentences: Iterable[str], out_path: str) -> int:
+    """문장들을 live 변환해서 인덱스 파일로 저장. 저장한 문장 수를 반환"""
+    from app.utils.ipa_converter import IpaConverter
+    converter = IpaConverter()
+
+    records: Dict[str, bytes] = {}
+    for line in sentences:
+        key = normalize_text(line)
+        if not key or key.startswith("#") or key in records:
+            continue
+        rec = converter.convert(key)
+        rec.pop("original")
+        rec["key"] = key
+        records[key] = json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    capacity = 1
+    while capacity < max(2, len(records) * 2):  # load factor ≤ 0.5
+        capacity <<= 1
+    table = bytearray(capacity * SLOT.size)
+    blob = bytearray()
+    for key, data in records.items():
+        h = text_hash(key)
+        slot = h & (capacity - 1)
+        while SLOT.unpack_from(table, slot * SLOT.size)[0] != 0:
+            slot = (slot + 1) & (capacity - 1)
+        SLOT.pack_into(table, slot * SLOT.size, h, len(blob), len(data), 0)
+        blob += data
+
+    table_offset = HEADER.size
+    blob_offset = table_offset + len(table)
+    tmp = out_path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), capacity, 0, table_offset, blob_offset))
+        f.write(table)
+        f.write(blob)
+    os.replace(tmp, out_path)  # 서비스 중인 워커는 기존 파일 mmap을 그대로 유지
+    return len(records)
+
+
+_index: Optional[PronIndex] = None
+
+def open_index(path: str = IPA_INDEX_PATH) -> Optional[PronIndex]:
+    """IPA_INDEX_PATH가 설정돼 있으면 인덱스를 연다 (서버 시작 시 1회)"""
+    global _index
+    if _index is None and path:
+        try:
+            _index = PronIndex(path)
+            print(f"[ipa_index] loaded {_index.count} sentences from {path}")
+        except (OSError, ValueError) as e:
+            print(f"[ipa_index] disabled: {e}")
+    return _index
+
+_hits = 0
+_misses = 0
+
+def lookup(text: str) -> Optional[Dict[str, Any]]:
+    global _hits, _misses
+    if _index is None:
+        return None
+    hit = _index.get(text)
+    if hit is None:
+        _misses += 1
+    else:
+        _hits += 1
+    return hit
+
+def stats() -> Optional[Dict[str, Any]]:
+    if _index is None:
+        return None
+    total = _hits + _misses
+    return {"entries": _index.count, "hits": _hits, "misses": _misses,
+            "hit_rate": round(_hits / total, 4) if total else 0.0}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "build":
+        with open(sys.argv[2], encoding="utf-8") as f:
+            n = build_index(f, sys.argv[3])
+        print(f"wrote {n} sentences to {sys.argv[3]}")
+    elif len(sys.argv) == 4 and sys.argv[1] == "lookup":
+        from pprint import pprint
+        pprint(PronIndex(sys.argv[2]).get(sys.argv[3]))
+    else:
+        print(__doc__)
+        sys.exit(2)
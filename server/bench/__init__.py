@@ -0,0 +1,14 @@
+"""
+엔드포인트 벤치마크 / 부하 테스트. server/ 에서 실행:
+
+    python -m bench fixtures                      # 합성 음성(1/3/8/20s × wav/webm/m4a), 문장 코퍼스 생성
+    python -m bench run -n 200 -c 8 -o base.json  # inprocess + stub ASR + 대역 LLM/Gooey로 측정
+                                                  # (기본: 요청마다 입력을 바꿔 캐시를 비껴감, --reuse-audio로 끔)
+    python -m bench run --real-asr -o model.json  # 실제 모델 포함
+    python -m bench compare base.json new.json    # 회귀(기본 10%)가 있으면 exit 1
+
+이미 떠 있는 서버를 재려면 `python -m bench fake`로 대역 서버를 띄우고 출력된 환경 변수로
+uvicorn/flask를 실행한 뒤 `python -m bench run --transport http --url ... --proxy-url ...`.
+결과: 엔드포인트별 p50/p95/p99, 처리량, 오류율, 서버 프로세스 RSS 최댓값 (+ git commit 등 측정 조건).
+stt / lipsync는 캐시 hit/miss 요청의 지연을 "<이름>:cache_hit" / "<이름>:cache_miss"로 따로 보여준다
+"""
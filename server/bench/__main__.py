@@ -0,0 +1,158 @@
+import argparse, asyncio, datetime, os, platform, subprocess, sys, tempfile, time
+from bench import fixtures
+from bench.fakes import start_fake_upstream, upstream_env
+from bench.load import ENDPOINTS, SERVER_DIR
+from bench.stats import compare, format_table, meta_mismatches, read_baseline, write_baseline
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SERVER_DIR, capture_output=True, text=True)
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=SERVER_DIR,
+                               capture_output=True, text=True).stdout.strip()
+        return out.stdout.strip() + ("-dirty" if dirty else "") if out.returncode == 0 else "unknown"
+    except OSError:
+        return "unknown"
+
+
+def _configure_env(args, upstream_url: str):
+    """inprocess: app을 import하기 전에 환경 변수로 stub ASR / 대역 서버 / 빈 립싱크 캐시 디렉터리 지정"""
+    if not args.real_asr:
+        os.environ["ASR_BACKEND"] = "stub"
+        os.environ["ASR_STUB_RTF"] = str(args.stub_rtf)
+    if upstream_url:
+        os.environ.update(upstream_env(upstream_url))
+    # 이전 실행의 디스크 캐시가 결과에 섞이지 않게
+    os.environ["LIPSYNC_CACHE_DIR"] = tempfile.mkdtemp(prefix="kotalk_bench_lipsync_")
+
+
+async def _run(args, manifest) -> dict:
+    from bench.load import http_target, inprocess_target, run_all
+    endpoints = [e.strip() for e in args.endpoints.split(",") if e.strip()]
+    if args.transport == "inprocess":
+        target = inprocess_target(with_proxy="lipsync" in endpoints, concurrency=args.concurrency)
+    else:
+        target = http_target(args.url, args.proxy_url, args.pid, concurrency=args.concurrency)
+    async with target as t:
+        return await run_all(t, manifest, endpoints, args.requests, args.concurrency, args.warmup,
+                             unique_audio=not args.reuse_audio, log=lambda m: print(m, file=sys.stderr))
+
+
+def cmd_fixtures(args):
+    manifest = fixtures.build(args.dir, variants=args.variants)
+    for a in manifest["audio"]:
+        print(f"{a['name']:>10}  {a['bytes']:>8} B  {a['path']}  (+{len(a['variants']) - 1} variants)")
+    print(f"corpus: {manifest['corpus']}\nimage:  {manifest['image']}")
+
+
+def cmd_fake(args):
+    server, url = start_fake_upstream(args.host, args.port, args.llm_delay, args.lipsync_delay)
+    print(f"fake upstream listening on {url}  (Ctrl+C로 종료)\n서버를 이 환경 변수로 띄우세요:")
+    for k, v in upstream_env(url).items():
+        print(f"  export {k}={v}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+def cmd_run(args):
+    manifest = fixtures.load(args.fixtures)
+    upstream = None
+    upstream_url = ""
+    if args.transport == "inprocess":
+        if not args.real_llm:
+            upstream, upstream_url = start_fake_upstream(llm_delay=args.llm_delay, lipsync_delay=args.lipsync_delay)
+        _configure_env(args, upstream_url)
+    try:
+        results = asyncio.run(_run(args, manifest))
+    finally:
+        if upstream is not None:
+            upstream.shutdown()
+
+    meta = {
+        "git_commit": _git_commit(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "transport": args.transport,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "warmup": args.warmup,
+        "unique_audio": not args.reuse_audio,
+        # http 모드에서는 서버 쪽 설정을 알 수 없으므로 기록하지 않음
+        "asr_backend": os.getenv("ASR_BACKEND") if args.transport == "inprocess" else None,
+        "asr_stub_rtf": os.getenv("ASR_STUB_RTF") if args.transport == "inprocess" and not args.real_asr else None,
+        "llm_delay_s": args.llm_delay if upstream is not None else None,
+        "fixtures": [a["name"] for a in manifest["audio"]],
+    }
+    print(format_table(results))
+    if args.output:
+        write_baseline(args.output, meta, results)
+        print(f"\nwrote {args.output}")
+
+
+def cmd_compare(args):
+    base, new = read_baseline(args.baseline), read_baseline(args.current)
+    for line in meta_mismatches(base, new):
+        print(f"[warn] 측정 조건이 다름: {line}")
+    regressions = compare(base, new, args.threshold)
+    print(format_table(new.get("results", {})))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) (threshold {args.threshold:.0%}):")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print(f"\nno regressions (threshold {args.threshold:.0%})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description="koTalk benchmark / load-test suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("fixtures", help="합성 음성 / 문장 코퍼스 / 얼굴 이미지 생성")
+    p.add_argument("--dir", default=fixtures.DEFAULT_DIR)
+    p.add_argument("--variants", type=int, default=fixtures.DEFAULT_VARIANTS, help="webm/m4a 픽스처별 인코딩 변형 수")
+    p.set_defaults(func=cmd_fixtures)
+
+    p = sub.add_parser("fake", help="LLM(OpenAI 호환) / Gooey 대역 서버 실행 (http 모드용)")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8089)
+    p.add_argument("--llm-delay", type=float, default=0.0, help="LLM 응답 전 대기 (s)")
+    p.add_argument("--lipsync-delay", type=float, default=0.0, help="Gooey 응답 전 대기 (s)")
+    p.set_defaults(func=cmd_fake)
+
+    p = sub.add_parser("run", help="엔드포인트별 부하 측정 → baseline JSON")
+    p.add_argument("--transport", choices=("inprocess", "http"), default="inprocess")
+    p.add_argument("--url", default="http://127.0.0.1:8000", help="http 모드: FastAPI 서버")
+    p.add_argument("--proxy-url", default=None, help="http 모드: Flask 프록시 (없으면 lipsync 생략)")
+    p.add_argument("--pid", type=int, action="append", help="http 모드: 메모리를 잴 서버 pid (기본: /health?memory=1 workers)")
+    p.add_argument("--endpoints", default=",".join(ENDPOINTS))
+    p.add_argument("-n", "--requests", type=int, default=200, help="엔드포인트별 요청 수")
+    p.add_argument("-c", "--concurrency", type=int, default=8)
+    p.add_argument("--warmup", type=int, default=5)
+    p.add_argument("--fixtures", default=fixtures.DEFAULT_DIR)
+    p.add_argument("--reuse-audio", action="store_true",
+                   help="같은 바이트를 반복해서 보냄 (기본은 요청마다 오디오/이미지를 바꿔 전사/립싱크 캐시를 비껴감)")
+    p.add_argument("--real-asr", action="store_true", help="inprocess: stub 대신 ASR_BACKEND 그대로")
+    p.add_argument("--stub-rtf", type=float, default=0.0, help="stub ASR: 오디오 1초당 대기 (s)")
+    p.add_argument("--real-llm", action="store_true", help="inprocess: 대역 서버 대신 실제 LLM/Gooey 설정 사용")
+    p.add_argument("--llm-delay", type=float, default=0.0)
+    p.add_argument("--lipsync-delay", type=float, default=0.0)
+    p.add_argument("-o", "--output", default="bench_baseline.json")
+    p.set_defaults(func=cmd_run)
+
+    p = sub.add_parser("compare", help="두 baseline 비교, 회귀가 있으면 exit 1")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.1, help="허용 비율 (0.1 = 10%%)")
+    p.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
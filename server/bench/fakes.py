@@ -0,0 +1,85 @@
+import json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+
+# 외부 API 대역 서버 (모델/네트워크 비용을 빼고 서버 자체 오버헤드만 재기 위함)
+# - OpenAI 호환 POST .../chat/completions (Upstage Solar 자리, stream 지원)
+# - Gooey POST .../Lipsync/form/
+# 응답 전 지연 시간은 실제 API 대기 시간을 흉내 내도록 설정 가능
+
+FEEDBACK = {
+    "intended_sentence": "",
+    "summary": "전체적으로 또렷하지만 받침 소리가 약해요.",
+    "tips": ["받침을 끝까지 발음해 보세요.", "문장을 두 번에 나눠 읽어 보세요."],
+    "level": "중급",
+    "recommended_sentence": "",
+}
+
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    llm_delay = 0.0
+    lipsync_delay = 0.0
+    protocol_version = "HTTP/1.1"   # keep-alive (실제 API처럼 연결 재사용)
+
+    def _send_json(self, payload: dict, status: int = 200):
+        out = json.dumps(payload, ensure_ascii=False).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            time.sleep(self.llm_delay)
+            return self._chat(json.loads(body))
+        if "lipsync" in self.path.lower():
+            time.sleep(self.lipsync_delay)
+            return self._send_json({"id": "bench", "status": "completed",
+                                    "output": {"output_video": "http://fake-gooey.local/bench.mp4"}})
+        self._send_json({"error": f"unknown path {self.path}"}, 404)
+
+    def _chat(self, body: dict):
+        content = json.dumps(FEEDBACK, ensure_ascii=False)
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for i in range(0, len(content), 8):
+                chunk = {"id": "bench", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": content[i:i + 8]}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.close_connection = True
+            return
+        self._send_json({
+            "id": "bench", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fake_upstream(host: str = "127.0.0.1", port: int = 0, llm_delay: float = 0.0,
+                        lipsync_delay: float = 0.0) -> Tuple[ThreadingHTTPServer, str]:
+    """백그라운드 스레드에서 대역 서버 시작 → (server, base URL). 끝나면 server.shutdown()"""
+    handler = type("Handler", (FakeUpstreamHandler,), {"llm_delay": llm_delay, "lipsync_delay": lipsync_delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.handle_error = lambda *args: None  # 클라이언트가 끊은 연결의 BrokenPipe 무시
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def upstream_env(base_url: str) -> dict:
+    """대역 서버를 쓰도록 서버 프로세스에 줄 환경 변수"""
+    return {
+        "UPSTAGE_API_KEY": "bench",
+        "LLM_BASE_URL": f"{base_url}/v1",
+        "GOOEY_API_KEY": "bench",
+        "GOOEY_URL": f"{base_url}/v2/Lipsync/form/",
+    }
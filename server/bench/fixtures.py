@@ -0,0 +1,160 @@
+import io, json, os, shutil, struct, subprocess, sys, tempfile, wave, zlib
+import numpy as np
+from typing import Any, Dict, List
+
+# 벤치마크 입력: 길이/컨테이너별 합성 음성 + 문장 코퍼스 + 립싱크용 얼굴 이미지
+# 같은 인자면 항상 같은 바이트가 나오도록 난수 시드 고정 (결과 비교가 입력 차이에 흔들리지 않게)
+
+SAMPLE_RATE = 16000
+DURATIONS = (1, 3, 8, 20)
+CONTAINERS = ("wav", "webm", "m4a")
+DEFAULT_DIR = os.path.join(tempfile.gettempdir(), "kotalk_bench_fixtures")
+# 압축 컨테이너는 요청마다 새로 인코딩할 수 없으므로 잡음만 다른 변형을 미리 여러 개 만들어 둠
+# (디코드 결과가 달라서 전사 캐시 키가 겹치지 않음)
+DEFAULT_VARIANTS = 16
+
+# 컨테이너별 ffmpeg 인코더 (브라우저 MediaRecorder / iOS 녹음과 같은 형식)
+FFMPEG_CODECS = {
+    "webm": ["-c:a", "libopus", "-b:a", "32k"],
+    "m4a": ["-c:a", "aac", "-b:a", "64k"],
+}
+
+# (기준 문장, 인식 결과, 발화 길이 s): 정답 / 받침 오류 / 빠진 음절 / 다른 단어가 섞이도록
+CORPUS = [
+    ("안녕하세요", "안녕하세요", 1.2),
+    ("저는 학생입니다", "저는 학생임니다", 1.6),
+    ("오늘 날씨가 좋네요", "오늘 날씨 좋네", 1.9),
+    ("만나서 반갑습니다", "만나서 반갑습니다", 1.7),
+    ("이것은 얼마예요", "이거슨 얼마에요", 1.5),
+    ("지하철역이 어디에 있어요", "지하철 역이 어디 있어요", 2.3),
+    ("한국어를 공부한 지 일 년 됐어요", "한국어를 공부한지 일년 됐어요", 2.8),
+    ("커피 한 잔 주세요", "커피 한 잔 주세요", 1.4),
+    ("주말에 친구하고 영화를 봤어요", "주마레 친구랑 영화를 봤어요", 2.6),
+    ("천천히 다시 말해 주시겠어요", "천천히 다시 말해 주세요", 2.4),
+    ("내일 아침 일곱 시에 일어날 거예요", "내일 아침 일곱시에 일어날 거에요", 2.9),
+    ("읽고 싶은 책이 많아요", "일꼬 시픈 채기 마나요", 1.9),
+]
+
+
+def speech_like(seconds: float, seed: int = 0) -> np.ndarray:
+    """
+    음절처럼 끊기는 배음 + 약한 잡음 (float32, 16kHz).
+    무음/순음이면 VAD나 디코더가 실제 업로드와 다른 경로를 타므로 말소리 비슷한 포락선을 씌움
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE), dtype=np.float32) / SAMPLE_RATE
+    f0 = 120.0 + 40.0 * rng.random() + 30.0 * np.sin(2 * np.pi * 0.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 6))
+    rate = 3.5 + rng.random()   # 초당 음절 수
+    envelope = np.clip(np.sin(np.pi * rate * t), 0, None) ** 2
+    # 문장 사이 쉼: 2초마다 0.3초 무음
+    envelope[(t % 2.0) > 1.7] = 0.0
+    noise = rng.standard_normal(len(t)) * 0.003
+    return (0.3 * voice * envelope + noise).astype(np.float32)
+
+
+def wav_bytes(samples: np.ndarray, sr: int = SAMPLE_RATE) -> bytes:
+    """float32 → 16-bit PCM mono WAV"""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(pcm)
+    return buf.getvalue()
+
+
+def face_png(size: int = 64, variant: int = 0) -> bytes:
+    """립싱크 요청용 회색 얼굴 자리 이미지 (PIL 없이 zlib로 PNG 작성). variant마다 구석 픽셀 두 개만 다름"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    y, x = np.mgrid[:size, :size]
+    face = (((x - size / 2) ** 2 + (y - size / 2) ** 2) < (size * 0.4) ** 2) * 80 + 120
+    face[0, 0], face[0, 1] = variant % 256, (variant // 256) % 256
+    raw = b"".join(b"\x00" + bytes(row) for row in face.astype(np.uint8))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 0, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 9)) + chunk(b"IEND", b""))
+
+
+def _encode(wav_path: str, container: str, out_path: str) -> bool:
+    try:
+        subprocess.run(["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", wav_path,
+                        *FFMPEG_CODECS[container], "-map_metadata", "-1", "-fflags", "+bitexact",
+                        out_path], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        return True
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[bench] {container} 인코딩 실패, 건너뜀: {getattr(e, 'stderr', b'') or e}", file=sys.stderr)
+        return False
+
+
+def _encode_variants(base: np.ndarray, seconds: int, container: str, out_dir: str, variants: int) -> List[str]:
+    paths = []
+    for k in range(1, variants):
+        noise = np.random.default_rng(seconds * 1000 + k).standard_normal(len(base)).astype(np.float32) * 0.002
+        with tempfile.NamedTemporaryFile(suffix=".wav") as tmp:
+            tmp.write(wav_bytes(base + noise))
+            tmp.flush()
+            path = os.path.join(out_dir, "audio", f"{seconds}s.v{k}.{container}")
+            if not _encode(tmp.name, container, path):
+                break
+        paths.append(path)
+    return paths
+
+
+def build(out_dir: str = DEFAULT_DIR, durations=DURATIONS, containers=CONTAINERS,
+          variants: int = DEFAULT_VARIANTS) -> Dict[str, Any]:
+    """
+    out_dir에 audio/<길이>s.<컨테이너>, corpus.jsonl, face.png, manifest.json 작성 후 manifest 반환.
+    webm/m4a는 로컬 ffmpeg로 인코딩 (없으면 경고 후 wav만), 변형은 audio/<길이>s.v<k>.<컨테이너>
+    """
+    os.makedirs(os.path.join(out_dir, "audio"), exist_ok=True)
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+    if not has_ffmpeg and set(containers) - {"wav"}:
+        print("[bench] ffmpeg가 없어서 wav 픽스처만 만듭니다", file=sys.stderr)
+
+    audio: List[Dict[str, Any]] = []
+    for seconds in durations:
+        base = speech_like(seconds, seed=seconds)
+        wav_path = os.path.join(out_dir, "audio", f"{seconds}s.wav")
+        with open(wav_path, "wb") as f:
+            f.write(wav_bytes(base))
+        for container in containers:
+            path = os.path.join(out_dir, "audio", f"{seconds}s.{container}")
+            if container != "wav" and not (has_ffmpeg and _encode(wav_path, container, path)):
+                continue
+            entry = {"name": f"{container}-{seconds}s", "seconds": seconds, "container": container,
+                     "path": path, "bytes": os.path.getsize(path), "variants": [path]}
+            if container != "wav":
+                entry["variants"] += _encode_variants(base, seconds, container, out_dir, variants)
+            audio.append(entry)
+
+    corpus_path = os.path.join(out_dir, "corpus.jsonl")
+    with open(corpus_path, "w", encoding="utf-8") as f:
+        for ref, rec, dur in CORPUS:
+            f.write(json.dumps({"reference_text": ref, "recognized_text": rec, "duration_sec": dur},
+                               ensure_ascii=False) + "\n")
+    image_path = os.path.join(out_dir, "face.png")
+    with open(image_path, "wb") as f:
+        f.write(face_png())
+
+    manifest = {"audio": audio, "corpus": corpus_path, "image": image_path}
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load(out_dir: str = DEFAULT_DIR) -> Dict[str, Any]:
+    """manifest.json이 있으면 그대로, 없으면 새로 생성"""
+    path = os.path.join(out_dir, "manifest.json")
+    if not os.path.exists(path):
+        return build(out_dir)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_corpus(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,266 @@
+import asyncio, importlib.util, itertools, os, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import httpx
+from bench.fixtures import face_png, read_corpus
+from bench.stats import summarize
+
+# 엔드포인트별 부하 생성: 같은 요청 목록을 concurrency개 동시 작업으로 흘려보내고 요청마다 지연 시간 기록
+# transport
+#   inprocess: FastAPI는 httpx ASGITransport, Flask 프록시(app.py)는 WSGITransport (소켓/uvicorn 없이 앱 코드만)
+#   http:      이미 떠 있는 서버에 로컬 HTTP로 (uvicorn/flask 포함 전체 경로)
+
+ENDPOINTS = ("stt", "ipa", "pron-eval", "lipsync")
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIME = {"wav": "audio/wav", "webm": "audio/webm", "m4a": "audio/mp4"}
+RSS_SAMPLE_INTERVAL_S = 0.05
+
+Post = Callable[..., Awaitable[httpx.Response]]
+
+
+class Target:
+    """요청을 보낼 곳: FastAPI(api) / Flask 프록시(proxy) + 메모리를 잴 서버 프로세스 pid 목록"""
+
+    def __init__(self, api: Post, proxy: Optional[Post], pids: Callable[[], List[int]]):
+        self.api = api
+        self.proxy = proxy
+        self.pids = pids
+
+
+class RssSampler:
+    """백그라운드 스레드에서 서버 프로세스들의 RSS 합을 주기적으로 재서 최댓값 기록 (/proc 없으면 None)"""
+
+    def __init__(self, pids: Callable[[], List[int]], interval: float = RSS_SAMPLE_INTERVAL_S):
+        self.pids = pids
+        self.interval = interval
+        self.peak: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def sample(self):
+        from app.common_utils import process_memory
+        mems = [process_memory(pid) for pid in self.pids()]
+        total = sum(m["rss_mb"] for m in mems if m is not None)
+        if any(m is not None for m in mems):
+            self.peak = max(self.peak or 0.0, total)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.sample()
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+
+
+async def drive(send: Callable[[int], Awaitable[Any]], requests: int, concurrency: int,
+                warmup: int = 0, by_label: Optional[Dict[str, List[float]]] = None) -> Tuple[List[float], int, float]:
+    """
+    send(i)를 requests번 (동시에 최대 concurrency개) 호출 → (성공 요청 지연 ms 목록, 오류 수, 전체 wall s).
+    warmup번은 먼저 순서대로 보내고 집계에서 뺀다 (첫 요청의 지연 로딩/연결 비용 제외)
+    send가 (status, label)을 돌려주면 by_label[label]에도 지연을 따로 모은다 (캐시 hit/miss 구분용)
+    """
+    for i in range(warmup):
+        try:
+            await send(i)
+        except Exception:
+            pass
+    counter = itertools.count(warmup)
+    end = warmup + requests
+    latencies: List[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= end:
+                return
+            t0 = time.perf_counter()
+            label = None
+            try:
+                status = await send(i)
+            except Exception:
+                status = 0
+            if isinstance(status, tuple):
+                status, label = status
+            if 200 <= status < 400:
+                latencies.append((time.perf_counter() - t0) * 1000.0)
+                if by_label is not None and label:
+                    by_label.setdefault(label, []).append(latencies[-1])
+            else:
+                errors += 1
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(max(1, concurrency))])
+    return latencies, errors, time.perf_counter() - t0
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _cache_label(hit: bool) -> str:
+    return "cache_hit" if hit else "cache_miss"
+
+
+def build_senders(target: Target, manifest: Dict[str, Any], unique_audio: bool = True) -> Dict[str, Callable[[int], Awaitable[Any]]]:
+    """
+    엔드포인트 이름 → send(i). 입력은 픽스처를 i 순서로 돌려 쓰므로 같은 인자면 같은 요청열.
+    unique_audio(기본)면 캐시를 비껴감: wav는 마지막 샘플에 i를 쓰고, webm/m4a는 미리 만든 변형을 돌려 쓰고
+    (변형 수를 넘으면 다시 겹침), 립싱크는 요청마다 이미지 픽셀을 바꾼다.
+    stt/lipsync는 (status, "cache_hit"|"cache_miss")를 돌려줘서 캐시 적중 여부별 지연도 따로 집계
+    """
+    clips = [(a, [_read(p) for p in a.get("variants") or [a["path"]]]) for a in manifest["audio"]]
+    short = [(a, data) for a, data in clips if a["seconds"] <= 8] or clips
+    corpus = read_corpus(manifest["corpus"])
+    image = _read(manifest["image"])
+
+    def clip_bytes(clip, variants: List[bytes], i: int, n_clips: int) -> bytes:
+        if not unique_audio:
+            return variants[0]
+        if clip["container"] == "wav":
+            return variants[0][:-2] + (i % 32768).to_bytes(2, "little")
+        return variants[(i // n_clips) % len(variants)]
+
+    async def stt(i: int) -> Tuple[int, Optional[str]]:
+        clip, variants = clips[i % len(clips)]
+        files = {"audio": (f"bench.{clip['container']}", clip_bytes(clip, variants, i, len(clips)),
+                           MIME[clip["container"]])}
+        r = await target.api("/stt?timings=1", files=files, data={"language": "ko", "timestamps": "word"})
+        if r.status_code != 200:
+            return r.status_code, None
+        source = (r.json().get("timings") or {}).get("transcript_cache")
+        return r.status_code, _cache_label(source != "miss") if source else None
+
+    async def ipa(i: int) -> int:
+        r = await target.api("/ipa/", json={"text": corpus[i % len(corpus)]["reference_text"]})
+        return r.status_code
+
+    async def pron_eval(i: int) -> int:
+        r = await target.api("/pron-eval", json=corpus[i % len(corpus)])
+        return r.status_code
+
+    async def lipsync(i: int) -> Tuple[int, Optional[str]]:
+        clip, variants = short[i % len(short)]
+        # 립싱크 캐시 키 = (오디오, 이미지) → 이미지만 바꿔도 매번 Gooey 경로를 탐
+        files = {"audio": (f"bench.{clip['container']}", variants[0], MIME[clip["container"]]),
+                 "image": ("face.png", face_png(variant=i) if unique_audio else image, "image/png")}
+        r = await target.proxy("/api/lipsync", files=files)
+        if r.status_code != 200:
+            return r.status_code, None
+        return r.status_code, _cache_label(bool(r.json().get("cached")))
+
+    senders = {"stt": stt, "ipa": ipa, "pron-eval": pron_eval}
+    if target.proxy is not None:
+        senders["lipsync"] = lipsync
+    return senders
+
+
+async def wait_ready(api_get: Callable[[str], Awaitable[httpx.Response]], timeout_s: float = 600.0) -> Dict[str, Any]:
+    """/health가 ready=True가 될 때까지 대기 (모델 로드 + 워밍업)"""
+    deadline = time.monotonic() + timeout_s
+    while True:
+        try:
+            body = (await api_get("/health")).json()
+            if body.get("ready"):
+                return body
+            if body.get("status") == "error":
+                raise RuntimeError(f"model failed to load: {body.get('error')}")
+        except httpx.HTTPError:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError("server did not become ready")
+        await asyncio.sleep(0.2)
+
+
+def load_proxy_app():
+    """server/app.py (Flask 프록시). 같은 이름의 app 패키지에 가려지므로 파일 경로로 로드"""
+    spec = importlib.util.spec_from_file_location("kotalk_proxy", os.path.join(SERVER_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.app
+
+
+@asynccontextmanager
+async def inprocess_target(with_proxy: bool = True, concurrency: int = 8) -> AsyncIterator[Target]:
+    """app.main의 lifespan(모델 로드, 추론 워커 시작)까지 돌린 뒤 ASGI/WSGI로 직접 호출"""
+    from app.main import app
+    from app.services import inference
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench",
+                                     timeout=300) as client:
+            proxy = None
+            executor = None
+            if with_proxy:
+                # Flask는 동기 WSGI라 스레드에서 호출 (동시 요청 수만큼 스레드)
+                sync_client = httpx.Client(transport=httpx.WSGITransport(app=load_proxy_app()),
+                                           base_url="http://bench-proxy", timeout=300)
+                executor = ThreadPoolExecutor(max_workers=concurrency)
+
+                async def proxy(path: str, **kwargs) -> httpx.Response:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(executor, lambda: sync_client.post(path, **kwargs))
+
+            await wait_ready(client.get)
+            try:
+                yield Target(client.post, proxy, lambda: [os.getpid()] + inference.worker_pids())
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+                    sync_client.close()
+
+
+@asynccontextmanager
+async def http_target(url: str, proxy_url: Optional[str] = None, pids: Optional[List[int]] = None,
+                      concurrency: int = 8) -> AsyncIterator[Target]:
+    """
+    로컬에 떠 있는 서버로 HTTP 요청. pids를 안 주면 /health?memory=1의 workers pid로 메모리를 잰다
+    (같은 머신의 /proc를 읽으므로 원격 서버면 peak_rss_mb는 비어 있음)
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=300, limits=limits) as client:
+        await wait_ready(client.get)
+        if not pids:
+            health = (await client.get("/health", params={"memory": 1})).json()
+            pids = [w["pid"] for w in health.get("workers") or [] if "pid" in w]
+        proxy_client = httpx.AsyncClient(base_url=proxy_url, timeout=300, limits=limits) if proxy_url else None
+        try:
+            yield Target(client.post, proxy_client.post if proxy_client else None, lambda: list(pids))
+        finally:
+            if proxy_client is not None:
+                await proxy_client.aclose()
+
+
+async def run_all(target: Target, manifest: Dict[str, Any], endpoints: List[str], requests: int,
+                  concurrency: int, warmup: int, unique_audio: bool = True,
+                  log: Callable[[str], None] = print) -> Dict[str, Dict[str, Any]]:
+    """
+    엔드포인트를 하나씩 차례로 측정 (서로의 부하/메모리가 섞이지 않게).
+    캐시 적중 여부를 아는 엔드포인트는 "<이름>:cache_hit" / "<이름>:cache_miss" 지연 요약도 같이
+    (처리량/메모리는 전체 기준이라 비워 둠)
+    """
+    senders = build_senders(target, manifest, unique_audio)
+    results = {}
+    for name in endpoints:
+        if name not in senders:
+            log(f"[bench] {name}: 건너뜀 (프록시 없음)")
+            continue
+        by_label: Dict[str, List[float]] = {}
+        with RssSampler(target.pids) as rss:
+            latencies, errors, wall = await drive(senders[name], requests, concurrency, warmup, by_label)
+        results[name] = summarize(latencies, errors, wall, rss.peak)
+        for label, lats in sorted(by_label.items()):
+            results[f"{name}:{label}"] = {**summarize(lats, 0, 0.0), "throughput_rps": None, "wall_s": None}
+        log(f"[bench] {name}: p50={results[name]['p50_ms']}ms p95={results[name]['p95_ms']}ms "
+            f"{results[name]['throughput_rps']} req/s errors={errors}")
+    return results
@@ -0,0 +1,83 @@
+import json
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+# 벤치마크 결과 요약 / baseline 파일 / 회귀 비교
+
+LATENCY_KEYS = ("p50_ms", "p95_ms", "p99_ms")
+# 이보다 작은 차이는 비율이 커도 잡음으로 보고 무시
+MIN_LATENCY_DELTA_MS = 1.0
+MIN_RSS_DELTA_MB = 5.0
+
+
+def summarize(latencies_ms: Sequence[float], errors: int, wall_s: float,
+              peak_rss_mb: Optional[float] = None) -> Dict[str, Any]:
+    """엔드포인트 하나의 결과: 지연 백분위(성공 요청 기준) / 처리량(전체 요청 기준) / 오류 수 / 최대 RSS"""
+    lat = np.asarray(latencies_ms, dtype=np.float64)
+    total = len(lat) + errors
+    out: Dict[str, Any] = {"requests": total, "errors": errors,
+                           "error_rate": round(errors / total, 4) if total else 0.0,
+                           "throughput_rps": round(total / wall_s, 2) if wall_s > 0 else 0.0,
+                           "wall_s": round(wall_s, 3)}
+    if len(lat):
+        p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+        out.update(p50_ms=round(float(p50), 2), p95_ms=round(float(p95), 2), p99_ms=round(float(p99), 2),
+                   mean_ms=round(float(lat.mean()), 2), max_ms=round(float(lat.max()), 2))
+    else:
+        out.update({k: None for k in LATENCY_KEYS + ("mean_ms", "max_ms")})
+    out["peak_rss_mb"] = round(peak_rss_mb, 1) if peak_rss_mb is not None else None
+    return out
+
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float = 0.1) -> List[str]:
+    """
+    base 대비 new의 회귀 목록 (비어 있으면 통과).
+    지연 백분위 / 최대 RSS가 threshold 비율 이상 늘거나, 처리량이 그만큼 줄거나, 오류율이 늘면 회귀
+    """
+    regressions = []
+    for name, b in base.get("results", {}).items():
+        n = new.get("results", {}).get(name)
+        if n is None:
+            regressions.append(f"{name}: missing from new results")
+            continue
+        for key in LATENCY_KEYS:
+            if b.get(key) is None or n.get(key) is None:
+                continue
+            if n[key] > b[key] * (1 + threshold) and n[key] - b[key] >= MIN_LATENCY_DELTA_MS:
+                regressions.append(f"{name}: {key} {b[key]} → {n[key]} (+{(n[key] / b[key] - 1) * 100:.1f}%)")
+        if b.get("throughput_rps") and n.get("throughput_rps", 0) < b["throughput_rps"] * (1 - threshold):
+            regressions.append(f"{name}: throughput_rps {b['throughput_rps']} → {n.get('throughput_rps', 0)} "
+                               f"({(n.get('throughput_rps', 0) / b['throughput_rps'] - 1) * 100:.1f}%)")
+        if b.get("peak_rss_mb") and n.get("peak_rss_mb") and n["peak_rss_mb"] > b["peak_rss_mb"] * (1 + threshold) \
+                and n["peak_rss_mb"] - b["peak_rss_mb"] >= MIN_RSS_DELTA_MB:
+            regressions.append(f"{name}: peak_rss_mb {b['peak_rss_mb']} → {n['peak_rss_mb']}")
+        if n.get("error_rate", 0) > b.get("error_rate", 0):
+            regressions.append(f"{name}: error_rate {b.get('error_rate', 0)} → {n['error_rate']}")
+    return regressions
+
+
+def meta_mismatches(base: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """같은 조건에서 잰 결과인지 (다르면 비교는 하되 경고)"""
+    keys = ("transport", "concurrency", "requests", "unique_audio", "asr_backend", "asr_stub_rtf", "llm_delay_s",
+            "fixtures")
+    bm, nm = base.get("meta", {}), new.get("meta", {})
+    return [f"{k}: {bm.get(k)} → {nm.get(k)}" for k in keys if bm.get(k) != nm.get(k)]
+
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> str:
+    cols = ("requests", "errors", "p50_ms", "p95_ms", "p99_ms", "throughput_rps", "peak_rss_mb")
+    rows = [("endpoint",) + cols] + [(name,) + tuple("-" if r.get(c) is None else str(r[c]) for c in cols)
+                                     for name, r in results.items()]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(w) for cell, w in zip(row, widths)) for row in rows)
+
+
+def write_baseline(path: str, meta: Dict[str, Any], results: Dict[str, Dict[str, Any]]):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def read_baseline(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.services.asr_backends import BACKENDS, create_backend, _segments_to_result
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_backend("nope")
+    assert {"whisper", "whisper-int8", "faster-whisper", "stub"} <= set(BACKENDS)
+
+
+def test_stub_backend_spreads_words_over_clip():
+    backend = create_backend("stub")
+    result = backend.transcribe_batch([np.zeros(32000, dtype=np.float32)], language="ko")[0]
+    words = result["segments"][0]["words"]
+    assert result["text"].strip() == " ".join(w["word"].strip() for w in words)
+    assert words[0]["start"] == 0.0 and words[-1]["end"] == 2.0
+
+
+def test_faster_whisper_segments_match_whisper_shape():
+    word = SimpleNamespace(word=" 안녕", start=0.1, end=0.5, probability=0.9)
+    seg = SimpleNamespace(id=0, start=0.0, end=0.6, text=" 안녕", avg_logprob=-0.2, no_speech_prob=0.01, words=[word])
+    result = _segments_to_result([seg], "ko")
+    assert result["text"] == " 안녕" and result["language"] == "ko"
+    assert result["segments"][0]["words"] == [{"word": " 안녕", "start": 0.1, "end": 0.5, "probability": 0.9}]
@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routers import assess
+from app.schemas import STTResponse
+from app.services import inference
+
+AUDIO = {"audio": ("a.wav", b"RIFF0000WAVEfmt ", "audio/wav")}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(inference, "is_ready", lambda: True)
+    return TestClient(app)
+
+
+def test_not_ready_uses_error_envelope(monkeypatch):
+    monkeypatch.setattr(inference, "is_ready", lambda: False)
+    r = TestClient(app).post("/assess", files=AUDIO)
+    assert r.status_code == 503 and r.json()["error"]["code"] == "MODEL_NOT_READY"
+
+
+def test_decode_failure_maps_to_server_error(client, monkeypatch):
+    async def broken(data, language, timestamps):
+        raise ValueError("cannot decode")
+    monkeypatch.setattr(assess, "stt_from_bytes", broken)
+    r = client.post("/assess", files=AUDIO)
+    assert r.status_code == 500
+    assert r.json()["error"]["code"] == "SERVER_ERROR" and "cannot decode" in r.json()["error"]["message"]
+
+
+def test_empty_transcript_is_422_without_feedback(client, monkeypatch):
+    async def silent(data, language, timestamps):
+        return STTResponse(rawText="", normText="", words=[], duration=1.0, processing_ms=1, language="ko",
+                           model="stub", version="v1")
+
+    async def feedback(*args):
+        raise AssertionError("LLM feedback must not run on an empty transcript")
+    monkeypatch.setattr(assess, "stt_from_bytes", silent)
+    monkeypatch.setattr(assess, "build_ai_style_feedback", feedback)
+    r = client.post("/assess", files=AUDIO)
+    assert r.status_code == 422 and r.json()["error"]["code"] == "NO_SPEECH"
@@ -0,0 +1,140 @@
+import struct
+import numpy as np
+import pytest
+from app.services.audio import (SAMPLE_RATE, SpeechMap, _lowpass, decode_wav_bytes, parse_wav_header, resample,
+                                trim_silence)
+from app.services.stt_pipeline import remap_times
+
+SR = SAMPLE_RATE
+
+
+def _clip(*parts):
+    """("s", 초) = 약한 잡음, ("v", 초) = 200Hz 톤 을 이어 붙인 16kHz mono"""
+    rng = np.random.default_rng(0)
+    out = []
+    for kind, sec in parts:
+        n = int(sec * SR)
+        if kind == "v":
+            out.append(0.5 * np.sin(2 * np.pi * 200 * np.arange(n) / SR))
+        else:
+            out.append(1e-4 * rng.standard_normal(n))
+    return np.concatenate(out).astype(np.float32)
+
+
+def test_silence_only_clip_is_passed_through():
+    samples = _clip(("s", 2.0))
+    trimmed, smap, speech_s = trim_silence(samples, 0.5)
+    assert trimmed is samples
+    assert smap is None
+    assert speech_s == 2.0
+
+
+def test_leading_and_trailing_silence_is_trimmed_with_padding():
+    samples = _clip(("s", 1.0), ("v", 1.0), ("s", 1.0))
+    trimmed, smap, speech_s = trim_silence(samples)
+    assert speech_s == pytest.approx(1.0, abs=0.05)
+    assert len(trimmed) / SR == pytest.approx(1.3, abs=0.05)   # 발화 + 앞뒤 패딩 150ms
+    assert smap.to_original(0.0) == pytest.approx(0.85, abs=0.03)
+    assert smap.to_original(0.65) == pytest.approx(1.5, abs=0.03)
+
+
+def test_mid_clip_pause_is_collapsed_and_remapped():
+    samples = _clip(("s", 1.0), ("v", 1.0), ("s", 2.0), ("v", 1.0), ("s", 1.0))
+    trimmed, smap, speech_s = trim_silence(samples, collapse_pause_sec=0.5)
+    # 발화 길이는 중간 쉼을 포함 (첫 음성 시작 ~ 마지막 음성 끝)
+    assert speech_s == pytest.approx(4.0, abs=0.05)
+    assert len(smap.pieces) == 2
+    assert len(trimmed) / SR == pytest.approx(2.6, abs=0.1)
+    # 잘린 오디오에서 두 번째 조각의 발화 시작 → 원본 4.0s 근처
+    second_cut_start = smap.pieces[1][0]
+    assert smap.to_original(second_cut_start + 0.15) == pytest.approx(4.0, abs=0.03)
+
+    result = {"segments": [{"start": 0.15, "end": second_cut_start + 1.15,
+                            "words": [{"word": "안녕", "start": 0.15, "end": 1.15},
+                                      {"word": "하세요", "start": second_cut_start + 0.15, "end": second_cut_start + 1.15}]}]}
+    words = remap_times(result, smap)["segments"][0]["words"]
+    assert [round(w["start"], 1) for w in words] == [1.0, 4.0]
+    assert [round(w["end"], 1) for w in words] == [2.0, 5.0]
+
+
+def test_short_pause_is_kept_when_collapse_is_off():
+    samples = _clip(("s", 1.0), ("v", 1.0), ("s", 2.0), ("v", 1.0), ("s", 1.0))
+    trimmed, smap, _ = trim_silence(samples)
+    assert len(smap.pieces) == 1
+    assert smap.to_original(2.0) == pytest.approx(smap.pieces[0][1] + 2.0)
+
+
+def test_speech_map_extrapolates_past_the_last_piece():
+    smap = SpeechMap([(SR, 2 * SR), (4 * SR, 5 * SR)])
+    assert smap.to_original(0.5) == 1.5
+    assert smap.to_original(1.5) == 4.5
+    assert smap.to_original(2.5) == 5.5
+
+
+def _wav(frames: np.ndarray, rate: int, bits: int, tag: int = 1, extensible: bool = False) -> bytes:
+    """frames: (n, channels) float [-1, 1] → RIFF WAV 바이트"""
+    ch = frames.shape[1]
+    if tag == 3:
+        body = frames.astype("<f4" if bits == 32 else "<f8").tobytes()
+    elif bits == 8:
+        body = np.round(frames * 127 + 128).astype(np.uint8).tobytes()
+    elif bits == 24:
+        i = np.round(frames * 8388607).astype("<i4").reshape(-1)
+        body = b"".join(int(v).to_bytes(3, "little", signed=True) for v in i)
+    else:
+        scale = 32767 if bits == 16 else 2147483647
+        body = np.round(frames * scale).astype("<i2" if bits == 16 else "<i4").tobytes()
+    block = ch * bits // 8
+    if extensible:
+        fmt = struct.pack("<HHIIHHHHI", 0xFFFE, ch, rate, rate * block, block, bits, 22, bits, 0)
+        fmt += struct.pack("<H", tag) + b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+    else:
+        fmt = struct.pack("<HHIIHH", tag, ch, rate, rate * block, block, bits)
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(body)) + body
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+
+RAMP = np.linspace(-0.5, 0.5, 1600).reshape(-1, 1)
+
+
+@pytest.mark.parametrize("bits,tag,tol", [(8, 1, 1 / 64), (16, 1, 1e-4), (24, 1, 1e-6), (32, 1, 1e-6),
+                                          (32, 3, 1e-7), (64, 3, 1e-7)])
+def test_wav_sample_formats_decode_to_float32(bits, tag, tol):
+    out = decode_wav_bytes(_wav(RAMP, SAMPLE_RATE, bits, tag))
+    assert out.dtype == np.float32 and len(out) == len(RAMP)
+    np.testing.assert_allclose(out, RAMP[:, 0], atol=tol)
+
+
+def test_wav_extensible_header_uses_subformat():
+    fmt = parse_wav_header(_wav(RAMP, SAMPLE_RATE, 24, extensible=True))
+    assert fmt["tag"] == 1 and fmt["bits"] == 24
+    np.testing.assert_allclose(decode_wav_bytes(_wav(RAMP, SAMPLE_RATE, 24, extensible=True)), RAMP[:, 0], atol=1e-6)
+
+
+def test_wav_stereo_is_downmixed():
+    stereo = np.hstack([RAMP, -RAMP * 0.5])
+    out = decode_wav_bytes(_wav(stereo, SAMPLE_RATE, 16))
+    np.testing.assert_allclose(out, RAMP[:, 0] * 0.25, atol=1e-4)
+
+
+@pytest.mark.parametrize("rate", [48000, 44100, 8000])
+def test_wav_is_resampled_to_16k(rate):
+    t = np.arange(rate) / rate
+    tone = 0.5 * np.sin(2 * np.pi * 440 * t).reshape(-1, 1)
+    out = decode_wav_bytes(_wav(tone, rate, 16))
+    assert len(out) == SAMPLE_RATE
+    ref = 0.5 * np.sin(2 * np.pi * 440 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)
+    # 필터 가장자리를 빼고 비교
+    np.testing.assert_allclose(out[200:-200], ref[200:-200], atol=0.02)
+
+
+def test_unsupported_or_broken_wav_returns_none():
+    assert decode_wav_bytes(_wav(RAMP, SAMPLE_RATE, 12)) is None
+    assert decode_wav_bytes(b"RIFF0000WAVEfmt ") is None
+    assert parse_wav_header(b"OggS" + b"\x00" * 20) is None
+
+
+def test_lowpass_keeps_length_for_clips_shorter_than_filter():
+    x = np.ones(10, dtype=np.float32)
+    assert len(_lowpass(x, 0.5)) == 10
+    assert len(resample(x, 48000)) == 4
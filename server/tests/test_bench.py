@@ -0,0 +1,93 @@
+import asyncio
+from bench.load import drive
+from bench.stats import compare, summarize
+
+
+def test_summarize_percentiles_and_throughput():
+    r = summarize([float(i) for i in range(1, 101)], errors=0, wall_s=2.0, peak_rss_mb=123.45)
+    assert r["p50_ms"] == 50.5 and r["p99_ms"] == 99.01
+    assert r["throughput_rps"] == 50.0 and r["peak_rss_mb"] == 123.5
+    assert summarize([], errors=3, wall_s=1.0)["p50_ms"] is None
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    base = {"results": {"stt": summarize([100.0] * 10, 0, 1.0, 200.0), "ipa": summarize([5.0] * 10, 0, 1.0)}}
+    same = {"results": {"stt": summarize([105.0] * 10, 0, 1.05, 202.0), "ipa": summarize([5.4] * 10, 0, 1.0)}}
+    assert compare(base, same, threshold=0.1) == []
+
+    worse = {"results": {"stt": summarize([130.0] * 9, 1, 1.3, 260.0)}}
+    found = compare(base, worse, threshold=0.1)
+    assert any(r.startswith("stt: p95_ms") for r in found)
+    assert any(r.startswith("stt: throughput_rps") for r in found)
+    assert any(r.startswith("stt: peak_rss_mb") for r in found)
+    assert any(r.startswith("stt: error_rate") for r in found)
+    assert "ipa: missing from new results" in found
+
+
+def test_drive_respects_concurrency_and_counts_errors():
+    active = peak = 0
+
+    async def send(i):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return 500 if i % 10 == 0 else 200
+
+    latencies, errors, wall = asyncio.run(drive(send, requests=40, concurrency=4, warmup=2))
+    assert peak == 4
+    assert len(latencies) + errors == 40 and errors == 4   # i = 10, 20, 30, 40
+
+
+def test_senders_bust_caches_and_label_hits(tmp_path):
+    import httpx
+    from bench import fixtures
+    from bench.load import Target, build_senders
+
+    manifest = fixtures.build(str(tmp_path), durations=(1,), containers=("wav",))
+    # 압축 컨테이너 변형은 ffmpeg 없이 바이트만 다른 파일로 대신
+    variants = []
+    for k in range(3):
+        path = tmp_path / f"1s.v{k}.webm"
+        path.write_bytes(b"\x1a\x45\xdf\xa3" + bytes([k]) * 16)
+        variants.append(str(path))
+    manifest["audio"].append({"name": "webm-1s", "seconds": 1, "container": "webm", "path": variants[0],
+                              "variants": variants})
+    sent, seen, images = [], set(), []
+
+    async def api(path, files=None, **kwargs):
+        body = files["audio"][1]
+        sent.append(body)
+        source = "memory" if body in seen else "miss"
+        seen.add(body)
+        return httpx.Response(200, json={"timings": {"transcript_cache": source}})
+
+    async def proxy(path, files=None, **kwargs):
+        images.append(files["image"][1])
+        return httpx.Response(200, json={"cached": False})
+
+    async def main(unique):
+        sent.clear(), seen.clear()
+        senders = build_senders(Target(api, proxy, lambda: []), manifest, unique_audio=unique)
+        labels = [(await senders["stt"](i))[1] for i in range(8)]
+        return labels, [await senders["lipsync"](i) for i in range(2)]
+
+    labels, lipsync = asyncio.run(main(True))
+    assert len(set(sent[0::2])) == 4              # wav: 매 요청 다른 바이트
+    assert len(set(sent[1::2])) == 3              # webm: 변형 3개를 돌려 씀
+    assert labels.count("cache_hit") == 1 and labels[-1] == "cache_hit"
+    assert lipsync == [(200, "cache_miss")] * 2 and images[0] != images[1]   # 립싱크 캐시 키가 매번 다름
+
+    labels, _ = asyncio.run(main(False))
+    assert len(set(sent)) == 2 and labels.count("cache_miss") == 2
+
+
+def test_drive_groups_latencies_by_label():
+    async def send(i):
+        return 200, "cache_hit" if i % 2 else "cache_miss"
+
+    by_label = {}
+    latencies, errors, _ = asyncio.run(drive(send, requests=10, concurrency=2, by_label=by_label))
+    assert len(latencies) == 10 and errors == 0
+    assert {k: len(v) for k, v in by_label.items()} == {"cache_hit": 5, "cache_miss": 5}
@@ -0,0 +1,23 @@
+import math
+from app.services.forced_align import forced_result, spread_to_chars
+
+
+def test_token_logprob_is_split_across_syllable_bytes():
+    # " 안녕" 을 음절 경계와 어긋나게 자른 토큰 2개: " 안" 일부 / 나머지
+    raw = " 안녕".encode("utf-8")
+    tokens = [raw[:3], raw[3:]]          # [" " + 안의 앞 2바이트], [안의 마지막 1바이트 + 녕]
+    chars = spread_to_chars(tokens, [-0.3, -0.8])
+    assert [c for c, _ in chars] == [" ", "안", "녕"]
+    assert math.isclose(sum(lp for _, lp in chars), -1.1)
+    assert math.isclose(chars[2][1], -0.8 * 3 / 4)
+
+
+def test_forced_result_groups_tokens_into_words_and_syllables():
+    tb = [" 안녕".encode("utf-8"), "하세요".encode("utf-8"), " 반가".encode("utf-8"), "워요".encode("utf-8")]
+    words = [{"word": " 안녕하세요", "start": 0.0, "end": 1.0, "n_tokens": 2},
+             {"word": " 반가워요", "start": 1.2, "end": 2.0, "n_tokens": 2}]
+    res = forced_result(tb, [-0.1, -0.2, -0.5, -0.1], words, 2.0, "ko")
+    assert [w["word"] for w in res["words"]] == ["안녕하세요", "반가워요"]
+    assert "".join(s["syllable"] for s in res["syllables"]) == "안녕하세요반가워요"
+    assert res["syllables"][5]["word_index"] == 1 and res["syllables"][5]["start"] == 1.2
+    assert 0 < res["confidence"] <= 1
@@ -0,0 +1,87 @@
+import sys, types
+import pytest
+from fastapi.testclient import TestClient
+from app.utils import ipa_converter
+from app.utils.ipa_converter import IpaConverter
+
+
+@pytest.fixture
+def fake_g2p(monkeypatch):
+    """g2pk 대역: 연음 한 가지만 바꾸고 호출 횟수를 센다"""
+    calls = []
+
+    def g2p(text):
+        calls.append(text)
+        return text.replace("좋아요", "조아요")
+
+    monkeypatch.setitem(sys.modules, "g2pk", types.SimpleNamespace(G2p=lambda: g2p))
+    return calls
+
+
+def test_sentence_and_word_results_are_memoized(fake_g2p):
+    conv = IpaConverter(sentence_cache_size=8, word_cache_size=8)
+    first = conv.convert("날씨가  좋아요")
+    again = conv.convert("날씨가 좋아요")   # 정규화 후 같은 문장 → G2p 다시 안 부름
+    assert fake_g2p == ["날씨가 좋아요"]
+    assert first["phonetic"] == "날씨가 조아요" and again["ipa"] == first["ipa"]
+    assert again["original"] == "날씨가 좋아요"
+
+    conv.convert("오늘 날씨가 좋아요")     # 새 문장이지만 단어는 재사용
+    stats = conv.stats()
+    assert stats["sentences"]["hits"] == 1
+    assert stats["words"]["hits"] == 2
+
+
+def test_ipa_batch_endpoint(fake_g2p, monkeypatch):
+    from app.main import app
+    monkeypatch.setattr(ipa_converter, "_converter", IpaConverter())
+    r = TestClient(app).post("/ipa/batch", json={"texts": ["좋아요", "안녕하세요"]})
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [x["original"] for x in results] == ["좋아요", "안녕하세요"]
+    assert results[0]["phonetic"] == "조아요"
+
+
+def test_startup_survives_missing_g2pk(monkeypatch):
+    from app.main import app
+    monkeypatch.setitem(sys.modules, "g2pk", None)   # import g2pk → ImportError
+    monkeypatch.setattr(ipa_converter, "_converter", None)
+    with TestClient(app) as client:
+        assert client.get("/health").status_code == 200
+    assert ipa_converter._converter is None
+
+
+def _reference_syllable(ch):
+    """음절표 이전 방식: 음절을 초/중/종성으로 분해해서 매핑 dict를 직접 조회"""
+    from app.utils.ipa_converter import (CODA_IPA, CODA_ROMA, CODAS, NUCLEI, NUCLEUS_IPA, NUCLEUS_ROMA, ONSETS,
+                                         ONSET_IPA, ONSET_ROMA)
+    i = ord(ch) - 0xAC00
+    onset, nucleus, coda = ONSETS[i // 588], NUCLEI[i % 588 // 28], CODAS[i % 28]
+    return (ONSET_IPA[onset] + NUCLEUS_IPA[nucleus] + CODA_IPA.get(coda, ""),
+            ONSET_ROMA[onset] + NUCLEUS_ROMA[nucleus] + CODA_ROMA.get(coda, ""))
+
+
+@pytest.mark.parametrize("ch", ["가", "아", "앙", "의", "꽃", "닭", "값", "앉", "읽", "힣"])
+def test_syllable_table_matches_decomposition(ch):
+    assert ipa_converter.map_syllable(ch) == _reference_syllable(ch)
+
+
+def test_syllable_table_spot_values():
+    assert ipa_converter.map_syllable("아") == ("a", "a")          # ㅇ 초성은 소리 없음
+    assert ipa_converter.map_syllable("앙") == ("aŋ", "ang")
+    assert ipa_converter.map_syllable("꽃") == ("k͈ot̚", "kkot")
+    assert ipa_converter.map_syllable("ㄱ") == ("k", "g")          # 낱자모는 초성으로
+    assert ipa_converter.map_syllable("A") == ("A", "A")
+
+
+def test_map_word_without_g2pk(monkeypatch):
+    # 단어 변환은 음절표만 쓰므로 g2pk가 없어도 동작
+    monkeypatch.setitem(sys.modules, "g2pk", None)
+    ipa, roma, syllables = ipa_converter.map_word("읽어요")
+    assert ipa == "".join(_reference_syllable(c)[0] for c in "읽어요")
+    assert roma == "".join(_reference_syllable(c)[1] for c in "읽어요")
+    assert [s["char"] for s in syllables] == ["읽", "어", "요"]
+    # 완성형이 아닌 글자가 섞이면 글자별 경로로
+    ipa, roma, syllables = ipa_converter.map_word("ㅋ아!")
+    assert (ipa, roma) == ("kʰa!", "ka!")
+    assert syllables[0] == {"char": "ㅋ", "ipa": "kʰ", "roman": "k"}
@@ -0,0 +1,65 @@
+import sys, types
+import pytest
+from app.utils import ipa_index
+from app.utils.ipa_converter import IpaConverter
+from app.utils.ipa_index import PronIndex, build_index
+
+SENTENCES = ["# 주석은 건너뜀", "날씨가 좋아요", "안녕하세요", "날씨가  좋아요", "", "저는 학생입니다."]
+
+
+@pytest.fixture
+def fake_g2p(monkeypatch):
+    """g2pk 대역: 연음 한 가지만 바꿈"""
+    g2p = lambda text: text.replace("좋아요", "조아요")
+    monkeypatch.setitem(sys.modules, "g2pk", types.SimpleNamespace(G2p=lambda: g2p))
+
+
+def test_build_and_lookup_round_trip(fake_g2p, tmp_path):
+    path = str(tmp_path / "pron.idx")
+    assert build_index(SENTENCES, path) == 3   # 주석/빈 줄/정규화 후 중복 제외
+    index = PronIndex(path)
+    try:
+        assert index.count == 3 and index.capacity >= 6
+        hit = index.get("날씨가   좋아요")
+        expected = IpaConverter().convert("날씨가 좋아요")
+        assert hit == {**expected, "original": "날씨가   좋아요"}
+        assert hit["phonetic"] == "날씨가 조아요" and "key" not in hit
+        assert index.get("안녕하세요")["ipa"] == IpaConverter().convert("안녕하세요")["ipa"]
+        assert index.get("처음 보는 문장") is None
+    finally:
+        index.close()
+
+
+def test_hash_collisions_probe_and_check_the_key(fake_g2p, tmp_path, monkeypatch):
+    monkeypatch.setattr(ipa_index, "text_hash", lambda key: 42)   # 모든 문장이 같은 슬롯에서 시작
+    path = str(tmp_path / "pron.idx")
+    build_index(["안녕하세요", "감사합니다"], path)
+    index = PronIndex(path)
+    try:
+        assert index.get("감사합니다")["phonetic"] == "감사합니다"
+        assert index.get("안녕하세요")["phonetic"] == "안녕하세요"
+        assert index.get("반갑습니다") is None
+    finally:
+        index.close()
+
+
+def test_module_lookup_counts_hits_and_misses(fake_g2p, tmp_path, monkeypatch):
+    path = str(tmp_path / "pron.idx")
+    build_index(["안녕하세요"], path)
+    monkeypatch.setattr(ipa_index, "_index", None)
+    monkeypatch.setattr(ipa_index, "_hits", 0)
+    monkeypatch.setattr(ipa_index, "_misses", 0)
+    index = ipa_index.open_index(path)
+    try:
+        assert ipa_index.lookup("안녕하세요") is not None
+        assert ipa_index.lookup("감사합니다") is None
+        assert ipa_index.stats() == {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+    finally:
+        index.close()
+
+
+def test_rejects_files_that_are_not_an_index(tmp_path):
+    path = tmp_path / "bogus.idx"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        PronIndex(str(path))
@@ -0,0 +1,28 @@
+from app.services.jamo_align import align
+
+
+def test_coda_only_substitution_gets_partial_credit():
+    res = align("좋네요", "조네요")
+    assert res["errors"] == [{"op": "sub", "ref_index": 0, "hyp_index": 0, "ref": "좋", "hyp": "조",
+                              "ref_pos": 0, "jamo": ["coda"]}]
+    assert 90 < res["accuracy"] < 100
+
+
+def test_deletion_and_insertion_positions_refer_to_original_text():
+    res = align("오늘 날씨가 좋네요!", "오늘 날씨 좋네요요")
+    ops = [(e["op"], e["ref"] or e["hyp"], e["ref_pos"]) for e in res["errors"]]
+    assert ops == [("del", "가", 5), ("ins", "요", 8)]  # 삽입은 앞 음절 위치
+
+
+def test_identical_and_empty():
+    assert align("안녕하세요", "안녕 하세요.") == {"accuracy": 100.0, "errors": []}
+    assert align("안녕", "")["accuracy"] == 0.0
+    assert align("", "안녕") == {"accuracy": 0.0, "errors": []}
+
+
+def test_accuracy_values_are_pinned():
+    # 1 - cost / max(n, m). difflib ratio였을 때: 66.7 / 85.7 / 57.1 / 0.0 / 80.0
+    from app.services.pron_scoring import char_accuracy
+    cases = [("좋네요", "조네요", 93.33), ("오늘 날씨가 좋네요", "오늘 날씨 좋네", 75.0), ("안녕하세요", "안녕", 40.0),
+             ("가", "나", 60.0), ("감사합니다", "감사함니다", 96.0), ("안녕", "안녕하세요", 40.0)]
+    assert [round(char_accuracy(ref, hyp), 2) for ref, hyp, _ in cases] == [acc for _, _, acc in cases]
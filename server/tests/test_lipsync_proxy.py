@@ -0,0 +1,59 @@
+import importlib.util, os, subprocess, time
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def proxy(tmp_path, monkeypatch):
+    """server/app.py (Flask 프록시). app 패키지와 이름이 겹쳐서 파일 경로로 로드"""
+    spec = importlib.util.spec_from_file_location("kotalk_proxy_test", os.path.join(SERVER_DIR, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "LIPSYNC_CACHE_DIR", str(tmp_path / "cache"))
+    return module
+
+
+def test_cache_put_get_ttl_and_eviction(proxy, monkeypatch):
+    key = proxy.lipsync_cache_key(b"wav", b"img")
+    assert key != proxy.lipsync_cache_key(b"wa", b"vimg")   # 경계가 달라지면 다른 키
+    assert proxy.lipsync_cache_get(key) is None
+
+    proxy.lipsync_cache_put(key, {"output_video": "v.mp4"})
+    assert proxy.lipsync_cache_get(key) == {"output_video": "v.mp4"}
+
+    monkeypatch.setattr(proxy, "LIPSYNC_CACHE_TTL_S", 0)
+    time.sleep(0.01)
+    assert proxy.lipsync_cache_get(key) is None   # 만료되면 지우고 miss
+    assert not os.path.exists(os.path.join(proxy.LIPSYNC_CACHE_DIR, f"{key}.json"))
+
+    monkeypatch.setattr(proxy, "LIPSYNC_CACHE_TTL_S", 3600)
+    monkeypatch.setattr(proxy, "LIPSYNC_CACHE_MAX_ENTRIES", 2)
+    keys = [proxy.lipsync_cache_key(bytes([i]), b"img") for i in range(3)]
+    now = time.time()
+    for i, k in enumerate(keys[:2]):
+        proxy.lipsync_cache_put(k, {"i": i})
+        os.utime(os.path.join(proxy.LIPSYNC_CACHE_DIR, f"{k}.json"), (now - 100 + i, now - 100 + i))
+    proxy.lipsync_cache_put(keys[2], {"i": 2})   # 넘치면 가장 오래된 것부터 삭제
+    assert proxy.lipsync_cache_get(keys[0]) is None
+    assert proxy.lipsync_cache_get(keys[1]) == {"i": 1} and proxy.lipsync_cache_get(keys[2]) == {"i": 2}
+
+
+def test_mp4_with_trailing_moov_falls_back_to_tempfile(proxy, monkeypatch):
+    inputs = []
+
+    def fake_ffmpeg(cmd, input_bytes=None):
+        src = cmd[cmd.index("-i") + 1]
+        inputs.append((src, os.path.exists(src)))
+        if src == "pipe:0":
+            raise RuntimeError("ffmpeg failed: moov atom not found")
+        return subprocess.CompletedProcess(cmd, 0, stdout=b"\x00\x00" * 16000 * 3, stderr=b"")
+
+    monkeypatch.setattr(proxy, "run_ffmpeg", fake_ffmpeg)
+    wav, seconds = proxy.prepare_lipsync_audio(b"\x00\x00\x00\x20ftypM4A \x00\x00\x00\x00")
+    assert seconds == 3.0 and wav[:4] == b"RIFF"
+    assert inputs[0] == ("pipe:0", False) and inputs[1][1] and inputs[1][0].endswith(".m4a")
+
+    # mp4가 아니면 재시도 없이 그대로 실패
+    with pytest.raises(RuntimeError):
+        proxy.prepare_lipsync_audio(b"\x1a\x45\xdf\xa3webm")
@@ -0,0 +1,113 @@
+import asyncio, json, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from app.services.llm_feedback import FeedbackClient, JsonFieldStreamer
+
+REPORT = {"overall": 81.2, "accuracy": 80.0, "fluency": {"score": 84.0, "syllables_per_second": 4.1}}
+
+
+class _FakeSolar(BaseHTTPRequestHandler):
+    """OpenAI 호환 /chat/completions 대역 서버"""
+    calls = 0
+    delay = 0.0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        type(self).calls += 1
+        time.sleep(self.delay)
+        content = json.dumps({"summary": "좋아요, 조금 더 또박또박", "level": "중급", "echo": body["messages"][-1]["content"]},
+                             ensure_ascii=False)
+        if body.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for i in range(0, len(content), 4):
+                chunk = {"id": "x", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                         "choices": [{"index": 0, "delta": {"content": content[i:i + 4]}, "finish_reason": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.write(b"data: [DONE]\n\n")
+            return
+        out = json.dumps({
+            "id": "x", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}],
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_server():
+    _FakeSolar.calls, _FakeSolar.delay = 0, 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeSolar)
+    server.handle_error = lambda *args: None  # 시간 초과로 끊긴 연결의 BrokenPipe 무시
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+
+
+def test_identical_attempts_hit_cache(fake_server):
+    async def main():
+        client = FeedbackClient(api_key="test", base_url=fake_server, timeout_s=5)
+        key = client.cache_key("안녕하세요", "안녕하세요", REPORT)
+        # 점수가 같은 구간이면 같은 키
+        assert key == client.cache_key("안녕하세요 ", "안녕하세요", dict(REPORT, overall=82.9))
+        msgs = [{"role": "user", "content": "hi"}]
+        results = await asyncio.gather(*[client.run(key, msgs, json.loads) for _ in range(3)])
+        again = await client.run(key, msgs, json.loads)
+        await client.aclose()
+        return results, again
+
+    results, again = asyncio.run(main())
+    assert all(r["summary"].startswith("좋아요") for r in results) and again == results[0]
+    assert _FakeSolar.calls == 1
+
+
+def test_slow_upstream_returns_none_within_deadline(fake_server):
+    _FakeSolar.delay = 0.6
+
+    async def main():
+        client = FeedbackClient(api_key="test", base_url=fake_server, timeout_s=0.2)
+        t0 = time.monotonic()
+        value = await client.run(("k",), [{"role": "user", "content": "hi"}], json.loads)
+        elapsed = time.monotonic() - t0
+        await client.aclose()
+        return value, elapsed, client.timeouts
+
+    value, elapsed, timeouts = asyncio.run(main())
+    assert value is None and timeouts == 1 and elapsed < 0.5
+
+
+def test_stream_yields_summary_as_it_arrives(fake_server):
+    async def main():
+        client = FeedbackClient(api_key="test", base_url=fake_server, timeout_s=5)
+        fields = JsonFieldStreamer(("summary",))
+        pieces, content = [], []
+        async for chunk in client.stream([{"role": "user", "content": "hi"}]):
+            content.append(chunk)
+            pieces += [text for _, _, text in fields.feed(chunk)]
+        await client.aclose()
+        return pieces, "".join(content)
+
+    pieces, content = asyncio.run(main())
+    assert len(pieces) > 1 and "".join(pieces) == "좋아요, 조금 더 또박또박"
+    assert json.loads(content)["level"] == "중급"
+
+
+def test_prompt_summarizes_errors_instead_of_listing_them():
+    from app.services.pron_feedback import _feedback_messages
+    from app.services.pron_scoring import build_pron_report
+    ref = "오늘은 날씨가 정말 좋네요 " * 10
+    report = build_pron_report(ref, "오늘 날씨 좋네", 3.0)
+    assert len(report["errors"]) > 20
+    prompt = _feedback_messages(ref, "오늘 날씨 좋네", report)[-1]["content"]
+    sent = json.loads(prompt.split("report): ", 1)[1].split("\n", 1)[0])
+    assert sent["errors"]["count"]["del"] == sum(e["op"] == "del" for e in report["errors"])
+    assert len(sent["errors"]["examples"]) == 3
+    assert "ref_pos" not in prompt
+    assert report["errors"] and isinstance(report["errors"], list)   # 응답의 report는 그대로
@@ -0,0 +1,45 @@
+from app.services import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = metrics.Histogram("t_seconds", "test", ["stage"], buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.observe(v, "decode")
+    lines = h.render()
+    assert 't_seconds_bucket{stage="decode",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="decode",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="decode",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="decode"} 3' in lines
+
+
+def test_stage_fills_request_timings():
+    timings = metrics.start_timings()
+    with metrics.stage("unit_test"):
+        pass
+    with metrics.stage("unit_test"):
+        pass
+    assert "unit_test_ms" in timings
+    assert 'kotalk_stage_seconds_count{stage="unit_test"} 2' in metrics.render()
+
+
+def test_health_skips_proc_scan_unless_memory_is_requested(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.routers import health
+
+    calls = []
+
+    def breakdown():
+        calls.append(1)
+        return [{"pid": 1, "rss_mb": 10.0, "pss_mb": 5.0, "shared_mb": 2.0, "role": "http", "current": True}]
+    monkeypatch.setattr(health, "process_memory_breakdown", breakdown)
+    client = TestClient(app)
+    assert client.get("/health").json()["workers"] is None and not calls
+    assert client.get("/health?memory=1").json()["workers"][0]["pid"] == 1
+
+
+def test_metrics_export_process_memory():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    body = TestClient(app).get("/metrics").text
+    assert 'kotalk_process_memory_bytes{pid="' in body and 'kind="pss"' in body
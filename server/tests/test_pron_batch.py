@@ -0,0 +1,81 @@
+import asyncio
+from app.services import pron_batch
+from app.services.pron_batch import RateLimiter, iter_scores, score_rows, shutdown_pool
+from app.services.pron_scoring import build_pron_report
+
+
+def test_batch_matches_single_scoring_and_keeps_order():
+    rows = [{"id": i, "reference_text": "오늘 날씨가 좋네요", "recognized_text": "오늘 날씨 좋네" if i % 2 else "오늘 날씨가 좋네요",
+             "duration_sec": 1.5 + i % 3} for i in range(25)]
+
+    async def main():
+        pron_batch.get_pool(2)
+        return [item async for item in iter_scores(rows, "none", chunk_size=4)]
+
+    try:
+        items = asyncio.run(main())
+    finally:
+        shutdown_pool()
+    assert [it["index"] for it in items] == list(range(25))
+    assert [it["id"] for it in items] == list(range(25))
+    for row, it in zip(rows, items):
+        assert it["report"] == build_pron_report(row["reference_text"], row["recognized_text"], row["duration_sec"])
+        assert "ai_feedback" not in it
+
+
+def test_score_rows_rule_feedback_and_bad_duration():
+    [item] = score_rows([{"reference_text": "안녕하세요", "recognized_text": "안녕하세요", "duration_sec": "x"}])
+    assert item["report"]["accuracy"] == 100.0
+    assert item["ai_feedback"]["summary"]
+
+
+def test_rate_limiter_spaces_calls():
+    async def main():
+        limiter = RateLimiter(50)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        await asyncio.gather(*[limiter.acquire() for _ in range(5)])
+        return loop.time() - t0
+
+    assert asyncio.run(main()) >= 4 / 50 * 0.9
+
+
+def test_llm_feedback_streams_rows_before_chunk_finishes(monkeypatch):
+    from app.services import pron_feedback
+
+    async def fake_feedback(ref, rec, report):
+        await asyncio.sleep(0.01)
+        return {"summary": rec}
+
+    monkeypatch.setattr(pron_feedback, "build_ai_style_feedback", fake_feedback)
+    monkeypatch.setattr(pron_batch, "PRON_BATCH_LLM_RPS", 20)
+    rows = [{"reference_text": "안녕하세요", "recognized_text": f"안녕 {i}", "duration_sec": 1.0} for i in range(10)]
+
+    async def main():
+        pron_batch.get_pool(1)
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        out = []
+        async for item in iter_scores(rows, "llm", chunk_size=10):
+            out.append((loop.time() - t0, item))
+        return out
+
+    try:
+        out = asyncio.run(main())
+    finally:
+        shutdown_pool()
+    assert [it["index"] for _, it in out] == list(range(10))
+    assert [it["ai_feedback"]["summary"] for _, it in out] == [r["recognized_text"] for r in rows]
+    # 10행 × 0.05s 간격: 첫 행은 청크 전체의 LLM 호출이 끝나기 전에 나와야 함
+    assert out[-1][0] - out[0][0] >= 9 / 20 * 0.8
+
+
+def test_batch_row_limit_uses_error_envelope(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.routers import pron_eval
+    monkeypatch.setattr(pron_eval, "PRON_BATCH_MAX_ROWS", 2)
+    row = {"reference_text": "안녕하세요", "recognized_text": "안녕하세요", "duration_sec": 1.0}
+    r = TestClient(app).post("/pron-eval/batch", json={"rows": [row] * 3})
+    assert r.status_code == 413
+    assert r.json()["error"]["code"] == "PAYLOAD_TOO_LARGE" and r.json()["error"]["details"] == {"maxRows": 2}
@@ -0,0 +1,85 @@
+import threading
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.routers import pron_eval
+from app.services import inference
+
+FORM = {"reference_text": "안녕하세요", "language": "ko"}
+AUDIO = {"audio": ("a.wav", b"RIFF0000WAVEfmt ", "audio/wav")}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(inference, "is_ready", lambda: True)
+    monkeypatch.setattr(inference, "supports_reference_scoring", lambda: True)
+    return TestClient(app)
+
+
+def _decoded(monkeypatch, threads):
+    def decode(data):
+        threads.append(threading.current_thread())
+        return np.zeros(16000, dtype=np.float32), 1.0
+
+    def trim(samples):
+        threads.append(threading.current_thread())
+        return samples, None, 1.0
+    monkeypatch.setattr(pron_eval, "decode_audio_bytes", decode)
+    monkeypatch.setattr(pron_eval, "trim_silence", trim)
+    monkeypatch.setattr(pron_eval, "VAD_ENABLED", True)
+
+
+def test_decode_and_vad_run_off_the_event_loop(client, monkeypatch):
+    threads = []
+    _decoded(monkeypatch, threads)
+
+    async def score(samples, reference_text, language):
+        threads.append(threading.current_thread())
+        return {"confidence": 0.9, "words": [], "syllables": []}
+    monkeypatch.setattr(inference, "score_reference", score)
+    r = client.post("/pron-eval/forced", data=FORM, files=AUDIO)
+    assert r.status_code == 200
+    decode_thread, trim_thread, loop_thread = threads
+    assert decode_thread is trim_thread and decode_thread is not loop_thread
+
+
+def test_decode_failure_uses_error_detail(client, monkeypatch):
+    def broken(data):
+        raise ValueError("Unsupported WAV format")
+    monkeypatch.setattr(pron_eval, "decode_audio_bytes", broken)
+    r = client.post("/pron-eval/forced", data=FORM, files=AUDIO)
+    assert r.status_code == 422
+    assert r.json()["error"]["code"] == "INVALID_ARGUMENT" and "Unsupported WAV" in r.json()["error"]["message"]
+
+
+def test_bad_language_and_backend_errors_are_mapped(client, monkeypatch):
+    _decoded(monkeypatch, [])
+
+    async def bad_language(samples, reference_text, language):
+        raise ValueError(f"Unsupported language: {language}")
+    monkeypatch.setattr(inference, "score_reference", bad_language)
+    r = client.post("/pron-eval/forced", data=dict(FORM, language="xx"), files=AUDIO)
+    assert r.status_code == 422 and r.json()["error"]["code"] == "INVALID_ARGUMENT"
+
+    async def crashed(samples, reference_text, language):
+        raise RuntimeError("Worker pool stopped")
+    monkeypatch.setattr(inference, "score_reference", crashed)
+    r = client.post("/pron-eval/forced", data=FORM, files=AUDIO)
+    assert r.status_code == 500
+    assert r.json()["error"]["code"] == "SERVER_ERROR" and "Worker pool stopped" in r.json()["error"]["message"]
+
+
+def test_every_failure_uses_the_error_envelope(client, monkeypatch):
+    monkeypatch.setattr(inference, "supports_reference_scoring", lambda: False)
+    r = client.post("/pron-eval/forced", data=FORM, files=AUDIO)
+    assert r.status_code == 501 and r.json()["error"]["code"] == "NOT_SUPPORTED"
+
+    monkeypatch.setattr(inference, "supports_reference_scoring", lambda: True)
+    r = client.post("/pron-eval/forced", data={"language": "ko"}, files=AUDIO)
+    assert r.status_code == 422 and r.json()["error"]["code"] == "MISSING_FIELD"
+
+    # 디코드 후 길이 초과 (enforce_limits)
+    monkeypatch.setattr(pron_eval, "decode_audio_bytes", lambda data: (np.zeros(16, dtype=np.float32), 10_000.0))
+    r = client.post("/pron-eval/forced", data=FORM, files=AUDIO)
+    assert r.status_code == 413 and r.json()["error"]["code"] == "PAYLOAD_TOO_LARGE"
@@ -0,0 +1,46 @@
+import asyncio
+import numpy as np
+from app.services.scheduler import InferenceScheduler
+
+
+def test_concurrent_requests_are_batched():
+    calls = []
+
+    async def runner(audios, language, want_word_ts):
+        calls.append((len(audios), language))
+        return [{"text": str(len(a))} for a in audios]
+
+    async def main():
+        sched = InferenceScheduler(runner, max_batch_size=8, max_wait_ms=20)
+        sched.start()
+        results = await asyncio.gather(*[
+            sched.submit(np.zeros(n, dtype=np.float32), "ko", True) for n in range(1, 6)
+        ])
+        await sched.stop()
+        return results
+
+    results = asyncio.run(main())
+    assert [r["text"] for r in results] == ["1", "2", "3", "4", "5"]
+    assert calls == [(5, "ko")]
+
+
+def test_groups_by_language_and_propagates_errors():
+    async def runner(audios, language, want_word_ts):
+        if language == "en":
+            raise RuntimeError("boom")
+        return [{"text": language} for _ in audios]
+
+    async def main():
+        sched = InferenceScheduler(runner, max_batch_size=4, max_wait_ms=20)
+        sched.start()
+        ok, bad = await asyncio.gather(
+            sched.submit(np.zeros(4, dtype=np.float32), "ko", True),
+            sched.submit(np.zeros(4, dtype=np.float32), "en", True),
+            return_exceptions=True,
+        )
+        await sched.stop()
+        return ok, bad
+
+    ok, bad = asyncio.run(main())
+    assert ok == {"text": "ko"}
+    assert isinstance(bad, RuntimeError)
@@ -0,0 +1,11 @@
+import os, subprocess, sys
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_serve_leaves_the_environment_alone():
+    env = {k: v for k, v in os.environ.items() if k not in ("INFERENCE_WORKERS", "PRELOAD_PARENT_PID")}
+    out = subprocess.run([sys.executable, "-c", "import os, app.serve; "
+                          "print(os.environ.get('INFERENCE_WORKERS'), os.environ.get('PRELOAD_PARENT_PID'))"],
+                         cwd=SERVER_DIR, env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["None", "None"]
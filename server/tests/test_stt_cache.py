@@ -0,0 +1,39 @@
+import asyncio
+import numpy as np
+from app.common_utils import LRUCache
+from app.services.stt_cache import TranscriptCache
+
+
+def test_lru_respects_byte_budget():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.get("a")
+    cache.put("c", "xxxx")  # b가 가장 오래 안 쓰였으므로 밀려남
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.bytes == 8
+
+
+def test_identical_requests_share_one_inference(tmp_path):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"text": "안녕하세요", "language": "ko", "segments": []}
+
+    async def main():
+        cache = TranscriptCache(max_bytes=1 << 20, disk_dir=str(tmp_path))
+        key = cache.make_key(np.zeros(160, dtype=np.float32), "ko", "word")
+        first = await asyncio.gather(*[cache.get_or_compute(key, compute) for _ in range(3)])
+        again = await cache.get_or_compute(key, compute)
+        await asyncio.sleep(0.05)  # 디스크 쓰기 대기
+        restarted = TranscriptCache(max_bytes=1 << 20, disk_dir=str(tmp_path))
+        from_disk = await restarted.get_or_compute(key, compute)
+        return first, again, from_disk
+
+    first, again, from_disk = asyncio.run(main())
+    assert [src for _, src in first] == ["miss", "coalesced", "coalesced"]
+    assert again[1] == "memory" and from_disk[1] == "disk"
+    assert from_disk[0]["text"] == "안녕하세요"
+    assert len(calls) == 1
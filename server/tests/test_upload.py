@@ -0,0 +1,47 @@
+import io, wave
+import pytest
+from fastapi.testclient import TestClient
+from app.config import MAX_BYTES, MAX_SECONDS
+from app.main import app
+from app.services import inference
+
+
+def _wav(seconds: float, sr: int = 16000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(b"\x00\x00" * int(seconds * sr))
+    return buf.getvalue()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # lifespan(모델 로드) 없이 업로드 검증 경로만
+    monkeypatch.setattr(inference, "is_ready", lambda: True)
+    return TestClient(app)
+
+
+def test_wrong_mime_is_415_in_error_envelope(client):
+    r = client.post("/stt", files={"audio": ("a.txt", b"hello", "text/plain")})
+    assert r.status_code == 415
+    assert r.json()["error"]["code"] == "UNSUPPORTED_MEDIA_TYPE"
+
+
+def test_missing_audio_field_is_422(client):
+    r = client.post("/stt", files={"other": ("a.wav", _wav(0.1), "audio/wav")}, data={"language": "ko"})
+    assert r.status_code == 422
+    assert r.json()["error"]["code"] == "BAD_REQUEST"
+
+
+def test_oversize_upload_is_rejected_before_decode(client):
+    r = client.post("/stt", files={"audio": ("a.wav", b"\x00" * (MAX_BYTES + 128 * 1024), "audio/wav")})
+    assert r.status_code == 413
+    assert r.json()["error"]["details"] == {"maxBytes": MAX_BYTES}
+
+    # 바이트 한도 안이어도 WAV 헤더상 길이가 한도를 넘으면 413
+    r = client.post("/stt", files={"audio": ("a.wav", _wav(MAX_SECONDS + 1), "audio/wav")})
+    assert r.status_code == 413
+    body = r.json()["error"]
+    assert body["code"] == "PAYLOAD_TOO_LARGE" and body["details"]["maxSeconds"] == MAX_SECONDS
@@ -0,0 +1,52 @@
+from app.services.viseme import build_track, ipa_to_group, syllable_segments
+
+
+def _units(*words):
+    return [[{"char": ch, "ipa": "", "segments": syllable_segments(ch)} for ch in w] for w in words]
+
+
+def test_syllable_segments_follow_jamo():
+    assert [g for g, _, _ in syllable_segments("밥")] == ["BMP", "AEI", "BMP"]
+    assert [g for g, _, _ in syllable_segments("과")] == ["CORE", "QW", "AEI"]
+    assert [g for g, _, _ in syllable_segments("라")] == ["L", "AEI"]
+    assert ipa_to_group("tɕʰ") == "CHJSH" and ipa_to_group("") == "NEUTRAL"
+
+
+def test_track_uses_word_spans_and_neutral_gaps():
+    track = build_track(_units("아", "우"), [(0.5, 1.0), (1.5, 2.0)], 2.5, fps=10)
+    assert track["frames"] == ["NEUTRAL"] * 5 + ["AEI"] * 5 + ["NEUTRAL"] * 5 + ["U"] * 5 + ["NEUTRAL"] * 5
+    assert [s["viseme"] for s in track["segments"]] == ["NEUTRAL", "AEI", "NEUTRAL", "U", "NEUTRAL"]
+
+
+def test_track_cache_is_safe_across_threads(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from app.common_utils import LRUCache
+    from app.services import viseme
+    from app.utils.ipa_converter import map_word
+
+    def fake_ipa(text):
+        syllables = []
+        for word in text.split():
+            syllables += map_word(word)[2] + [{"char": " ", "ipa": " ", "roman": " "}]
+        return {"syllables": syllables}
+
+    # 캐시를 아주 작게 해서 스레드끼리 서로의 항목을 계속 밀어내게
+    monkeypatch.setattr(viseme, "text_to_ipa", fake_ipa)
+    monkeypatch.setattr(viseme, "_units_cache", LRUCache(max_items=2))
+    monkeypatch.setattr(viseme, "_track_cache", LRUCache(max_items=2))
+    texts = ["안녕하세요", "감사합니다", "날씨가 좋아요", "저는 학생입니다", "반갑습니다"]
+
+    def work(i):
+        return viseme.viseme_track(texts[i % len(texts)], 1.0 + i % 3)["text"]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        out = list(pool.map(work, range(2000)))
+    assert out == [texts[i % len(texts)] for i in range(2000)]
+
+
+def test_missing_input_uses_error_envelope():
+    from fastapi.testclient import TestClient
+    from app.main import app
+    r = TestClient(app).post("/viseme", json={"text": "안녕하세요"})
+    assert r.status_code == 422
+    assert r.json()["error"]["code"] == "MISSING_FIELD" and "detail" not in r.json()
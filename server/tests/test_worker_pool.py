@@ -0,0 +1,54 @@
+import asyncio, time
+import numpy as np
+from app.services import worker_pool
+from app.services.worker_pool import WorkerPool
+
+
+def test_worker_that_fails_to_load_is_restarted_with_backoff(monkeypatch):
+    # spawn된 워커는 부모 환경 변수로 app.config를 새로 읽음 → 없는 엔진 이름으로 로드 실패
+    monkeypatch.setenv("ASR_BACKEND", "nope")
+    monkeypatch.setattr(worker_pool, "MONITOR_INTERVAL_S", 0.1)
+
+    async def main():
+        pool = WorkerPool(1, threads_per_worker=1)
+        pool.start()
+        w = pool.workers[0]
+        deadline = time.monotonic() + 60
+        try:
+            while w.restarts < 1 and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+            return w.restarts, w.backoff_s, w.error, pool.is_ready()
+        finally:
+            await pool.stop()
+
+    restarts, backoff_s, error, ready = asyncio.run(main())
+    assert restarts >= 1 and backoff_s > 0
+    assert "exited with code 1" in error and "Unknown ASR_BACKEND" in error
+    assert not ready
+
+
+def test_input_errors_keep_their_type_across_the_process_boundary(monkeypatch):
+    monkeypatch.setenv("ASR_BACKEND", "stub")
+
+    async def main():
+        pool = WorkerPool(1, threads_per_worker=1)
+        pool.start()
+        deadline = time.monotonic() + 60
+        try:
+            while not pool.is_ready() and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)
+            errors = []
+            for fn in ("score_reference", "no_such_function"):
+                try:
+                    await pool.call(fn, np.zeros(1600, dtype=np.float32), "안녕", "ko")
+                except Exception as e:
+                    errors.append(e)
+            return errors
+        finally:
+            await pool.stop()
+
+    not_supported, unknown = asyncio.run(main())
+    # stub 엔진은 기준 문장 채점 미지원 → NotImplementedError 그대로, 그 밖의 예외는 RuntimeError
+    assert type(not_supported) is NotImplementedError
+    assert type(unknown) is RuntimeError and str(unknown).startswith("AttributeError:")
+    assert isinstance(worker_pool._remote_error("ValueError", "Unsupported language: xx"), ValueError)